@@ -0,0 +1,57 @@
+"""Time and mesh size of the NumPy city against the floor budget.
+
+For every Max Floors value the city is generated with a fixed floor count
+(Floor Height 0) and with floors derived from building height, so the table
+shows how both grow with the budget:
+
+    python3 bench_floors.py --floors 1,2,4,8,16 --floor-height 1.5 --param Resolution=120
+
+The node tree's own numbers come from the profiler in headless Blender:
+
+    blender -b --python profile_city_nodes.py -- --values "Max Floors=1,2,4,8,16" --stage Floors
+"""
+import sys
+import time
+import argparse
+import statistics
+
+import city_numpy
+
+
+def run(params, repeat):
+    """Median generation time and the city of the last run."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        city = city_numpy.generate_city(params)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), city
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the NumPy city against Max Floors.")
+    parser.add_argument("--floors", default="1,2,4,8,16", help="Comma-separated Max Floors values.")
+    parser.add_argument("--floor-height", type=float, default=1.5,
+                        help="Floor Height of the height-derived runs.")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE",
+                        help="Other socket values, e.g. Resolution=120.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per row, the median is kept.")
+    args = parser.parse_args(argv)
+    try:
+        params = dict(city_numpy.parse_param(p) for p in args.param)
+        budgets = [int(v) for v in args.floors.split(",")]
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"{'max floors':>10}  {'mode':>10}  {'ms':>8}  {'vertices':>9}  {'faces':>9}  {'mean floors':>11}")
+    for budget in budgets:
+        for mode, floor_height in (("fixed", 0.0), ("by height", args.floor_height)):
+            seconds, city = run(dict(params, **{"Max Floors": budget, "Floor Height": floor_height}), args.repeat)
+            print(f"{budget:>10}  {mode:>10}  {seconds * 1000:8.1f}  {len(city['positions']):>9}  "
+                  f"{len(city['face_sizes']):>9}  {city['buildings']['floors'].mean():>11.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""Pool of warm background Blender processes for non-interactive bridge jobs.
+
+Each worker is a `blender -b --python blender_worker.py` process that stays
+alive between jobs. Jobs are handed to whichever worker is idle and their
+stdout, `result` value and output files are collected into a Future.
+
+This module has no Blender dependency; the bridge, the sweep runner and plain
+Python scripts can all drive a pool:
+
+    pool = WorkerPool(size=8)
+    future = pool.submit(code, params={"Seed": 3}, output_dir="/tmp/run_3")
+    print(future.result()["result"])
+    pool.close()
+"""
+import os
+import sys
+import json
+import queue
+import shutil
+import itertools
+import threading
+import subprocess
+from concurrent.futures import Future
+
+# --- Configuration ---
+BLENDER_BIN = os.environ.get("BLENDER_BIN", "blender")
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blender_worker.py")
+# Replies on worker stdout carry this prefix, everything else is Blender's own output
+REPLY_MARKER = "@@ANTIGRAVITY_WORKER@@ "
+
+
+def write_reply(stream, reply):
+    stream.write(REPLY_MARKER + json.dumps(reply) + "\n")
+    stream.flush()
+
+
+def default_size():
+    """One worker per core, leaving one for the interactive Blender."""
+    return max(1, (os.cpu_count() or 2) - 1)
+
+
+class WorkerCrashed(RuntimeError):
+    pass
+
+
+class _Worker:
+    """One background Blender process and the thread feeding it jobs."""
+
+    def __init__(self, pool, index):
+        self.pool = pool
+        self.index = index
+        self.process = None
+        self.busy = False
+        # Set when the process could not be (re)started, the worker takes no more jobs
+        self.dead = False
+        self.error = None
+        self.thread = threading.Thread(target=self._loop, name=f"BlenderWorker{index}", daemon=True)
+
+    def start(self):
+        try:
+            self._spawn()
+        except (WorkerCrashed, OSError) as e:
+            self.dead, self.error = True, e
+            return
+        self.thread.start()
+
+    def _spawn(self):
+        cmd = [self.pool.blender, "-b", "--factory-startup", "--python", WORKER_SCRIPT]
+        self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.STDOUT, text=True, bufsize=1)
+        self._read_reply()
+
+    def _read_reply(self):
+        """Returns the next reply, collecting Blender's own output in between."""
+        lines = []
+        for line in self.process.stdout:
+            if line.startswith(REPLY_MARKER):
+                reply = json.loads(line[len(REPLY_MARKER):])
+                reply["log"] = "".join(lines)
+                return reply
+            lines.append(line)
+        raise WorkerCrashed(f"Blender worker {self.index} exited with code {self.process.wait()}:\n" + "".join(lines[-20:]))
+
+    def _loop(self):
+        while True:
+            item = self.pool._jobs.get()
+            if item is None:
+                break
+            job, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            self.busy = True
+            try:
+                self.process.stdin.write(json.dumps(job) + "\n")
+                self.process.stdin.flush()
+                future.set_result(self._read_reply())
+            except (WorkerCrashed, OSError) as e:
+                future.set_exception(e if isinstance(e, WorkerCrashed) else WorkerCrashed(str(e)))
+                # Replace the dead process so the pool keeps its size
+                try:
+                    self._spawn()
+                except (WorkerCrashed, OSError) as e:
+                    self.dead, self.error = True, e
+                    self.pool._worker_died(self)
+                    return
+            finally:
+                self.busy = False
+        self.process.stdin.close()
+        self.process.wait()
+
+
+class WorkerPool:
+    """Keeps `size` background Blender processes running and fans jobs out to them."""
+
+    def __init__(self, size=None, blender=BLENDER_BIN):
+        if shutil.which(blender) is None and not os.path.isfile(blender):
+            raise FileNotFoundError(f"Blender executable '{blender}' not found, set BLENDER_BIN")
+        self.size = size or default_size()
+        self.blender = blender
+        self._ids = itertools.count(1)
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = [_Worker(self, i) for i in range(self.size)]
+        # Start the processes in parallel, Blender takes a moment to boot
+        starters = [threading.Thread(target=w.start) for w in self._workers]
+        for t in starters:
+            t.start()
+        for t in starters:
+            t.join()
+        failed = [w for w in self._workers if w.dead]
+        if len(failed) == self.size:
+            raise failed[0].error if isinstance(failed[0].error, WorkerCrashed) else WorkerCrashed(str(failed[0].error))
+        for w in failed:
+            print(f"Blender worker {w.index} failed to start, continuing with {self.size - len(failed)}: {w.error}")
+
+    def _alive(self):
+        return [w for w in self._workers if not w.dead]
+
+    def idle_count(self):
+        return sum(1 for w in self._alive() if not w.busy) - self._jobs.qsize()
+
+    def _worker_died(self, worker):
+        """Called by a worker whose process could not be respawned."""
+        print(f"Blender worker {worker.index} could not be restarted: {worker.error}")
+        with self._lock:
+            if self._alive():
+                return
+            # Nobody left to run the queue, fail it instead of leaving it pending
+            while True:
+                try:
+                    item = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None and item[1].set_running_or_notify_cancel():
+                    item[1].set_exception(WorkerCrashed("No Blender workers left in the pool"))
+
+    def submit(self, code, name="<worker>", params=None, output_dir=None, reset=True, trace_memory=True):
+        """Queues code for the next idle worker and returns a Future of its reply.
+
+        The reply is a dict with ok, output, error, result (the payload's
+        `result` variable, encoded by bridge_protocol.encode_result with any
+        arrays in a result file; decode it with bridge_protocol.message_result),
+        outputs (files in output_dir), seconds, telemetry (see bridge_telemetry)
+        and log.
+        Inside the payload PARAMS holds params and OUTPUT_DIR the output_dir.
+        """
+        job = {"id": next(self._ids), "code": code, "name": name, "params": params or {},
+               "output_dir": output_dir, "reset": reset, "trace_memory": trace_memory}
+        future = Future()
+        with self._lock:
+            if not self._alive():
+                future.set_exception(WorkerCrashed("No Blender workers left in the pool"))
+                return future
+            self._jobs.put((job, future))
+        return future
+
+    def close(self):
+        # Dead workers' threads have already returned or never started
+        alive = self._alive()
+        for _ in alive:
+            self._jobs.put(None)
+        for w in alive:
+            w.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    # Smoke test: python3 blender_pool.py [size]
+    with WorkerPool(int(sys.argv[1]) if len(sys.argv) > 1 else 2) as pool:
+        futures = [pool.submit("import bpy\nresult = bpy.app.version_string") for _ in range(pool.size * 2)]
+        for f in futures:
+            print(f.result()["result"])
@@ -0,0 +1,95 @@
+"""Background Blender worker for the bridge worker pool.
+
+Started by blender_pool.WorkerPool as:
+    blender -b --factory-startup --python blender_worker.py
+
+Reads one JSON job per line from stdin, runs it and writes one JSON reply per
+line to stdout. Replies start with REPLY_MARKER because Blender itself also
+prints to stdout. The process stays alive between jobs so imports stay warm.
+"""
+import bpy
+import os
+import sys
+import io
+import json
+import time
+import builtins
+import traceback
+import contextlib
+
+WORKER_DIR = os.path.dirname(os.path.abspath(__file__))
+if WORKER_DIR not in sys.path:
+    sys.path.append(WORKER_DIR)
+
+import blender_pool
+import bridge_protocol
+import bridge_telemetry
+import bridge_reload
+
+# Warm workers keep imported modules, reload the ones edited since the last job
+_reloader = bridge_reload.ModuleReloader(
+    [WORKER_DIR], ignore=("blender_pool", "bridge_telemetry", "bridge_reload"))
+
+
+def reset_scene():
+    """Empties the scene so every job starts from the same state."""
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+
+
+def run_job(job):
+    output_dir = job.get("output_dir")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    if job.get("reset", True):
+        reset_scene()
+    reloaded, reload_errors = _reloader.refresh()
+
+    namespace = {
+        '__name__': '__main__',
+        '__builtins__': builtins,
+        'bpy': bpy,
+        'context': bpy.context,
+        'PARAMS': job.get("params") or {},
+        'OUTPUT_DIR': output_dir,
+    }
+    if os.path.isabs(job.get("name", "")):
+        namespace['__file__'] = job["name"]
+
+    reply = {"id": job["id"], "ok": True, "reloaded": reloaded, "reload_errors": reload_errors}
+    f_out = io.StringIO()
+    telemetry = bridge_telemetry.JobTelemetry(job.get("trace_memory", True))
+    telemetry.start()
+    start = time.perf_counter()
+    try:
+        code = compile(job["code"], job.get("name", "<worker>"), 'exec')
+        with contextlib.redirect_stdout(f_out), contextlib.redirect_stderr(f_out):
+            exec(code, namespace)
+        result = namespace.get("result")
+        if result is not None:
+            # Arrays go through a shared-memory file instead of the stdout pipe
+            reply["result"], buffers = bridge_protocol.encode_result(result)
+            if buffers:
+                reply["result_file"], reply["buffers"] = bridge_protocol.write_result_file(buffers)
+    except Exception:
+        reply["ok"] = False
+        reply["error"] = traceback.format_exc()
+    reply["seconds"] = time.perf_counter() - start
+    _reloader.track()
+    reply["telemetry"] = telemetry.stop()
+    reply["output"] = f_out.getvalue()
+    reply["outputs"] = sorted(os.path.join(output_dir, f) for f in os.listdir(output_dir)) if output_dir else []
+    return reply
+
+
+def main():
+    # Tell the pool the worker is warm and ready for jobs
+    blender_pool.write_reply(sys.stdout, {"ready": True, "version": bpy.app.version_string})
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        blender_pool.write_reply(sys.stdout, run_job(job))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""Command line client for the Antigravity bridge socket.
+
+Usage:
+    python3 bridge_client.py submit <script_to_run.py> [--no-wait] [--priority high|normal|low] [--key KEY]
+                                    [--background] [--param NAME=VALUE ...] [--result-transport socket|file]
+    python3 bridge_client.py cancel <job_id>
+    python3 bridge_client.py status <job_id>
+    python3 bridge_client.py list
+    python3 bridge_client.py telemetry [--limit N] [--name SUBSTRING] [--json]
+
+Submits the script to the running bridge, prints the job ID as soon as the
+bridge acknowledges it and then streams the job's status until it finishes.
+A full bridge queue rejects the submission; --retry-full keeps retrying.
+
+From Python, submit() returns the final event with "result" already decoded,
+so NumPy arrays a payload returns arrive as arrays without JSON in between:
+
+    final = bridge_client.submit(open("example_city_positions.py").read())
+    positions = final["result"]["positions"]
+"""
+import os
+import sys
+import time
+import json
+import socket
+import argparse
+
+import bridge_protocol
+from bridge_protocol import BRIDGE_HOST, BRIDGE_PORT
+
+
+def submit(code, name="<socket>", host=BRIDGE_HOST, port=BRIDGE_PORT, wait=True, on_event=None,
+           priority=bridge_protocol.DEFAULT_PRIORITY, key=None, skip_identical=None, slice_budget=None,
+           target=bridge_protocol.TARGET_INTERACTIVE, params=None, result_transport=bridge_protocol.TRANSPORT_SOCKET):
+    """Sends code to the bridge and returns the final event of the job.
+
+    on_event is called with every message received, including the
+    acknowledgement. With wait=False the acknowledgement is returned instead.
+    A "rejected" event is returned when the bridge queue is full. Passing the
+    same key again never runs the code twice, which makes retries safe.
+    skip_identical overrides the bridge's SKIP_IF_IDENTICAL setting and
+    slice_budget its SLICE_BUDGET for generator payloads. params are available
+    to the payload as PARAMS. target="background" runs the job in the headless
+    worker pool.
+    The job's result is decoded into "result"; result_transport="file" moves
+    its arrays through a shared-memory file instead of the socket.
+    """
+    request = {"op": "submit", "code": code, "name": name, "priority": priority, "key": key, "wait": wait,
+               "skip_identical": skip_identical, "slice_budget": slice_budget, "target": target, "params": params,
+               "result_transport": result_transport}
+    with socket.create_connection((host, port)) as sock, sock.makefile('rb') as reader:
+        bridge_protocol.send_message(sock, request)
+        while True:
+            message = bridge_protocol.recv_message(reader)
+            if message is None:
+                raise ConnectionError("Bridge closed the connection before the job finished.")
+            if message.get("state") in bridge_protocol.FINAL_STATES:
+                message["result"] = bridge_protocol.message_result(message)
+            if on_event:
+                on_event(message)
+            if message.get("event") in ("error", "rejected"):
+                return message
+            if message.get("event") == "accepted" and (not wait or message.get("state") in bridge_protocol.FINAL_STATES):
+                return message
+            if message.get("state") in bridge_protocol.FINAL_STATES:
+                return message
+
+
+def request(op, host=BRIDGE_HOST, port=BRIDGE_PORT, **fields):
+    """Sends a single request (cancel, status, list) and returns the reply."""
+    with socket.create_connection((host, port)) as sock, sock.makefile('rb') as reader:
+        bridge_protocol.send_message(sock, dict(fields, op=op))
+        return bridge_protocol.recv_message(reader)
+
+
+def parse_param(text):
+    """NAME=VALUE with VALUE parsed as JSON when possible."""
+    name, _, value = text.partition("=")
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value
+
+
+def describe_result(value):
+    """Short text for a decoded result, arrays are shown by dtype and shape."""
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{k}: {describe_result(v)}" for k, v in value.items()) + "}"
+    if isinstance(value, list):
+        return "[" + ", ".join(describe_result(v) for v in value[:10]) + (", ...]" if len(value) > 10 else "]")
+    if hasattr(value, "dtype") and hasattr(value, "shape"):
+        return f"<{value.dtype} array {tuple(value.shape)}>"
+    if isinstance(value, memoryview):
+        return f"<{value.nbytes} bytes>"
+    return repr(value)
+
+
+def format_telemetry(record):
+    delta = ", ".join(f"{k} {v:+d}" for k, v in record["datablocks_delta"].items() if v)
+    peak = record.get("peak_memory")
+    peak_text = f"{peak / 1e6:.1f} MB" if peak is not None else "-"
+    return (f"{record['wall'] * 1000:.0f} ms wall, {record['cpu'] * 1000:.0f} ms CPU, "
+            f"peak {peak_text}, datablocks: {delta or 'unchanged'}")
+
+
+def print_event(message):
+    event = message.get("event")
+    if event == "accepted":
+        print(f"Job {message['job']} accepted ({message.get('state')}).")
+    elif event == "rejected":
+        print(f"Job rejected: {message.get('reason')}", file=sys.stderr)
+    elif event == "status":
+        print(f"Job {message['job']}: {message['state']}" + (" (skipped, source unchanged)" if message.get("skipped") else ""))
+        if message.get("output"):
+            print(message["output"].rstrip("\n"))
+        if message.get("error"):
+            print(message["error"].rstrip("\n"), file=sys.stderr)
+        if message.get("result") is not None:
+            print(f"Result: {describe_result(message['result'])}")
+        for path in message.get("outputs", []):
+            print(f"Output: {path}")
+        if message.get("telemetry"):
+            print(f"Telemetry: {format_telemetry(message['telemetry'])}")
+    elif event == "progress":
+        progress = message.get("progress")
+        print(f"Job {message['job']}: {progress * 100:.0f}%" if isinstance(progress, (int, float)) else f"Job {message['job']}: {progress}")
+    elif event == "error":
+        print(f"Bridge error: {message.get('reason')}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Submit scripts to the Antigravity Blender bridge.")
+    parser.add_argument("--host", default=BRIDGE_HOST)
+    parser.add_argument("--port", type=int, default=BRIDGE_PORT)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_submit = sub.add_parser("submit", help="Run a script in the interactive Blender.")
+    p_submit.add_argument("script")
+    p_submit.add_argument("--no-wait", action="store_true", help="Exit once the job is acknowledged.")
+    p_submit.add_argument("--priority", choices=list(bridge_protocol.PRIORITIES), default=bridge_protocol.DEFAULT_PRIORITY)
+    p_submit.add_argument("--key", help="Idempotency key, a resubmission with the same key is not run again.")
+    p_submit.add_argument("--retry-full", action="store_true", help="Keep retrying while the bridge queue is full.")
+    p_submit.add_argument("--skip-identical", action="store_true", default=None,
+                          help="Do not re-run if the source matches the last successful run of this script.")
+    p_submit.add_argument("--slice-budget", type=float, help="Seconds per UI tick for generator payloads (def run(): ... yield).")
+    p_submit.add_argument("--background", action="store_true", help="Run in the headless worker pool instead of the GUI.")
+    p_submit.add_argument("--param", action="append", default=[], metavar="NAME=VALUE",
+                          help="Value passed to the job in PARAMS (JSON or plain string).")
+    p_submit.add_argument("--result-transport", choices=(bridge_protocol.TRANSPORT_SOCKET, bridge_protocol.TRANSPORT_FILE),
+                          default=bridge_protocol.TRANSPORT_SOCKET, help="How result arrays are sent back.")
+
+    for op in ("cancel", "status"):
+        p_op = sub.add_parser(op, help=f"{op.capitalize()} a job.")
+        p_op.add_argument("job", type=int)
+    sub.add_parser("list", help="List queued and running jobs.")
+    p_tel = sub.add_parser("telemetry", help="Show recent job telemetry.")
+    p_tel.add_argument("--limit", type=int, default=20)
+    p_tel.add_argument("--name", help="Only jobs whose name contains this.")
+    p_tel.add_argument("--json", action="store_true", help="Print the raw records as JSON lines.")
+
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "submit":
+            if not os.path.isfile(args.script):
+                print(f"Error: File '{args.script}' not found.", file=sys.stderr)
+                return 1
+            with open(args.script, 'r') as f:
+                code = f.read()
+            target = bridge_protocol.TARGET_BACKGROUND if args.background else bridge_protocol.TARGET_INTERACTIVE
+            params = dict(parse_param(p) for p in args.param)
+            delay = 0.5
+            while True:
+                final = submit(code, os.path.abspath(args.script), args.host, args.port,
+                               wait=not args.no_wait, on_event=print_event,
+                               priority=args.priority, key=args.key, skip_identical=args.skip_identical,
+                               slice_budget=args.slice_budget, target=target, params=params,
+                               result_transport=args.result_transport)
+                if final.get("event") != "rejected" or not args.retry_full:
+                    break
+                time.sleep(delay)
+                delay = min(delay * 2, 10.0)
+            if final.get("event") in ("error", "rejected") or final.get("state") == bridge_protocol.STATE_FAILED:
+                return 1
+
+        elif args.command == "cancel":
+            reply = request("cancel", args.host, args.port, job=args.job)
+            print(f"Job {args.job} cancelled." if reply.get("ok") else f"Job {args.job} is not queued or time-sliced, cannot cancel.")
+            return 0 if reply.get("ok") else 1
+
+        elif args.command == "status":
+            reply = request("status", args.host, args.port, job=args.job)
+            if reply.get("event") == "error":
+                print_event(reply)
+                return 1
+            print(f"Job {reply['job']} [{reply['priority']}, {reply['target']}] {reply['state']}: {reply['name']}")
+
+        elif args.command == "list":
+            reply = request("list", args.host, args.port)
+            for job in reply.get("jobs", []):
+                print(f"{job['job']:>6}  {job['state']:<9} {job['priority']:<7} {job['target']:<11} {job['name']}")
+
+        elif args.command == "telemetry":
+            reply = request("telemetry", args.host, args.port, limit=args.limit, name=args.name)
+            for record in reply.get("records", []):
+                if args.json:
+                    print(json.dumps(record))
+                else:
+                    print(f"{record['job']:>6}  {record['state']:<9} {format_telemetry(record)}  {record['name']}")
+
+    except OSError as e:
+        print(f"Error: Could not reach the bridge on {args.host}:{args.port} ({e})", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
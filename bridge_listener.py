@@ -2,88 +2,829 @@ import bpy
 import os
 import sys
 import io
+import time
+import queue
+import hashlib
+import inspect
+import builtins
+import socket
+import threading
+import itertools
 import traceback
+import collections
 import contextlib
 
 # --- Configuration ---
 WATCH_FILE = "/Users/joem/.gemini/antigravity/scratch/blender_bridge/payload.py"
-CHECK_INTERVAL = 1.0
+BRIDGE_DIR = os.path.dirname(WATCH_FILE)
+# The timer only drains the job queue, socket jobs are pushed by the server thread
+TICK_INTERVAL = 0.05
+# Back-pressure: submissions beyond this many queued jobs are rejected
+MAX_QUEUE_DEPTH = 256
+# Finished jobs kept around for status queries and duplicate detection
+JOB_HISTORY = 1000
+# Compiled payloads kept in memory, keyed by the hash of their source
+CODE_CACHE_SIZE = 64
+# Opt-in: skip a job whose source is identical to the last successful run of the same name
+SKIP_IF_IDENTICAL = False
+# Payloads defining this generator function are advanced across timer ticks
+GENERATOR_ENTRY = "run"
+# Seconds of generator work per tick before control goes back to the UI
+SLICE_BUDGET = 0.03
+# Headless Blender workers for "background" jobs, None means one per core minus one
+WORKER_COUNT = None
+# Each background job writes its files to a job_<id> folder in here
+WORKER_OUTPUT_DIR = os.path.join(BRIDGE_DIR, "worker_output")
+# Console output: ring buffer size, lines written per tick, and the tail shown of long outputs
+CONSOLE_BUFFER_LINES = 2000
+CONSOLE_FLUSH_LINES = 200
+CONSOLE_TAIL_LINES = 40
+CONSOLE_LOG_FILE = os.path.join(BRIDGE_DIR, "bridge_output.log")
+# Per-job timing, memory and datablock records, one JSON object per line
+TELEMETRY_LOG = os.path.join(BRIDGE_DIR, "bridge_telemetry.jsonl")
+# tracemalloc slows allocation heavy payloads down, switch off for timing-critical runs
+TELEMETRY_TRACE_MEMORY = True
+# Modules imported from these folders (and from sys.path entries added by payloads)
+# are reloaded before a job when their source changed
+RELOAD_ROOTS = [BRIDGE_DIR]
+
+if BRIDGE_DIR not in sys.path:
+    sys.path.append(BRIDGE_DIR)
+
+import bridge_protocol
+import blender_pool
+import bridge_telemetry
+import bridge_reload
+from bridge_protocol import BRIDGE_HOST, BRIDGE_PORT
+
+# Key used to find the server of a previous run of this script
+SERVER_KEY = "antigravity_bridge_server"
+
+class ConsoleChannel:
+    """Buffered output to the Python Console area.
+
+    Messages land in a bounded ring buffer and are written out once per
+    timer tick under a single context override, using a cached console area.
+    Long messages are written to CONSOLE_LOG_FILE in full and only their
+    tail is shown in the console.
+    """
+
+    def __init__(self, size=CONSOLE_BUFFER_LINES):
+        self._lines = collections.deque(maxlen=size)
+        self._dropped = 0
+        self._area = None
+        self._window = None
+
+    def write(self, msg, type='INFO'):
+        # 'INFO', 'WARNING', 'ERROR', 'OUTPUT'
+        if type == 'Normal': type = 'INFO'
+        lines = str(msg).split('\n')
+        if len(lines) > CONSOLE_TAIL_LINES:
+            hidden = len(lines) - CONSOLE_TAIL_LINES
+            self._write_log(msg)
+            lines = [f"... {hidden} lines, full output in {CONSOLE_LOG_FILE}"] + lines[-CONSOLE_TAIL_LINES:]
+        overflow = len(self._lines) + len(lines) - self._lines.maxlen
+        if overflow > 0:
+            self._dropped += overflow
+        self._lines.extend((line, type) for line in lines)
+
+    def flush(self, lines=CONSOLE_FLUSH_LINES):
+        """Writes up to `lines` buffered lines to the console."""
+        if not self._lines:
+            return
+        area = self._find_console()
+        if area is None:
+            # No console open, the system console is better than nothing
+            while self._lines:
+                print(self._lines.popleft()[0], file=sys.__stdout__)
+            return
+
+        with bpy.context.temp_override(window=self._window, area=area):
+            if self._dropped:
+                bpy.ops.console.scrollback_append(text=f"... {self._dropped} lines dropped, console buffer full", type='WARNING')
+                self._dropped = 0
+            for _ in range(min(lines, len(self._lines))):
+                line, type = self._lines.popleft()
+                bpy.ops.console.scrollback_append(text=line, type=type)
+
+    def _find_console(self):
+        # Reuse the last console area while it is still open
+        if self._area is not None:
+            try:
+                if self._area.type == 'CONSOLE' and self._window in bpy.context.window_manager.windows[:]:
+                    return self._area
+            except ReferenceError:
+                pass
+        self._area = self._window = None
+        for window in bpy.context.window_manager.windows:
+            for area in window.screen.areas:
+                if area.type == 'CONSOLE':
+                    self._window, self._area = window, area
+                    return area
+        return None
+
+    def _write_log(self, msg):
+        try:
+            with open(CONSOLE_LOG_FILE, 'a') as f:
+                f.write(f"--- {time.strftime('%Y-%m-%d %H:%M:%S')} ---\n{msg}\n")
+        except OSError:
+            pass
+
+_console = ConsoleChannel()
 
 def print_to_blender_console(msg, type='INFO'):
-    """Finds a Python Console in the UI and writes to it."""
-    
-    # 1. Try to report to the Info bar (bottom of screen) always
-    # 'INFO', 'WARNING', 'ERROR'
-    if type == 'Normal': type = 'INFO'
-    
-    # Using a helper operator context is tricky for reports from a timer, 
-    # but print() usually goes to system console.
-    # We will try to find the CONSOLE area.
-    
-    for window in bpy.context.window_manager.windows:
-        for area in window.screen.areas:
-            if area.type == 'CONSOLE':
-                # Context override to print to this console
-                with bpy.context.temp_override(window=window, area=area):
-                    # Write separate lines
-                    for line in str(msg).split('\n'):
-                        bpy.ops.console.scrollback_append(text=line, type=type)
+    """Queues a message for the Python Console, written on the next bridge tick."""
+    _console.write(msg, type)
+
+class BridgeJob:
+    """A unit of code submitted to the bridge, from the socket or the watch file."""
+    _ids = itertools.count(1)
+
+    def __init__(self, code, name="<socket>", priority=bridge_protocol.DEFAULT_PRIORITY, key=None,
+                 skip_identical=None, slice_budget=None, target=bridge_protocol.TARGET_INTERACTIVE, params=None,
+                 result_transport=bridge_protocol.TRANSPORT_SOCKET):
+        self.id = next(self._ids)
+        self.code = code
+        self.name = name
+        self.priority = priority
+        # Optional client supplied idempotency key, resubmitting it never runs the code twice
+        self.key = key
+        # None falls back to SKIP_IF_IDENTICAL
+        self.skip_identical = skip_identical
+        self.slice_budget = SLICE_BUDGET if slice_budget is None else slice_budget
+        # Background jobs run in the worker pool and receive params as PARAMS
+        self.target = target
+        self.params = params
+        # Arrays in the result go inline over the socket or through a shared-memory file
+        self.result_transport = result_transport
+        self.namespace = None
+        self.result = None
+        self.output = None
+        # Set for time-sliced generator payloads
+        self.generator = None
+        self.slices = []
+        self.cancel_requested = False
+        self.telemetry = None
+        # Source digest, set once the code is compiled
+        self.digest = None
+        self.state = bridge_protocol.STATE_QUEUED
+        self.final_event = None
+        # Shared-memory result file, unlinked by the client that reads it or by discard_result()
+        self.result_file = None
+        # One event queue per client connection following the job
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        """Returns a queue receiving the job's events from now on."""
+        events = queue.Queue()
+        with self._lock:
+            if self.final_event is not None:
+                events.put(self.final_event)
+            else:
+                self._subscribers.append(events)
+        return events
+
+    def publish(self, event, **fields):
+        message = {"event": event, "job": self.id}
+        message.update(fields)
+        with self._lock:
+            if message.get("state") in bridge_protocol.FINAL_STATES:
+                self.final_event = message
+                if "_buffers" in message or "result_file" in message:
+                    # Don't keep result arrays alive in the job history, a result file
+                    # is read (and unlinked) once by the client following the job
+                    self.result_file = message.get("result_file")
+                    self.final_event = {k: v for k, v in message.items()
+                                        if k not in ("_buffers", "buffers", "result", "result_file")}
+                    self.final_event["result_dropped"] = True
+            for events in self._subscribers:
+                events.put(message)
+            if self.final_event is not None:
+                self._subscribers.clear()
+
+    def set_state(self, state, **fields):
+        self.state = state
+        self.publish("status", state=state, **fields)
+
+    def discard_result(self):
+        """Unlinks the job's result file if no client has read it."""
+        path, self.result_file = self.result_file, None
+        if path:
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+    def to_dict(self):
+        info = {"job": self.id, "name": self.name, "priority": self.priority, "state": self.state,
+                "target": self.target}
+        if self.slices:
+            info["slices"] = self.slice_summary()
+        return info
+
+    def record_slice(self, steps, seconds, progress):
+        self.slices.append((steps, seconds, progress))
+
+    def slice_summary(self):
+        """Per-slice timings of a generator job (seconds)."""
+        times = [seconds for _steps, seconds, _progress in self.slices]
+        return {
+            "count": len(times),
+            "steps": sum(steps for steps, _seconds, _progress in self.slices),
+            "total": sum(times),
+            "max": max(times, default=0.0),
+            "mean": sum(times) / len(times) if times else 0.0,
+            "times": times,
+        }
+
+class QueueFullError(Exception):
+    pass
+
+class JobQueue:
+    """Thread safe job queue with FIFO priority lanes and a depth cap.
+
+    Every job is popped exactly once. Finished jobs stay in a bounded history
+    so their status can still be queried and duplicate keys can be detected.
+    """
+
+    def __init__(self, max_depth=MAX_QUEUE_DEPTH, history=JOB_HISTORY):
+        self.max_depth = max_depth
+        self.history = history
+        self._lanes = [collections.deque() for _ in bridge_protocol.PRIORITIES]
+        self._jobs = collections.OrderedDict()
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(lane) for lane in self._lanes)
+
+    def submit(self, job):
+        """Queues a job. Returns the already known job if its key was seen before."""
+        if job.priority not in bridge_protocol.PRIORITIES:
+            raise ValueError(f"Unknown priority {job.priority!r}")
+        if job.target not in bridge_protocol.TARGETS:
+            raise ValueError(f"Unknown target {job.target!r}")
+        with self._lock:
+            if job.key is not None and job.key in self._keys:
+                return self._keys[job.key]
+            if sum(len(lane) for lane in self._lanes) >= self.max_depth:
+                raise QueueFullError(f"Queue is full ({self.max_depth} jobs)")
+            self._lanes[bridge_protocol.PRIORITIES[job.priority]].append(job)
+            self._remember(job)
+        return job
+
+    def pop(self, target=bridge_protocol.TARGET_INTERACTIVE):
+        """Takes the next job for target off the highest priority lane, or None.
+
+        The job is marked running before the lock is released so it can no
+        longer be cancelled; the caller publishes the state change.
+        """
+        with self._lock:
+            for lane in self._lanes:
+                for job in lane:
+                    if job.target == target:
+                        lane.remove(job)
+                        job.state = bridge_protocol.STATE_RUNNING
+                        return job
+        return None
+
+    def has_target(self, target):
+        with self._lock:
+            return any(job.target == target for lane in self._lanes for job in lane)
+
+    def cancel(self, job_id):
+        """Cancels a queued job, or stops a running generator job at its next slice.
+
+        Returns True on success.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job.state == bridge_protocol.STATE_RUNNING and job.generator is not None:
+                job.cancel_requested = True
+                return True
+            if job is None or job.state != bridge_protocol.STATE_QUEUED:
+                return False
+            self._lanes[bridge_protocol.PRIORITIES[job.priority]].remove(job)
+        job.set_state(bridge_protocol.STATE_CANCELLED)
+        return True
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def snapshot(self):
+        """Queued and running jobs in execution order."""
+        with self._lock:
+            jobs = [j for j in self._jobs.values() if j.state == bridge_protocol.STATE_RUNNING]
+            for lane in self._lanes:
+                jobs.extend(lane)
+            return [j.to_dict() for j in jobs]
+
+    def _remember(self, job):
+        self._jobs[job.id] = job
+        if job.key is not None:
+            self._keys[job.key] = job
+        # Drop the oldest finished jobs once the history is full
+        while len(self._jobs) > self.history:
+            old_id = next((i for i, j in self._jobs.items() if j.state in bridge_protocol.FINAL_STATES), None)
+            if old_id is None:
+                break
+            old = self._jobs.pop(old_id)
+            old.discard_result()
+            if old.key is not None:
+                self._keys.pop(old.key, None)
+
+    def discard_results(self):
+        """Unlinks the unread result files of every job still in the history."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.discard_result()
+
+class CodeCache:
+    """LRU cache of compiled code objects keyed by a SHA-256 of the source.
+
+    Also remembers the hash of the last successful run per job name, which
+    backs the "skip if identical" mode.
+    """
+
+    def __init__(self, size=CODE_CACHE_SIZE):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._codes = collections.OrderedDict()
+        self._last_run = {}
+
+    @staticmethod
+    def digest(source):
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+    def compile(self, source, filename):
+        """Returns (digest, code object, cache hit, compile seconds)."""
+        digest = self.digest(source)
+        # Code objects carry their filename for tracebacks, so it is part of the key
+        key = (digest, filename)
+        code = self._codes.get(key)
+        if code is not None:
+            self.hits += 1
+            self._codes.move_to_end(key)
+            return digest, code, True, 0.0
+
+        self.misses += 1
+        start = time.perf_counter()
+        code = compile(source, filename, 'exec')
+        elapsed = time.perf_counter() - start
+        self._codes[key] = code
+        while len(self._codes) > self.size:
+            self._codes.popitem(last=False)
+        return digest, code, False, elapsed
+
+    def is_unchanged(self, name, digest):
+        return self._last_run.get(name) == digest
+
+    def mark_run(self, name, digest):
+        self._last_run[name] = digest
+
+class BackgroundDispatcher:
+    """Feeds "background" jobs from the queue to a pool of headless Blenders.
+
+    The pool is only started once the first background job arrives. Jobs stay
+    in the JobQueue until a worker is idle, so priorities, cancellation and
+    the depth cap apply to them as well.
+    """
+
+    def __init__(self, size=WORKER_COUNT):
+        self.size = size
+        self.pool = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def notify(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="AntigravityBridgeDispatcher", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        if self.pool:
+            self.pool.close()
+
+    def _loop(self):
+        try:
+            self.pool = blender_pool.WorkerPool(self.size, blender=bpy.app.binary_path or blender_pool.BLENDER_BIN)
+        except Exception:
+            tb = traceback.format_exc()
+            # Fail everything that was waiting for the pool
+            while True:
+                job = _job_queue.pop(bridge_protocol.TARGET_BACKGROUND)
+                if job is None:
+                    break
+                job.set_state(bridge_protocol.STATE_FAILED, output="", error=tb)
+            with self._lock:
+                self._thread = None
+            return
+
+        while not self._stop.is_set():
+            if self.pool.idle_count() <= 0 or not _job_queue.has_target(bridge_protocol.TARGET_BACKGROUND):
+                self._wake.wait(0.05)
+                self._wake.clear()
+                continue
+            job = _job_queue.pop(bridge_protocol.TARGET_BACKGROUND)
+            if job is None:
+                continue
+            job.set_state(bridge_protocol.STATE_RUNNING)
+            future = self.pool.submit(job.code, job.name, job.params,
+                                      os.path.join(WORKER_OUTPUT_DIR, f"job_{job.id}"),
+                                      trace_memory=TELEMETRY_TRACE_MEMORY)
+            future.add_done_callback(lambda f, job=job: self._finish(job, f))
+
+    def _finish(self, job, future):
+        try:
+            reply = future.result()
+        except Exception:
+            job.set_state(bridge_protocol.STATE_FAILED, output="", error=traceback.format_exc())
+            return
+        fields = {"output": reply.get("output", ""), "outputs": reply.get("outputs", []),
+                  "seconds": reply.get("seconds")}
+        # Workers always hand arrays over in a shared-memory result file
+        for key in ("result", "result_file", "buffers"):
+            if key in reply:
+                fields[key] = reply[key]
+        state = bridge_protocol.STATE_DONE if reply.get("ok") else bridge_protocol.STATE_FAILED
+        if reply.get("telemetry"):
+            fields["telemetry"] = record_telemetry(job, state, reply["telemetry"])
+        if reply.get("ok"):
+            job.set_state(state, **fields)
+        else:
+            job.set_state(state, error=reply.get("error"), **fields)
+        self._wake.set()
+
+# Jobs handed from the server thread to the main thread and the worker pool
+_job_queue = JobQueue()
+_code_cache = CodeCache()
+_dispatcher = BackgroundDispatcher()
+_telemetry_log = bridge_telemetry.TelemetryLog(TELEMETRY_LOG)
+# The bridge's own modules are never reloaded underneath it
+_reloader = bridge_reload.ModuleReloader(
+    RELOAD_ROOTS, ignore=("bridge_protocol", "blender_pool", "bridge_telemetry", "bridge_reload"))
+
+class BridgeServer:
+    """Accepts jobs on a localhost TCP socket from a background thread.
+
+    Requests are JSON lines with an "op":
+        submit  {"code", "name", "priority", "key", "wait",
+                 "skip_identical", "slice_budget",
+                 "target", "params", "result_transport"}     queue a job
+        cancel  {"job"}                                      cancel a queued or time-sliced job
+        status  {"job"}                                      report a job's state
+        list    {}                                           queued and running jobs
+        telemetry {"limit", "name"}                          recent job telemetry records
+    Only "interactive" jobs run in this Blender, "background" ones go to the
+    headless worker pool. A submitted job is acknowledged with its ID straight
+    away. Unless "wait" is false, the connection then receives the job's
+    status events until it has finished. A full queue answers with a
+    "rejected" event.
+    """
+
+    def __init__(self, host=BRIDGE_HOST, port=BRIDGE_PORT):
+        self.host = host
+        self.port = port
+        self._sock = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen()
+        # Wake up regularly to notice stop()
+        self._sock.settimeout(0.5)
+        self._thread = threading.Thread(target=self._serve, name="AntigravityBridgeServer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        if self._sock:
+            self._sock.close()
+
+    def _serve(self):
+        while not self._stop.is_set():
+            try:
+                conn, _addr = self._sock.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            threading.Thread(target=self._handle_client, args=(conn,), daemon=True).start()
+
+    def _handle_client(self, conn):
+        with conn, conn.makefile('rb') as reader:
+            try:
+                while not self._stop.is_set():
+                    request = bridge_protocol.recv_message(reader)
+                    if request is None:
+                        break
+                    handler = getattr(self, f"_op_{request.get('op')}", None)
+                    if handler is None:
+                        bridge_protocol.send_message(conn, {"event": "error", "reason": f"unknown op {request.get('op')!r}"})
+                        continue
+                    handler(conn, request)
+            except (OSError, ValueError):
+                # Client went away or sent garbage, the job itself keeps running
+                pass
+
+    def _op_submit(self, conn, request):
+        job = BridgeJob(request.get("code", ""), request.get("name", "<socket>"),
+                        request.get("priority", bridge_protocol.DEFAULT_PRIORITY), request.get("key"),
+                        request.get("skip_identical"), request.get("slice_budget"),
+                        request.get("target", bridge_protocol.TARGET_INTERACTIVE), request.get("params"),
+                        request.get("result_transport", bridge_protocol.TRANSPORT_SOCKET))
+        # Subscribe before the job is visible to the main thread so no event is missed
+        events = job.subscribe()
+        try:
+            queued = _job_queue.submit(job)
+        except (QueueFullError, ValueError) as e:
+            bridge_protocol.send_message(conn, {"event": "rejected", "reason": str(e)})
+            return
+        if queued is not job:
+            # Duplicate key, follow the job that was submitted first
+            job, events = queued, queued.subscribe()
+        elif job.target == bridge_protocol.TARGET_BACKGROUND:
+            _dispatcher.notify()
+        bridge_protocol.send_message(conn, {"event": "accepted", "job": job.id, "state": job.state})
+        if request.get("wait", True):
+            self._stream_events(conn, events)
+
+    def _op_cancel(self, conn, request):
+        ok = _job_queue.cancel(request.get("job"))
+        bridge_protocol.send_message(conn, {"event": "cancel", "job": request.get("job"), "ok": ok})
+
+    def _op_status(self, conn, request):
+        job = _job_queue.get(request.get("job"))
+        if job is None:
+            bridge_protocol.send_message(conn, {"event": "error", "reason": f"unknown job {request.get('job')!r}"})
+        else:
+            bridge_protocol.send_message(conn, dict(job.to_dict(), event="job"))
+
+    def _op_list(self, conn, request):
+        bridge_protocol.send_message(conn, {"event": "jobs", "jobs": _job_queue.snapshot()})
+
+    def _op_telemetry(self, conn, request):
+        records = _telemetry_log.query(request.get("limit", 20), request.get("name"))
+        bridge_protocol.send_message(conn, {"event": "telemetry", "records": records})
+
+    def _stream_events(self, conn, events):
+        while not self._stop.is_set():
+            try:
+                message = events.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            buffers = message.get("_buffers", ())
+            bridge_protocol.send_message(conn, {k: v for k, v in message.items() if k != "_buffers"}, buffers)
+            if message.get("state") in bridge_protocol.FINAL_STATES:
                 return
 
+def record_telemetry(job, state, record=None):
+    """Finishes the job's telemetry, logs it and returns the record."""
+    if record is None:
+        if job.telemetry is None:
+            return None
+        record = job.telemetry.stop()
+        job.telemetry = None
+    record.update({"job": job.id, "name": job.name, "target": job.target, "state": state,
+                   "digest": getattr(job, "digest", None), "slices": len(job.slices)})
+    _telemetry_log.append(record)
+    return record
+
+def make_namespace(context, filename, params=None):
+    """Fresh module-like namespace for a payload, instead of a copy of the bridge's globals."""
+    namespace = {
+        '__name__': '__main__',
+        '__builtins__': builtins,
+        'bpy': bpy,
+        'context': context,
+        'PARAMS': params or {},
+    }
+    if os.path.isabs(filename):
+        namespace['__file__'] = filename
+    return namespace
+
 class AntigravityBridgeOperator(bpy.types.Operator):
-    """Antigravity Bridge: Watches a file and executes it."""
+    """Antigravity Bridge: Runs jobs from a socket or a watched file."""
     bl_idname = "wm.antigravity_bridge"
     bl_label = "Start Antigravity Bridge"
-    
+
     _timer = None
     _last_mtime = 0
-    
+    _active_job = None
+
     def modal(self, context, event):
         if event.type == 'TIMER':
-            if os.path.exists(WATCH_FILE):
-                try:
-                    mtime = os.stat(WATCH_FILE).st_mtime
-                    if mtime > self._last_mtime:
-                        self._last_mtime = mtime
-                        self.execute_external_script(context)
-                except OSError:
-                    pass
+            self.check_watch_file()
+            if self._active_job:
+                self.advance_active_job(context)
+            else:
+                # One job per tick so the UI gets a chance to redraw in between
+                job = _job_queue.pop()
+                if job:
+                    self.execute_job(context, job)
+            _console.flush()
         return {'PASS_THROUGH'}
 
-    def execute_external_script(self, context):
-        print_to_blender_console(f"--- DETECTED CHANGE: {os.path.basename(WATCH_FILE)} ---", 'OUTPUT')
-        
+    def check_watch_file(self):
+        """Legacy path: queues the payload file when its mtime changes."""
+        if not os.path.exists(WATCH_FILE):
+            return
+        try:
+            mtime = os.stat(WATCH_FILE).st_mtime
+            if mtime > self._last_mtime:
+                self._last_mtime = mtime
+                with open(WATCH_FILE, 'r') as f:
+                    code = f.read()
+                print_to_blender_console(f"--- DETECTED CHANGE: {os.path.basename(WATCH_FILE)} ---", 'OUTPUT')
+                try:
+                    _job_queue.submit(BridgeJob(code, WATCH_FILE))
+                except QueueFullError as e:
+                    print_to_blender_console(f"Payload dropped: {e}", 'ERROR')
+        except OSError:
+            pass
+
+    def execute_job(self, context, job):
+        print_to_blender_console(f"--- JOB {job.id}: {job.name} ---", 'OUTPUT')
+        job.set_state(bridge_protocol.STATE_RUNNING)
+
+        # Capture stdout/stderr
+        job.output = io.StringIO()
+
         try:
-            with open(WATCH_FILE, 'r') as f:
-                code = f.read()
-            
-            # Setup namespace
-            namespace = globals().copy()
-            namespace['context'] = context
-            
-            # Capture stdout/stderr
-            f_out = io.StringIO()
-            
-            with contextlib.redirect_stdout(f_out), contextlib.redirect_stderr(f_out):
+            digest, code, hit, compile_time = _code_cache.compile(job.code, job.name)
+            if hit:
+                print_to_blender_console(f"Code cache hit {digest[:12]} ({_code_cache.hits} hits / {_code_cache.misses} misses)", 'INFO')
+            else:
+                print_to_blender_console(f"Code cache miss {digest[:12]}, compiled in {compile_time * 1000:.1f} ms", 'INFO')
+
+            skip = SKIP_IF_IDENTICAL if job.skip_identical is None else job.skip_identical
+            # The same code with new PARAMS is a new run
+            if skip and not job.params and _code_cache.is_unchanged(job.name, digest):
+                print_to_blender_console("Source unchanged since the last run, skipped.", 'INFO')
+                job.set_state(bridge_protocol.STATE_DONE, output="", skipped=True)
+                return
+
+            self.reload_modules()
+
+            job.telemetry = bridge_telemetry.JobTelemetry(TELEMETRY_TRACE_MEMORY)
+            job.telemetry.start()
+            job.digest = digest
+            namespace = make_namespace(context, job.name, job.params)
+            job.namespace = namespace
+
+            with contextlib.redirect_stdout(job.output), contextlib.redirect_stderr(job.output):
                 exec(code, namespace)
-            
-            # Print output
-            output = f_out.getvalue()
-            if output:
-                print_to_blender_console(output, 'OUTPUT')
-            
-            print_to_blender_console("Execution Successful.", 'INFO')
-            
-            # Redraw
-            for window in context.window_manager.windows:
-                for area in window.screen.areas:
-                    area.tag_redraw()
+                entry = namespace.get(GENERATOR_ENTRY)
+                if inspect.isgeneratorfunction(entry):
+                    job.generator = entry()
+            _reloader.track()
+
+            if job.generator is not None:
+                # Advanced a slice at a time from modal()
+                self._active_job = job
+                context.window_manager.progress_begin(0.0, 1.0)
+                print_to_blender_console(f"Running {GENERATOR_ENTRY}() in {job.slice_budget * 1000:.0f} ms slices...", 'INFO')
+                return
+
+            self.finish_job(context, job)
 
         except Exception:
-            # Capture traceback
-            tb = traceback.format_exc()
-            print_to_blender_console(tb, 'ERROR')
-            print_to_blender_console("Execution Failed.", 'ERROR')
+            self.fail_job(job)
+
+    def advance_active_job(self, context):
+        """Runs the active generator job until this tick's time budget is used up."""
+        job = self._active_job
+        if job.cancel_requested:
+            job.generator.close()
+            self.end_active_job(context)
+            print_to_blender_console(f"Job {job.id} cancelled after {len(job.slices)} slices.", 'WARNING')
+            job.set_state(bridge_protocol.STATE_CANCELLED, output=job.output.getvalue(), slices=job.slice_summary(),
+                          telemetry=record_telemetry(job, bridge_protocol.STATE_CANCELLED))
+            return
+
+        steps = 0
+        progress = None
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(job.output), contextlib.redirect_stderr(job.output):
+                while True:
+                    progress = next(job.generator)
+                    steps += 1
+                    if time.perf_counter() - start >= job.slice_budget:
+                        break
+        except StopIteration as stop:
+            # A generator's return value is its result
+            if stop.value is not None:
+                job.result = stop.value
+            job.record_slice(steps, time.perf_counter() - start, progress)
+            self.end_active_job(context)
+            self.finish_job(context, job)
+            return
+        except Exception:
+            self.end_active_job(context)
+            self.fail_job(job)
+            return
+
+        job.record_slice(steps, time.perf_counter() - start, progress)
+        if isinstance(progress, (int, float)):
+            context.window_manager.progress_update(min(max(float(progress), 0.0), 1.0))
+        if progress is not None:
+            job.publish("progress", progress=progress if isinstance(progress, (int, float)) else str(progress))
+        self.redraw(context)
+
+    def end_active_job(self, context):
+        self._active_job = None
+        context.window_manager.progress_end()
+
+    def reload_modules(self):
+        start = time.perf_counter()
+        reloaded, errors = _reloader.refresh()
+        if reloaded:
+            print_to_blender_console(f"Reloaded {', '.join(reloaded)} in {(time.perf_counter() - start) * 1000:.0f} ms", 'INFO')
+        for name, error in errors.items():
+            print_to_blender_console(f"Reload of {name} failed: {error}", 'ERROR')
+
+    def finish_job(self, context, job):
+        if job.generator is not None:
+            # Modules imported while the generator ran
+            _reloader.track()
+
+        # Print output
+        output = job.output.getvalue()
+        if output:
+            print_to_blender_console(output, 'OUTPUT')
+
+        fields = {}
+        if job.slices:
+            fields["slices"] = job.slice_summary()
+            summary = fields["slices"]
+            print_to_blender_console(
+                f"{summary['count']} slices, {summary['total'] * 1000:.0f} ms total, "
+                f"longest {summary['max'] * 1000:.1f} ms", 'INFO')
+
+        try:
+            fields.update(self.result_fields(job))
+        except Exception:
+            self.fail_job(job)
+            return
+
+        fields["telemetry"] = record_telemetry(job, bridge_protocol.STATE_DONE)
+        if fields["telemetry"]:
+            print_to_blender_console(bridge_telemetry.format_record(fields["telemetry"]), 'INFO')
+
+        print_to_blender_console("Execution Successful.", 'INFO')
+        # Only a successful run lets skip-if-identical skip the next one
+        _code_cache.mark_run(job.name, job.digest)
+        job.set_state(bridge_protocol.STATE_DONE, output=output, **fields)
+        self.redraw(context)
+
+    def result_fields(self, job):
+        """Encodes the job's result (generator return value or `result` variable)."""
+        result = job.result
+        if result is None and job.namespace is not None:
+            result = job.namespace.get("result")
+        job.namespace = None
+        if result is None:
+            return {}
+        encoded, buffers = bridge_protocol.encode_result(result)
+        fields = {"result": encoded}
+        if buffers and job.result_transport == bridge_protocol.TRANSPORT_FILE:
+            fields["result_file"], fields["buffers"] = bridge_protocol.write_result_file(buffers)
+        elif buffers:
+            fields["_buffers"] = buffers
+        nbytes = sum(memoryview(b).nbytes for b in buffers)
+        if nbytes:
+            print_to_blender_console(f"Result: {len(buffers)} buffers, {nbytes / 1e6:.1f} MB via {job.result_transport}", 'INFO')
+        return fields
+
+    def fail_job(self, job):
+        # Capture traceback
+        tb = traceback.format_exc()
+        print_to_blender_console(tb, 'ERROR')
+        print_to_blender_console("Execution Failed.", 'ERROR')
+        job.set_state(bridge_protocol.STATE_FAILED, output=job.output.getvalue(), error=tb,
+                      telemetry=record_telemetry(job, bridge_protocol.STATE_FAILED))
+
+    def redraw(self, context):
+        for window in context.window_manager.windows:
+            for area in window.screen.areas:
+                area.tag_redraw()
 
     def execute(self, context):
         os.makedirs(os.path.dirname(WATCH_FILE), exist_ok=True)
@@ -96,11 +837,24 @@ class AntigravityBridgeOperator(bpy.types.Operator):
         except OSError:
             self._last_mtime = 0
 
+        # A previous run of this script may still own the port
+        old_server = bpy.app.driver_namespace.pop(SERVER_KEY, None)
+        if old_server:
+            old_server.stop()
+
+        server = BridgeServer()
+        try:
+            server.start()
+        except OSError as e:
+            self.report({'ERROR'}, f"Antigravity Bridge could not listen on {BRIDGE_HOST}:{BRIDGE_PORT}: {e}")
+            return {'CANCELLED'}
+        bpy.app.driver_namespace[SERVER_KEY] = server
+
         wm = context.window_manager
-        self._timer = wm.event_timer_add(CHECK_INTERVAL, window=context.window)
+        self._timer = wm.event_timer_add(TICK_INTERVAL, window=context.window)
         wm.modal_handler_add(self)
-        
-        msg = f"Antigravity Bridge Started. Connected to {WATCH_FILE}"
+
+        msg = f"Antigravity Bridge Started. Listening on {BRIDGE_HOST}:{BRIDGE_PORT}, watching {WATCH_FILE}"
         self.report({'INFO'}, msg)
         print_to_blender_console(msg, 'INFO')
         return {'RUNNING_MODAL'}
@@ -108,7 +862,19 @@ class AntigravityBridgeOperator(bpy.types.Operator):
     def cancel(self, context):
         wm = context.window_manager
         wm.event_timer_remove(self._timer)
+        if self._active_job:
+            job = self._active_job
+            job.generator.close()
+            self.end_active_job(context)
+            job.set_state(bridge_protocol.STATE_CANCELLED, output=job.output.getvalue(), slices=job.slice_summary(),
+                          telemetry=record_telemetry(job, bridge_protocol.STATE_CANCELLED))
+        server = bpy.app.driver_namespace.pop(SERVER_KEY, None)
+        if server:
+            server.stop()
+        _dispatcher.stop()
+        _job_queue.discard_results()
         print_to_blender_console("Antigravity Bridge Stopped.", 'INFO')
+        _console.flush(lines=CONSOLE_BUFFER_LINES)
 
 def register():
     bpy.utils.register_class(AntigravityBridgeOperator)
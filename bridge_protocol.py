@@ -0,0 +1,181 @@
+"""Wire protocol shared by the Antigravity bridge and its clients.
+
+Every message is one line of UTF-8 JSON terminated by a newline. This module
+has no Blender dependency so command line clients can import it as well.
+
+Job results are structured values. NumPy arrays inside them are not JSON
+encoded: they are replaced by {"__ndarray__": index, "dtype", "shape"}
+placeholders and their raw memory travels separately, either as binary
+frames right after the message line ("buffers": [nbytes, ...]) or in a
+shared-memory file ("result_file" plus "buffers": [{"offset", "nbytes"}]).
+"""
+import os
+import json
+import mmap
+import uuid
+import tempfile
+
+try:
+    import numpy as np
+except ImportError:
+    # Clients without NumPy receive raw memoryviews with dtype and shape
+    np = None
+
+# --- Configuration ---
+BRIDGE_HOST = "127.0.0.1"
+BRIDGE_PORT = 8765
+
+# Job states reported in "status" events
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+STATE_CANCELLED = "cancelled"
+FINAL_STATES = (STATE_DONE, STATE_FAILED, STATE_CANCELLED)
+
+# Priority lanes, lower value runs first. Jobs within a lane run FIFO.
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+DEFAULT_PRIORITY = "normal"
+
+# Where a job runs: the GUI Blender the bridge lives in, or the headless worker pool
+TARGET_INTERACTIVE = "interactive"
+TARGET_BACKGROUND = "background"
+TARGETS = (TARGET_INTERACTIVE, TARGET_BACKGROUND)
+
+# How result arrays are delivered
+TRANSPORT_SOCKET = "socket"
+TRANSPORT_FILE = "file"
+# Result files live in shared memory where the OS has it
+RESULT_DIR = os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "antigravity_results")
+BUFFER_ALIGN = 64
+
+
+def send_message(sock, message, buffers=()):
+    """Serializes a dict and writes it to the socket as a single line.
+
+    Buffers are written straight after the line without copying; their sizes
+    go into the message's "buffers" field.
+    """
+    if buffers:
+        message = dict(message, buffers=[memoryview(b).nbytes for b in buffers])
+    data = json.dumps(message) + "\n"
+    sock.sendall(data.encode("utf-8"))
+    for buf in buffers:
+        sock.sendall(memoryview(buf).cast('B'))
+
+
+def recv_message(reader):
+    """Reads the next message from a file object made with sock.makefile('rb').
+
+    Binary frames following the line replace the sizes in "buffers" with
+    bytearrays. Returns None once the peer has closed the connection.
+    """
+    line = reader.readline()
+    if not line:
+        return None
+    message = json.loads(line.decode("utf-8"))
+    if message.get("buffers") and "result_file" not in message:
+        message["buffers"] = [_read_exact(reader, n) for n in message["buffers"]]
+    return message
+
+
+def _read_exact(reader, nbytes):
+    buf = bytearray(nbytes)
+    view = memoryview(buf)
+    got = 0
+    while got < nbytes:
+        n = reader.readinto(view[got:])
+        if not n:
+            raise ConnectionError("Connection closed in the middle of a result buffer.")
+        got += n
+    return buf
+
+
+def encode_result(value):
+    """Splits a result into a JSON-safe value and a list of raw buffers.
+
+    Dicts, lists and tuples are walked; NumPy arrays become placeholders
+    referencing a buffer, NumPy scalars become Python numbers and anything
+    else that JSON cannot hold is sent as its repr().
+    """
+    buffers = []
+
+    def encode(v):
+        if isinstance(v, dict):
+            return {str(k): encode(x) for k, x in v.items()}
+        if isinstance(v, (list, tuple)):
+            return [encode(x) for x in v]
+        if v is None or isinstance(v, (bool, int, float, str)):
+            return v
+        if np is not None:
+            if isinstance(v, np.ndarray):
+                arr = np.ascontiguousarray(v)
+                buffers.append(arr)
+                return {"__ndarray__": len(buffers) - 1, "dtype": arr.dtype.str, "shape": list(arr.shape)}
+            if isinstance(v, np.generic):
+                return v.item()
+        if isinstance(v, (bytes, bytearray, memoryview)):
+            buffers.append(v)
+            return {"__bytes__": len(buffers) - 1}
+        return repr(v)
+
+    return encode(value), buffers
+
+
+def decode_result(value, buffers):
+    """Rebuilds a result from encode_result output, arrays are views on the buffers."""
+    if isinstance(value, dict):
+        if "__ndarray__" in value:
+            buf = buffers[value["__ndarray__"]]
+            if np is None:
+                return {"data": memoryview(buf), "dtype": value["dtype"], "shape": value["shape"]}
+            return np.frombuffer(buf, dtype=np.dtype(value["dtype"])).reshape(value["shape"])
+        if "__bytes__" in value:
+            return memoryview(buffers[value["__bytes__"]])
+        return {k: decode_result(v, buffers) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode_result(v, buffers) for v in value]
+    return value
+
+
+def write_result_file(buffers, directory=RESULT_DIR):
+    """Writes buffers into one shared-memory file. Returns (path, layout)."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"result_{uuid.uuid4().hex}.bin")
+    layout = []
+    offset = 0
+    with open(path, 'wb') as f:
+        for buf in buffers:
+            view = memoryview(buf).cast('B')
+            pad = -offset % BUFFER_ALIGN
+            f.write(b"\0" * pad)
+            offset += pad
+            f.write(view)
+            layout.append({"offset": offset, "nbytes": view.nbytes})
+            offset += view.nbytes
+    return path, layout
+
+
+def read_result_file(path, layout, remove=True):
+    """Maps a result file and returns one memoryview per buffer.
+
+    The file is unlinked once mapped (remove=True); the mapping stays valid.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        mapped = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) if size else b""
+    if remove:
+        os.remove(path)
+    view = memoryview(mapped)
+    return [view[b["offset"]:b["offset"] + b["nbytes"]] for b in layout]
+
+
+def message_result(message, remove=True):
+    """Decoded result of a final job event, whichever transport carried it."""
+    if "result" not in message:
+        return None
+    if "result_file" in message:
+        buffers = read_result_file(message["result_file"], message.get("buffers", []), remove)
+    else:
+        buffers = message.get("buffers", [])
+    return decode_result(message["result"], buffers)
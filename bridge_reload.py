@@ -0,0 +1,165 @@
+"""Dependency-aware hot reload for modules imported by bridge payloads.
+
+The bridge tracks every module a payload imports from its watched roots
+(the bridge folder plus any sys.path entry a payload adds). Before the next
+job it checks their files, and only modules whose content changed are
+reloaded, together with the tracked modules importing them, dependencies
+first. Everything else stays warm in sys.modules.
+"""
+import os
+import ast
+import sys
+import hashlib
+import importlib
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def imported_names(path, package=""):
+    """Absolute module names a source file imports, including `from pkg import mod`."""
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                parts = package.split(".") if package else []
+                parts = parts[:len(parts) - node.level + 1]
+                base = ".".join(p for p in parts + [base] if p)
+            if base:
+                names.add(base)
+            names.update(f"{base}.{alias.name}" if base else alias.name for alias in node.names)
+    return names
+
+
+class ModuleReloader:
+    """Tracks payload modules by file stat and hash and reloads the changed ones."""
+
+    def __init__(self, roots, ignore=()):
+        self.roots = [os.path.realpath(r) for r in roots]
+        self.ignore = set(ignore)
+        # sys.path as it was before any payload ran, later additions are watched too
+        self._base_path = set(sys.path)
+        self._tracked = {}   # module name -> (path, mtime_ns, size, digest)
+        self._deps = {}      # module name -> tracked modules it imports
+
+    def watched_roots(self):
+        extra = [os.path.realpath(p) for p in sys.path if p and p not in self._base_path and os.path.isdir(p)]
+        return self.roots + extra
+
+    def _module_file(self, module, roots):
+        path = getattr(module, "__file__", None)
+        if not path or not path.endswith(".py"):
+            return None
+        path = os.path.realpath(path)
+        if any(path.startswith(root + os.sep) for root in roots):
+            return path
+        return None
+
+    def track(self):
+        """Starts tracking modules loaded from the watched roots. Returns the new names."""
+        roots = self.watched_roots()
+        new = []
+        for name, module in list(sys.modules.items()):
+            if name in self._tracked or name in self.ignore or name == "__main__" or module is None:
+                continue
+            path = self._module_file(module, roots)
+            if path is None:
+                continue
+            self._record(name, path)
+            new.append(name)
+        if new:
+            self._update_deps()
+        return new
+
+    def _record(self, name, path):
+        st = os.stat(path)
+        self._tracked[name] = (path, st.st_mtime_ns, st.st_size, file_digest(path))
+
+    def _update_deps(self):
+        for name, (path, _mtime, _size, _digest) in self._tracked.items():
+            module = sys.modules.get(name)
+            package = getattr(module, "__package__", "") or ""
+            try:
+                names = imported_names(path, package)
+            except (OSError, SyntaxError):
+                continue
+            self._deps[name] = {n for n in names if n in self._tracked and n != name}
+
+    def changed(self):
+        """Tracked modules whose file content differs from the loaded version."""
+        dirty = []
+        for name, (path, mtime, size, digest) in list(self._tracked.items()):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if (st.st_mtime_ns, st.st_size) == (mtime, size):
+                continue
+            # Touched but identical content does not need a reload
+            new_digest = file_digest(path)
+            self._tracked[name] = (path, st.st_mtime_ns, st.st_size, new_digest)
+            if new_digest != digest:
+                dirty.append(name)
+        return dirty
+
+    def reload_order(self, dirty):
+        """Dirty modules plus their dependents, each after the modules it imports."""
+        dependents = {}
+        for name, deps in self._deps.items():
+            for dep in deps:
+                dependents.setdefault(dep, set()).add(name)
+
+        affected = set()
+        stack = list(dirty)
+        while stack:
+            name = stack.pop()
+            if name in affected:
+                continue
+            affected.add(name)
+            stack.extend(dependents.get(name, ()))
+
+        order = []
+        pending = {name: self._deps.get(name, set()) & affected for name in affected}
+        while pending:
+            ready = sorted(name for name, deps in pending.items() if not deps)
+            if not ready:
+                # Import cycle, reload the rest in name order
+                ready = sorted(pending)
+            for name in ready:
+                order.append(name)
+                del pending[name]
+            for deps in pending.values():
+                deps.difference_update(ready)
+        return order
+
+    def refresh(self):
+        """Reloads changed modules and their dependents.
+
+        Returns (reloaded names, {name: error message} for failed reloads).
+        """
+        dirty = self.changed()
+        if not dirty:
+            return [], {}
+        reloaded, errors = [], {}
+        for name in self.reload_order(dirty):
+            module = sys.modules.get(name)
+            if module is None:
+                self._tracked.pop(name, None)
+                continue
+            try:
+                importlib.reload(module)
+                reloaded.append(name)
+            except Exception as e:
+                errors[name] = f"{type(e).__name__}: {e}"
+            path = self._tracked[name][0]
+            if os.path.exists(path):
+                self._record(name, path)
+        self._update_deps()
+        return reloaded, errors
@@ -0,0 +1,102 @@
+"""Per-job execution telemetry for the Antigravity bridge and its workers.
+
+Records wall time, CPU time, peak Python memory (tracemalloc) and the number
+of datablocks in the main collections before and after each job, so leaks
+such as node groups piling up across repeated setup_scene runs show up.
+"""
+import bpy
+import json
+import time
+import threading
+import tracemalloc
+import collections
+
+DATABLOCK_COLLECTIONS = ("objects", "meshes", "materials", "actions", "node_groups")
+
+
+def count_datablocks():
+    return {name: len(getattr(bpy.data, name)) for name in DATABLOCK_COLLECTIONS}
+
+
+class JobTelemetry:
+    """Measures one job between start() and stop()."""
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.started = None
+        self._wall = 0.0
+        self._cpu = 0.0
+        self._before = None
+        self._mem_base = 0
+        self._owns_tracing = False
+
+    def start(self):
+        self._before = count_datablocks()
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._owns_tracing = True
+            tracemalloc.reset_peak()
+            self._mem_base = tracemalloc.get_traced_memory()[0]
+        self.started = time.time()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+
+    def stop(self, **fields):
+        """Returns the telemetry record, extra fields are stored alongside."""
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        peak = None
+        if self.trace_memory and tracemalloc.is_tracing():
+            peak = tracemalloc.get_traced_memory()[1] - self._mem_base
+            if self._owns_tracing:
+                tracemalloc.stop()
+                self._owns_tracing = False
+        after = count_datablocks()
+
+        record = dict(fields)
+        record.update({
+            "started": self.started,
+            "wall": wall,
+            "cpu": cpu,
+            "peak_memory": peak,
+            "datablocks_before": self._before,
+            "datablocks_after": after,
+            "datablocks_delta": {name: after[name] - self._before[name] for name in after},
+        })
+        return record
+
+
+class TelemetryLog:
+    """Appends records to a JSON-lines file and keeps the recent ones for queries."""
+
+    def __init__(self, path, keep=500):
+        self.path = path
+        self._recent = collections.deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def append(self, record):
+        with self._lock:
+            self._recent.append(record)
+            try:
+                with open(self.path, 'a') as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError as e:
+                print(f"Telemetry log not written: {e}")
+
+    def query(self, limit=20, name=None):
+        """Newest records first, optionally only jobs whose name contains `name`."""
+        with self._lock:
+            records = list(self._recent)
+        if name:
+            records = [r for r in records if name in r.get("name", "")]
+        return records[::-1][:limit]
+
+
+def format_record(record):
+    """One line summary for the console."""
+    delta = ", ".join(f"{k} {v:+d}" for k, v in record["datablocks_delta"].items() if v)
+    peak = record.get("peak_memory")
+    peak_text = f", peak {peak / 1e6:.1f} MB" if peak is not None else ""
+    return (f"{record['wall'] * 1000:.0f} ms wall, {record['cpu'] * 1000:.0f} ms CPU{peak_text}"
+            f", datablocks: {delta or 'unchanged'}")
@@ -0,0 +1,183 @@
+"""One row per building of an evaluated city, as columnar NumPy arrays.
+
+vcity_engine stores BuildingID, FootprintArea, Centroid and Part on the
+footprints, next to the Height, Floors, TaperFactor, MatID and
+BuildingColor attributes, and extrusion copies all of them to every face of
+the building. building_table() reads these face attributes in bulk and keeps
+the first face of each building. Windows, doors and antennas are counted
+from the BuildingID and Part of the instances (Blender 4.3+, with Realize
+Instances off; without instances these columns are left out).
+
+The columns use the building/<column> layout of city_numpy.save_npz(), so
+analytics need no mesh at all:
+
+    blender -b --factory-startup --python city_buildings.py -- --preset v25 --set Resolution=230 --out buildings.npz
+    blender -b city.blend --python city_buildings.py -- --object CityV25 --out buildings.npz
+
+    columns = city_buildings.load_npz("buildings.npz")
+    columns["height"].mean(), np.bincount(columns["mat_id"])
+"""
+import bpy
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+# Blender's --python doesn't put this folder on sys.path
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+import node_builder
+import vcity_engine
+from city_numpy import PART_BUILDING, PART_WINDOW, PART_DOOR, PART_ANTENNA
+from geometry_fingerprint import attribute_array
+from sweep import parse_values
+
+# Column -> face attribute, constant over the faces of a building
+COLUMNS = {
+    "centroid": "Centroid",
+    "footprint_area": "FootprintArea",
+    "height": "Height",
+    "floors": "Floors",
+    "taper": "TaperFactor",
+    "mat_id": "MatID",
+    "color": "BuildingColor",
+}
+# Count column -> Part of the instances counted
+DECORATIONS = {
+    "windows": PART_WINDOW,
+    "doors": PART_DOOR,
+    "antennas": PART_ANTENNA,
+}
+EVAL_OBJECT = "CityBuildings"
+
+
+def instance_attributes(obj_eval, names):
+    """name -> per-instance values of an evaluated object, or None before Blender 4.3."""
+    if not hasattr(obj_eval, "evaluated_geometry"):
+        return None
+    points = obj_eval.evaluated_geometry().instances_pointcloud()
+    values = {}
+    for name in names:
+        attr = points.attributes.get(name) if points is not None else None
+        values[name] = np.zeros(0, np.int32) if attr is None else np.empty(len(attr.data), np.int32)
+        if attr is not None:
+            attr.data.foreach_get("value", values[name])
+    return values
+
+
+def building_table(obj, depsgraph=None):
+    """column -> array with one row per building of an evaluated city object, sorted by id."""
+    depsgraph = depsgraph or bpy.context.evaluated_depsgraph_get()
+    obj_eval = obj.evaluated_get(depsgraph)
+    mesh = obj_eval.to_mesh()
+    try:
+        part, ids = attribute_array(mesh, "Part"), attribute_array(mesh, "BuildingID")
+        if part is None or ids is None:
+            raise ValueError(f"'{obj.name}' has no Part and BuildingID attributes, is it a vcity_engine city?")
+        faces = np.flatnonzero(part[:, 0] == PART_BUILDING)
+        building_ids, first = np.unique(ids[faces, 0], return_index=True)
+        rows = faces[first]
+        table = {"id": building_ids.astype(np.int32)}
+        for column, name in COLUMNS.items():
+            values = attribute_array(mesh, name)
+            if values is not None:
+                values = values[rows]
+                table[column] = values[:, 0] if values.shape[1] == 1 else values
+    finally:
+        obj_eval.to_mesh_clear()
+    # XY like city_numpy, RGB without alpha
+    if "centroid" in table:
+        table["centroid"] = np.ascontiguousarray(table["centroid"][:, :2])
+    if "color" in table:
+        table["color"] = np.ascontiguousarray(table["color"][:, :3])
+
+    instances = instance_attributes(obj_eval, ("Part", "BuildingID"))
+    if instances is None:
+        print("Warning: no instance attributes before Blender 4.3, decoration counts left out")
+        return table
+    if not len(instances["Part"]):
+        # Realized decorations are faces, all-zero counts would be wrong data
+        print(f"Warning: '{obj.name}' has no instances (Realize Instances on?), decoration counts left out")
+        return table
+    row = np.searchsorted(building_ids, instances["BuildingID"])
+    valid = row < len(building_ids)
+    valid[valid] = building_ids[row[valid]] == instances["BuildingID"][valid]
+    for column, decoration in DECORATIONS.items():
+        selected = valid & (instances["Part"] == decoration)
+        table[column] = np.bincount(row[selected], minlength=len(building_ids)).astype(np.int32)
+    return table
+
+
+def save_npz(path, table, params=None):
+    """building/<column> arrays in one uncompressed .npz, plus the params as JSON."""
+    arrays = {f"building/{k}": v for k, v in table.items()}
+    arrays["params"] = np.array(json.dumps(params or {}))
+    np.savez(path, **arrays)
+
+
+def load_npz(path):
+    """column -> array of a file written by save_npz() or city_numpy.save_npz()."""
+    with np.load(path) as data:
+        return {k[len("building/"):]: data[k] for k in data.files if k.startswith("building/")}
+
+
+def city_table(preset, params=None):
+    """building_table() of a vcity_engine preset evaluated at params, with its timings."""
+    ng = vcity_engine.create_city_nodes(preset)
+    mesh = bpy.data.meshes.new(EVAL_OBJECT)
+    obj = bpy.data.objects.new(EVAL_OBJECT, mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    try:
+        mod = obj.modifiers.new("Buildings", 'NODES')
+        mod.node_group = ng
+        # Decorations are counted from instances
+        node_builder.set_modifier_inputs(mod, dict(params or {}, **{"Realize Instances": False}))
+        start = time.perf_counter()
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        evaluated = time.perf_counter()
+        table = building_table(obj, depsgraph)
+        timings = {"evaluate": evaluated - start, "read": time.perf_counter() - evaluated}
+    finally:
+        bpy.data.objects.remove(obj)
+        bpy.data.meshes.remove(mesh)
+    return table, timings
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="city_buildings.py")
+    parser.add_argument("--preset", default="v25", choices=list(vcity_engine.PRESETS),
+                        help="City preset to evaluate, see vcity_engine.PRESETS.")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="City input value, e.g. Resolution=230.")
+    parser.add_argument("--object", help="Read this object of the open file instead of a preset.")
+    parser.add_argument("--out", default="buildings.npz", help="Output .npz file.")
+    args = parser.parse_args(argv)
+
+    params = {}
+    for item in args.set:
+        name, _, value = item.partition("=")
+        params[name] = parse_values(value)[0]
+
+    if args.object:
+        start = time.perf_counter()
+        table = building_table(bpy.data.objects[args.object])
+        timings = {"read": time.perf_counter() - start}
+    else:
+        table, timings = city_table(args.preset, params)
+        params = dict(params, preset=args.preset)
+    start = time.perf_counter()
+    save_npz(args.out, table, params)
+    timings["write"] = time.perf_counter() - start
+    print(f"{len(table['id'])} buildings, columns {', '.join(table)}")
+    print(", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in timings.items()))
+    print(f"Saved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Spatial index of an evaluated city, shared by every tool that queries it.
+
+get_index(obj) builds a CityIndex once per evaluated city and hands the same
+one to every caller until the city changes: its key hashes the modifier
+node groups (their spec fingerprint, or their nodes, settings and links when
+node_builder did not build them), their input values (a baked layout object
+by its layout key) and the object's transform and mesh, so changing a
+generator parameter or editing a group rebuilds the index on the next call.
+
+A CityIndex holds a BVHTree over the realized faces in world space and a
+KDTree over the building centroids (vcity_engine's BuildingID and Centroid
+attributes), and answers:
+
+    index = city_index.get_index(bpy.data.objects["CityV25"])
+    index.building_at(x, y)             # BuildingID under (x, y), or None
+    index.buildings_within(x, y, 10.0)  # [(BuildingID, distance), ...] by centroid
+    index.height_at(x, y)               # roof or ground z under (x, y), or None
+    index.ray_cast(origin, direction)   # first face hit, with its building and part
+    index.roof_faces(min_height=0.5)    # face indices of rooftops, vectorized
+
+Instances (windows, doors, antennas) are not in the BVH unless the city
+realizes them, wires never are.
+"""
+import bpy
+import json
+import time
+import hashlib
+
+import numpy as np
+from mathutils import Vector
+from mathutils.bvhtree import BVHTree
+from mathutils.kdtree import KDTree
+
+import node_builder
+import city_instances
+from city_numpy import PART_BUILDING, PART_WIRE
+from geometry_fingerprint import attribute_array
+from vcity_engine import LAYOUT_KEY
+
+# obj.name -> CityIndex
+_INDEXES = {}
+# Node properties that only change the editor view
+_UI_PROPERTIES = {"location", "width", "height", "width_hidden", "label", "select", "hide", "show_options",
+                  "show_preview", "show_texture", "use_custom_color", "color"}
+
+
+def _value_key(value):
+    if isinstance(value, bpy.types.ID):
+        # Baked layouts change under the same object name, their layout key does not
+        return [value.name, value.get(LAYOUT_KEY)]
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if hasattr(value, "__len__") and not isinstance(value, str):
+        return list(value)
+    return value
+
+
+def _group_key(ng):
+    """The spec fingerprint of a group built by ensure_tree, else its nodes, settings and links."""
+    fingerprint = ng.get(node_builder.FINGERPRINT_KEY)
+    if fingerprint is not None:
+        return fingerprint
+    nodes = []
+    for node in ng.nodes:
+        settings = [[prop.identifier, _value_key(getattr(node, prop.identifier))] for prop in node.bl_rna.properties
+                    if prop.type in {'BOOLEAN', 'INT', 'FLOAT', 'ENUM', 'STRING'} and not prop.is_readonly
+                    and prop.identifier not in _UI_PROPERTIES]
+        inputs = [_value_key(getattr(sock, "default_value", None)) for sock in node.inputs if not sock.is_linked]
+        nested = getattr(node, "node_tree", None)
+        nodes.append([node.name, node.bl_idname, settings, inputs, _group_key(nested) if nested else None])
+    links = [[link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier,
+              link.is_muted] for link in ng.links]
+    return [nodes, links]
+
+
+def city_key(obj):
+    """Hash of everything the evaluated city depends on that an index cares about."""
+    mesh = obj.data
+    parts = [obj.name, [list(row) for row in obj.matrix_world],
+             [mesh.name, len(mesh.vertices), len(mesh.polygons)] if isinstance(mesh, bpy.types.Mesh) else None]
+    for mod in obj.modifiers:
+        if mod.type != 'NODES' or mod.node_group is None:
+            continue
+        ng = mod.node_group
+        inputs = [[sock.name, _value_key(mod.get(sock.identifier))] for sock in node_builder.group_input_sockets(ng)]
+        parts.append([mod.name, mod.show_viewport, ng.name, _group_key(ng), inputs])
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+class CityIndex:
+    """BVHTree of the faces and KDTree of the building centroids of one evaluated city."""
+
+    def __init__(self, obj, depsgraph=None):
+        start = time.perf_counter()
+        depsgraph = depsgraph or bpy.context.evaluated_depsgraph_get()
+        self.name = obj.name
+        self.key = city_key(obj)
+        matrix = np.array(obj.matrix_world, dtype=np.float64)
+
+        obj_eval = obj.evaluated_get(depsgraph)
+        mesh = obj_eval.to_mesh()
+        try:
+            arrays = city_instances.mesh_arrays(mesh)
+            count = len(arrays["face_sizes"])
+            normals = np.empty(count * 3, dtype=np.float32)
+            mesh.polygons.foreach_get("normal", normals)
+            areas = np.empty(count, dtype=np.float32)
+            mesh.polygons.foreach_get("area", areas)
+            part = attribute_array(mesh, "Part")
+            building = attribute_array(mesh, "BuildingID")
+            centroid = attribute_array(mesh, "Centroid")
+        finally:
+            obj_eval.to_mesh_clear()
+
+        # Everything in world space
+        positions = arrays["positions"] @ matrix[:3, :3].T + matrix[:3, 3]
+        normals = normals.reshape(-1, 3) @ np.linalg.inv(matrix[:3, :3])
+        normals /= np.maximum(np.linalg.norm(normals, axis=1, keepdims=True), 1e-12)
+        self.positions = positions.astype(np.float32)
+        self.face_sizes = arrays["face_sizes"]
+        self.corner_verts = arrays["corner_verts"]
+        self.face_normals = normals.astype(np.float32)
+        self.face_areas = areas
+        offsets = self.face_offsets = np.zeros(count, dtype=np.int64)
+        np.cumsum(self.face_sizes[:-1], out=offsets[1:])
+        corners = self.positions[self.corner_verts].astype(np.float64)
+        self.face_centers = (np.add.reduceat(corners, offsets, axis=0) / self.face_sizes[:, None]).astype(np.float32) \
+            if count else np.zeros((0, 3), np.float32)
+        # Cities without vcity_engine attributes index their faces only
+        self.face_part = part[:, 0] if part is not None else np.full(count, PART_BUILDING, np.int32)
+        self.face_building = building[:, 0] if building is not None else np.full(count, -1, np.int32)
+
+        # Wires hang over the roofs, they stay out of the BVH. bvh_faces maps
+        # BVH polygon indices back to mesh faces
+        polygons = np.split(self.corner_verts, offsets[1:]) if count else []
+        self.bvh_faces = np.flatnonzero(self.face_part != PART_WIRE)
+        self.bvh = BVHTree.FromPolygons(self.positions.tolist(), [polygons[f].tolist() for f in self.bvh_faces])
+        self.top = float(self.positions[:, 2].max()) + 1.0 if len(self.positions) else 1.0
+
+        # One centroid per building, from its first face
+        faces = np.flatnonzero((self.face_part == PART_BUILDING) & (self.face_building >= 0))
+        self.buildings, first = np.unique(self.face_building[faces], return_index=True)
+        if centroid is not None:
+            centroids = centroid[faces[first]].astype(np.float64) @ matrix[:3, :3].T + matrix[:3, 3]
+        else:
+            centroids = self.face_centers[faces[first]].astype(np.float64)
+        self.centroids = centroids.astype(np.float32)
+        self.kd = KDTree(len(self.buildings))
+        for i, c in enumerate(self.centroids):
+            self.kd.insert((c[0], c[1], 0.0), i)
+        self.kd.balance()
+        print(f"City index of {obj.name}: {count} faces, {len(self.buildings)} buildings in "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms")
+
+    def ray_cast(self, origin, direction, distance=1.0e10):
+        """First face hit: {"location", "normal", "face", "building", "part", "distance"}, or None."""
+        location, normal, face, hit_distance = self.bvh.ray_cast(Vector(origin), Vector(direction), distance)
+        if location is None:
+            return None
+        face = int(self.bvh_faces[face])
+        building = int(self.face_building[face])
+        return {
+            "location": location, "normal": normal, "face": face, "distance": hit_distance,
+            "building": building if building >= 0 and self.face_part[face] == PART_BUILDING else None,
+            "part": int(self.face_part[face]),
+        }
+
+    def _down(self, x, y):
+        return self.ray_cast((x, y, self.top), (0.0, 0.0, -1.0))
+
+    def height_at(self, x, y):
+        """z of the roof or ground under (x, y), or None outside the city."""
+        hit = self._down(x, y)
+        return hit["location"].z if hit else None
+
+    def building_at(self, x, y):
+        """BuildingID of the building under (x, y), or None over a road or outside."""
+        hit = self._down(x, y)
+        return hit["building"] if hit else None
+
+    def buildings_within(self, x, y, radius):
+        """[(BuildingID, distance)] of the buildings whose centroid is within radius of (x, y), nearest first."""
+        found = self.kd.find_range((x, y, 0.0), radius)
+        return [(int(self.buildings[i]), d) for _co, i, d in sorted(found, key=lambda f: f[2])]
+
+    def nearest_building(self, x, y):
+        """(BuildingID, distance) of the closest building centroid, or None without buildings."""
+        if not len(self.buildings):
+            return None
+        _co, i, d = self.kd.find((x, y, 0.0))
+        return int(self.buildings[i]), d
+
+    def roof_faces(self, min_height=0.0, min_normal_z=0.9):
+        """Indices of upward faces of buildings whose center is above min_height."""
+        return np.flatnonzero((self.face_part == PART_BUILDING) & (self.face_normals[:, 2] > min_normal_z)
+                              & (self.face_centers[:, 2] > min_height))
+
+    def face_corners(self, face):
+        """(N, 3) world positions of a face's corners."""
+        start = self.face_offsets[face]
+        return self.positions[self.corner_verts[start:start + self.face_sizes[face]]]
+
+
+def get_index(obj, depsgraph=None):
+    """The shared CityIndex of obj, rebuilt only when its city_key() changed."""
+    index = _INDEXES.get(obj.name)
+    if index is None or index.key != city_key(obj):
+        index = _INDEXES[obj.name] = CityIndex(obj, depsgraph)
+    return index
+
+
+def clear():
+    _INDEXES.clear()
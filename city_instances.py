@@ -0,0 +1,168 @@
+"""Reads generated cities with their window, door and antenna instances kept as instances.
+
+The v25 group outputs instances unless its Realize Instances input is on.
+split_instances() returns the realized part of an evaluated object as mesh
+arrays, one prototype mesh per distinct instance geometry, and a compact
+(N, 4, 4) transform array with the prototype index of every instance, all in
+object space. instance_counts() compares that with what realizing would
+cost.
+
+Before Blender 4.3 the instances come from depsgraph.object_instances. An
+export of many objects walks it once with group_instances() and passes the
+result to every split_instances() call.
+"""
+import bpy
+import numpy as np
+
+
+def mesh_arrays(mesh):
+    """positions (V, 3), face_sizes (F,) and corner_verts (C,) of a mesh, read in bulk."""
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    face_sizes = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", face_sizes)
+    corner_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", corner_verts)
+    return {"positions": positions.reshape(-1, 3), "face_sizes": face_sizes, "corner_verts": corner_verts}
+
+
+def _instances_from_geometry(obj_eval):
+    """Blender 4.3+: instance references and transforms straight from the evaluated geometry."""
+    geometry = obj_eval.evaluated_geometry()
+    points = geometry.instances_pointcloud()
+    if points is None or len(points.points) == 0:
+        return [], np.zeros(0, np.int32), np.zeros((0, 4, 4), np.float32)
+    count = len(points.points)
+    reference = np.empty(count, dtype=np.int32)
+    points.attributes[".reference_index"].data.foreach_get("value", reference)
+    transforms = np.empty(count * 16, dtype=np.float32)
+    points.attributes["instance_transform"].data.foreach_get("value", transforms)
+    # Stored column-major, transpose to the usual row-major matrices
+    transforms = transforms.reshape(-1, 4, 4).transpose(0, 2, 1)
+
+    prototypes = []
+    for ref in geometry.instance_references():
+        mesh = getattr(ref, "mesh", None) or getattr(ref, "data", None)
+        prototypes.append(mesh_arrays(mesh) if isinstance(mesh, bpy.types.Mesh) else None)
+    return prototypes, reference, np.ascontiguousarray(transforms)
+
+
+def group_instances(depsgraph):
+    """Mesh instances of the depsgraph by parent name, [(mesh, matrix_world)], in one walk.
+
+    Returns None from Blender 4.3 on, where split_instances() reads the evaluated geometry instead.
+    """
+    if bpy.app.version >= (4, 3, 0):
+        return None
+    grouped = {}
+    for inst in depsgraph.object_instances:
+        if not inst.is_instance or inst.parent is None:
+            continue
+        data = inst.object.data
+        if isinstance(data, bpy.types.Mesh):
+            # The instance iterator reuses its items, keep a copy of the matrix
+            grouped.setdefault(inst.parent.original.name, []).append((data, inst.matrix_world.copy()))
+    return grouped
+
+
+def _instances_from_depsgraph(obj, instances):
+    """Older Blender: the grouped depsgraph instances of obj, one prototype per instanced mesh."""
+    to_local = obj.matrix_world.inverted()
+    prototypes, keys, reference, matrices = [], {}, [], []
+    for data, matrix_world in instances.get(obj.name, ()):
+        key = data.as_pointer()
+        if key not in keys:
+            keys[key] = len(prototypes)
+            prototypes.append(mesh_arrays(data))
+        reference.append(keys[key])
+        m = to_local @ matrix_world
+        matrices.append([v for row in m for v in row])
+    transforms = np.array(matrices, dtype=np.float32).reshape(-1, 4, 4)
+    return prototypes, np.array(reference, dtype=np.int32), transforms
+
+
+def split_instances(obj, depsgraph=None, include_mesh=True, instances=None):
+    """Returns {"mesh", "prototypes", "reference", "transforms"} for an evaluated object.
+
+    include_mesh=False skips reading the realized part, for callers that have it already.
+    instances is group_instances() of the depsgraph, shared across the objects of an export;
+    it is only used before Blender 4.3 and walked here when missing.
+    """
+    depsgraph = depsgraph or bpy.context.evaluated_depsgraph_get()
+    obj_eval = obj.evaluated_get(depsgraph)
+    realized = None
+    if include_mesh:
+        mesh = obj_eval.to_mesh()
+        try:
+            # to_mesh() holds only the realized part, the instances stay out of it
+            realized = mesh_arrays(mesh)
+        finally:
+            obj_eval.to_mesh_clear()
+    if hasattr(obj_eval, "evaluated_geometry"):
+        prototypes, reference, transforms = _instances_from_geometry(obj_eval)
+    else:
+        if instances is None:
+            instances = group_instances(depsgraph)
+        prototypes, reference, transforms = _instances_from_depsgraph(obj, instances)
+    return {"mesh": realized, "prototypes": prototypes, "reference": reference, "transforms": transforms}
+
+
+def instance_counts(split):
+    """Vertex and face counts as stored with instances versus fully realized."""
+    mesh = split["mesh"] or {"positions": (), "face_sizes": ()}
+    per_ref = np.bincount(split["reference"], minlength=len(split["prototypes"]))
+    proto_verts = np.array([len(p["positions"]) if p else 0 for p in split["prototypes"]], dtype=np.int64)
+    proto_faces = np.array([len(p["face_sizes"]) if p else 0 for p in split["prototypes"]], dtype=np.int64)
+    return {
+        "instances": int(len(split["reference"])),
+        "prototypes": len(split["prototypes"]),
+        "stored_vertices": int(len(mesh["positions"]) + proto_verts.sum()),
+        "stored_faces": int(len(mesh["face_sizes"]) + proto_faces.sum()),
+        "realized_vertices": int(len(mesh["positions"]) + (per_ref * proto_verts).sum()),
+        "realized_faces": int(len(mesh["face_sizes"]) + (per_ref * proto_faces).sum()),
+    }
+
+
+def format_counts(name, counts):
+    ratio = counts["realized_vertices"] / max(counts["stored_vertices"], 1)
+    return (f"{name}: {counts['instances']} instances of {counts['prototypes']} prototypes, "
+            f"{counts['stored_vertices']} vertices stored vs {counts['realized_vertices']} realized ({ratio:.1f}x)")
+
+
+def instances_json(split, matrix=None, digits=None):
+    """JSON-ready prototypes and flat 16-float transforms, optionally moved by matrix (e.g. matrix_world)."""
+    transforms = split["transforms"]
+    if matrix is not None:
+        transforms = np.asarray(matrix, dtype=np.float32) @ transforms
+
+    def values(a):
+        return (np.round(a, digits) if digits is not None else a).tolist()
+
+    def faces(p):
+        return [f.tolist() for f in np.split(p["corner_verts"], np.cumsum(p["face_sizes"])[:-1])]
+
+    return {
+        "prototypes": [{"vertices": values(p["positions"]), "faces": faces(p)} if p else None
+                       for p in split["prototypes"]],
+        "reference": split["reference"].tolist(),
+        "transforms": values(transforms.reshape(-1, 16)),
+    }
+
+
+def save_npz(path, split):
+    """mesh/*, proto<i>/* and instances/{reference,transforms} arrays in one .npz."""
+    arrays = {f"mesh/{k}": v for k, v in split["mesh"].items()}
+    for i, proto in enumerate(split["prototypes"]):
+        for k, v in (proto or {}).items():
+            arrays[f"proto{i}/{k}"] = v
+    arrays["instances/reference"] = split["reference"]
+    arrays["instances/transforms"] = split["transforms"]
+    np.savez(path, **arrays)
+
+
+if __name__ == "__main__":
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    instances = group_instances(depsgraph)
+    for obj in bpy.context.scene.objects:
+        if obj.type == 'MESH' and any(m.type == 'NODES' for m in obj.modifiers):
+            print(format_counts(obj.name, instance_counts(split_instances(obj, depsgraph, instances=instances))))
@@ -0,0 +1,65 @@
+import bpy
+from mathutils import Vector
+
+import city_numpy
+import node_builder
+
+# Sets the LOD input of generated city objects from their distance to the camera.
+# LOD0 full detail, LOD1 without windows and doors, LOD2 flat-roof boxes.
+#
+#   import city_lod
+#   city_lod.assign_lods()              # once, for the scene camera
+#   city_lod.enable_auto_lod()          # keep following the camera on frame changes
+
+def city_modifiers(objects=None):
+    """(object, modifier) pairs of geometry-nodes modifiers that have an LOD input."""
+    pairs = []
+    for obj in objects if objects is not None else bpy.context.scene.objects:
+        for mod in obj.modifiers:
+            if mod.type != 'NODES' or not mod.node_group:
+                continue
+            if any(sock.name == "LOD" for sock in node_builder.group_input_sockets(mod.node_group)):
+                pairs.append((obj, mod))
+    return pairs
+
+def distance_to_bounds(obj, point):
+    """Distance from a world point to the object's world-space bounding box (0 inside)."""
+    corners = [obj.matrix_world @ Vector(c) for c in obj.bound_box]
+    lo = Vector([min(c[i] for c in corners) for i in range(3)])
+    hi = Vector([max(c[i] for c in corners) for i in range(3)])
+    nearest = Vector([min(max(point[i], lo[i]), hi[i]) for i in range(3)])
+    return (point - nearest).length
+
+def assign_lods(camera=None, objects=None, thresholds=city_numpy.LOD_DISTANCES):
+    """Sets each city object's LOD from its distance to the camera. Returns {name: lod}."""
+    camera = camera or bpy.context.scene.camera
+    if camera is None:
+        print("No camera, LODs unchanged")
+        return {}
+    eye = camera.matrix_world.translation
+    lods = {}
+    for obj, mod in city_modifiers(objects):
+        lod = city_numpy.lod_for_distance(distance_to_bounds(obj, eye), thresholds)
+        lods[obj.name] = lod
+        # Only write changes, every write re-evaluates the modifier
+        current = [mod[s.identifier] for s in node_builder.group_input_sockets(mod.node_group) if s.name == "LOD"]
+        if current and current[0] != lod:
+            node_builder.set_modifier_inputs(mod, {"LOD": lod})
+    return lods
+
+@bpy.app.handlers.persistent
+def _auto_lod_handler(scene, *args):
+    assign_lods(scene.camera)
+
+def enable_auto_lod():
+    disable_auto_lod()
+    bpy.app.handlers.frame_change_post.append(_auto_lod_handler)
+    assign_lods()
+
+def disable_auto_lod():
+    handlers = bpy.app.handlers.frame_change_post
+    for h in [h for h in handlers if getattr(h, "__name__", "") == "_auto_lod_handler"]:
+        handlers.remove(h)
+
+if __name__ == "__main__":
+    print(assign_lods())
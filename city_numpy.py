@@ -0,0 +1,459 @@
+"""NumPy reference implementation of the Voronoi city pipeline.
+
+Runs the same stages as the v25 geometry-node tree without Blender:
+MeshGrid -> noise SetPosition -> Triangulate -> DualMesh -> per-cell MatID,
+TaperFactor, height and floor count -> SplitEdges + ScaleElements -> one
+ExtrudeMesh / taper per floor. Parameters use the node group's socket names:
+
+    city = generate_city({"Resolution": 300, "Seed": 7})
+    city["positions"], city["face_sizes"], city["corner_verts"]   # the mesh
+    city["face_attributes"]["MatID"]                               # per face
+    city["buildings"]["height"]                                    # per Voronoi cell
+
+Meshes use Blender's flattened layout (face sizes plus corner vertex
+indices), so they can be compared with foreach_get arrays or loaded with
+mesh.from_pydata. Random values are hashed from (cell id, seed) and the
+noise is a seeded Perlin noise, so results are deterministic but not
+bit-identical to Blender's own noise and random hashes. The window, door,
+antenna and wire decorations are not part of this engine, so LOD 0 and 1
+are the same here and LOD 2 gives flat-roof boxes.
+
+    python3 city_numpy.py --param Resolution=300 --param Seed=7 --out city.npz
+"""
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+# --- Configuration (the constants baked into the v25 tree) ---
+DEFAULTS = {
+    "Resolution": 30,
+    "Street Width": 0.75,
+    "Min Height": 1.0,
+    "Max Height": 6.0,
+    "Max Floors": 4,
+    "Floor Height": 0.0,
+    "Seed": 700,
+    "Color Seed": 123,
+    "Palette Size": 4,
+    "Min Taper": 0.8,
+    "Max Taper": 1.0,
+    "Taper Seed": 456,
+    "LOD": 0,
+}
+GRID_SIZE = 50.0
+NOISE_SCALE = 5.0
+NOISE_DETAIL = 2.0
+DISTORTION = 5.0
+# MatID is floor(random(1, Palette Size + MAT_PAD))
+MAT_PAD = 0.99
+# HSV saturation and value of the building palette, hues are evenly spaced
+PALETTE_SATURATION = 0.75
+PALETTE_VALUE = 0.7
+BUILDING_LIFT = 0.005
+# Camera distances where LOD1 and LOD2 start
+LOD_DISTANCES = (80.0, 200.0)
+
+PART_ROAD = 0
+PART_BUILDING = 1
+# Parts only the node tree has
+PART_WINDOW = 2
+PART_DOOR = 3
+PART_ANTENNA = 4
+PART_WIRE = 5
+
+
+# --- Hashed random values ---
+
+def hash_uint64(ids, seed):
+    """splitmix64 of (id, seed), stable across platforms and array sizes."""
+    with np.errstate(over='ignore'):
+        x = np.asarray(ids, dtype=np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+        x ^= np.uint64((int(seed) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF)
+        x ^= x >> np.uint64(30)
+        x *= np.uint64(0xBF58476D1CE4E5B9)
+        x ^= x >> np.uint64(27)
+        x *= np.uint64(0x94D049BB133111EB)
+        x ^= x >> np.uint64(31)
+    return x
+
+
+def random_float(ids, seed, low, high):
+    """Per-element random value in [low, high), like Random Value with ID and Seed."""
+    unit = (hash_uint64(ids, seed) >> np.uint64(40)).astype(np.float64) / float(1 << 24)
+    return low + (high - low) * unit
+
+
+# --- Noise ---
+
+def _fade(t):
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+
+def perlin_noise(points, seed):
+    """Improved Perlin noise in [-1, 1] for (N, 3) points, permutation seeded by seed."""
+    perm = np.argsort(hash_uint64(np.arange(256), seed)).astype(np.int64)
+    perm = np.concatenate([perm, perm])
+    cell = np.floor(points)
+    i = cell.astype(np.int64) & 255
+    f = points - cell
+    u = _fade(f)
+
+    def grad(h, x, y, z):
+        h = h & 15
+        a = np.where(h < 8, x, y)
+        b = np.where(h < 4, y, np.where((h == 12) | (h == 14), x, z))
+        return np.where(h & 1, -a, a) + np.where(h & 2, -b, b)
+
+    x, y, z = f[:, 0], f[:, 1], f[:, 2]
+    xi, yi, zi = i[:, 0], i[:, 1], i[:, 2]
+    a = perm[xi] + yi
+    b = perm[xi + 1] + yi
+    aa, ab, ba, bb = perm[a] + zi, perm[a + 1] + zi, perm[b] + zi, perm[b + 1] + zi
+
+    def lerp(t, p, q):
+        return p + t * (q - p)
+
+    ux, uy, uz = u[:, 0], u[:, 1], u[:, 2]
+    return lerp(uz,
+                lerp(uy, lerp(ux, grad(perm[aa], x, y, z), grad(perm[ba], x - 1, y, z)),
+                     lerp(ux, grad(perm[ab], x, y - 1, z), grad(perm[bb], x - 1, y - 1, z))),
+                lerp(uy, lerp(ux, grad(perm[aa + 1], x, y, z - 1), grad(perm[ba + 1], x - 1, y, z - 1)),
+                     lerp(ux, grad(perm[ab + 1], x, y - 1, z - 1), grad(perm[bb + 1], x - 1, y - 1, z - 1))))
+
+
+def fractal_noise(points, seed, detail=NOISE_DETAIL, roughness=0.5):
+    """Noise Texture style fBm remapped to [0, 1]."""
+    total, amplitude, norm, scale = 0.0, 1.0, 0.0, 1.0
+    for _ in range(int(detail) + 1):
+        total = total + amplitude * perlin_noise(points * scale, seed)
+        norm += amplitude
+        amplitude *= roughness
+        scale *= 2.0
+    return 0.5 + 0.5 * total / norm
+
+
+# --- Stages ---
+
+def mesh_grid(resolution, size=GRID_SIZE):
+    """Grid vertices (R*R, 3) and quads (F, 4), in MeshGrid's vertex order."""
+    r = int(resolution)
+    return grid_block((r, r), (0, r), (0, r), size / (r - 1))
+
+
+def grid_block(world_shape, i_range, j_range, spacing):
+    """Vertices and quads of the part [i0, i1) x [j0, j1) of a world grid.
+
+    The world grid has world_shape (nx, ny) vertices spaced `spacing` apart
+    and is centered on the origin, so a block's positions do not depend on
+    how the world is split.
+    """
+    nx, ny = world_shape
+    (i0, i1), (j0, j1) = i_range, j_range
+    x = (np.arange(i0, i1) - (nx - 1) / 2) * spacing
+    y = (np.arange(j0, j1) - (ny - 1) / 2) * spacing
+    x, y = np.meshgrid(x, y, indexing='ij')
+    positions = np.stack([x.ravel(), y.ravel(), np.zeros(x.size)], axis=1)
+    rows = j1 - j0
+    v = (np.arange(i1 - i0 - 1)[:, None] * rows + np.arange(rows - 1)[None, :]).ravel()
+    quads = np.stack([v, v + rows, v + rows + 1, v + 1], axis=1)
+    return positions, quads
+
+
+def distort(positions, seed):
+    """SetPosition offset: (noise color - 0.5) * DISTORTION, flattened to XY."""
+    p = positions * NOISE_SCALE
+    # W = Seed of the 4D noise, folded into the permutation and a coordinate shift
+    offset_x = fractal_noise(p + 17.31 * (seed % 97), seed) - 0.5
+    offset_y = fractal_noise(p + 17.31 * (seed % 97) + 113.7, seed) - 0.5
+    out = positions.copy()
+    out[:, 0] += offset_x * DISTORTION
+    out[:, 1] += offset_y * DISTORTION
+    return out
+
+
+def triangulate(positions, quads):
+    """Splits each quad along its shorter diagonal."""
+    a, b, c, d = quads.T
+    ac = np.linalg.norm(positions[a] - positions[c], axis=1)
+    bd = np.linalg.norm(positions[b] - positions[d], axis=1)
+    use_ac = ac <= bd
+    first = np.where(use_ac[:, None], np.stack([a, b, c], 1), np.stack([a, b, d], 1))
+    second = np.where(use_ac[:, None], np.stack([a, c, d], 1), np.stack([b, c, d], 1))
+    return np.concatenate([first, second])
+
+
+def dual_mesh(positions, tris, sites):
+    """Voronoi-like cells: one face around the triangle centroids of each site vertex.
+
+    sites is a boolean mask of the vertices that get a cell. Returns (cell
+    positions, face_sizes, corner_verts, site vertex per face), with only the
+    centroids the cells use. Like DualMesh without Keep Boundaries, callers
+    leave boundary vertices out of sites.
+    """
+    vert = tris.ravel()
+    tri = np.repeat(np.arange(len(tris)), 3)
+    keep = sites[vert]
+    vert, tri = vert[keep], tri[keep]
+
+    used, tri = np.unique(tri, return_inverse=True)
+    centroids = positions[tris[used]].mean(axis=1)
+
+    d = centroids[tri] - positions[vert]
+    angle = np.arctan2(d[:, 1], d[:, 0])
+    order = np.lexsort((angle, vert))
+    vert, tri = vert[order], tri[order]
+
+    site_ids, face_sizes = np.unique(vert, return_counts=True)
+    return centroids, face_sizes.astype(np.int32), tri.astype(np.int32), site_ids
+
+
+def face_offsets(face_sizes):
+    offsets = np.zeros(len(face_sizes), dtype=np.int64)
+    np.cumsum(face_sizes[:-1], out=offsets[1:])
+    return offsets
+
+
+def face_centers(corner_positions, face_sizes):
+    return np.add.reduceat(corner_positions, face_offsets(face_sizes), axis=0) / face_sizes[:, None]
+
+
+def polygon_areas(corner_positions, face_sizes):
+    """Shoelace area of each flattened XY polygon."""
+    offsets = face_offsets(face_sizes)
+    nxt = next_corner(face_sizes)
+    x, y = corner_positions[:, 0], corner_positions[:, 1]
+    cross = x * y[nxt] - x[nxt] * y
+    return 0.5 * np.abs(np.add.reduceat(cross, offsets))
+
+
+def next_corner(face_sizes):
+    """Index of the following corner within the same face, wrapping around."""
+    offsets = face_offsets(face_sizes)
+    idx = np.arange(int(face_sizes.sum()))
+    nxt = idx + 1
+    last = offsets + face_sizes - 1
+    nxt[last] = offsets
+    return nxt
+
+
+def palette_colors(mat_id, palette_size):
+    """(N, 3) RGB of MatIDs, as the tree's Combine Color (HSV) node computes BuildingColor."""
+    h = (np.asarray(mat_id, dtype=np.float64) - 1.0) / palette_size % 1.0 * 6.0
+    sector = np.floor(h).astype(np.int64) % 6
+    f = h - np.floor(h)
+    s, v = PALETTE_SATURATION, PALETTE_VALUE
+    p, q, t = np.full_like(f, v * (1 - s)), v * (1 - s * f), v * (1 - s * (1 - f))
+    vv = np.full_like(f, v)
+    rgb = np.select([sector[:, None] == k for k in range(6)], [
+        np.stack(c, axis=1) for c in ((vv, t, p), (q, vv, p), (p, vv, t), (p, q, vv), (t, p, vv), (vv, p, q))])
+    return rgb.astype(np.float32)
+
+
+def floors_for_height(height, floor_height, max_floors):
+    """Floors per building: max_floors, or one per floor_height of height (1 to max_floors) if that is set."""
+    if floor_height <= 0:
+        return np.full(len(height), int(max_floors), dtype=np.int32)
+    return np.clip(np.ceil(height / floor_height), 1, max_floors).astype(np.int32)
+
+
+def extrude_floors(footprint, face_sizes, floor_height, taper, floors):
+    """Extrudes every footprint floors[i] times, scaling each new top by its taper.
+
+    footprint holds the split (per-face) corner positions and floors is an
+    int or a count per footprint. Returns positions, face_sizes, corner_verts
+    and the building index of each face, with the side quads floor by floor
+    followed by the top faces. Buildings with fewer floors simply drop out of
+    the higher rings, so the mesh grows with the real floor count.
+    """
+    k = len(footprint)
+    n_faces = len(face_sizes)
+    building = np.repeat(np.arange(n_faces), face_sizes)
+    center = face_centers(footprint, face_sizes)[building]
+    corner_floors = np.broadcast_to(np.asarray(floors, dtype=np.int64), (n_faces,))[building]
+    top_floor = int(corner_floors.max(initial=0))
+
+    # ring_index[f, c]: vertex of corner c on ring f, for the corners that reach it
+    rings, ring_index, count = [], np.full((top_floor + 1, k), -1, dtype=np.int64), 0
+    for f in range(top_floor + 1):
+        present = np.flatnonzero(corner_floors >= f)
+        ring = center[present] + (footprint[present] - center[present]) * (taper[building[present]] ** f)[:, None]
+        ring[:, 2] = footprint[present, 2] + f * floor_height[building[present]]
+        rings.append(ring)
+        ring_index[f, present] = count + np.arange(len(present))
+        count += len(present)
+    positions = np.concatenate(rings)
+
+    nxt = next_corner(face_sizes)
+    sides, side_building = [], []
+    for f in range(top_floor):
+        c = np.flatnonzero(corner_floors > f)
+        lo, hi = ring_index[f], ring_index[f + 1]
+        sides.append(np.stack([lo[c], lo[nxt[c]], hi[nxt[c]], hi[c]], axis=1))
+        side_building.append(building[c])
+    sides = np.concatenate(sides) if sides else np.zeros((0, 4), dtype=np.int64)
+    tops = ring_index[corner_floors, np.arange(k)]
+
+    face_sizes_out = np.concatenate([np.full(len(sides), 4, dtype=np.int32), face_sizes])
+    corner_verts = np.concatenate([sides.ravel(), tops]).astype(np.int32)
+    face_building = np.concatenate(side_building + [np.arange(n_faces)])
+    return positions, face_sizes_out, corner_verts, face_building
+
+
+def lod_for_distance(distance, thresholds=LOD_DISTANCES):
+    """LOD tier for a camera distance: 0 closer than thresholds[0], 2 beyond thresholds[1]."""
+    return int(np.searchsorted(thresholds, distance, side='right'))
+
+
+# --- Pipeline ---
+
+def generate_city(params=None, timings=None):
+    """Builds the city for params (socket name -> value, missing ones use DEFAULTS).
+
+    Returns a dict with the joined mesh (positions, face_sizes, corner_verts),
+    face_attributes (MatID, TaperFactor, BuildingID, Part) and buildings, one
+    column per Voronoi cell. Stage times in seconds go into timings if given.
+    """
+    p = dict(DEFAULTS, **(params or {}))
+    r = max(int(p["Resolution"]), 3)
+    return generate_block(p, (r, r), ((0, r), (0, r)), timings)
+
+
+def generate_block(params, world_shape, owned, timings=None):
+    """Builds the cells whose site vertices lie in owned ((i0, i1), (j0, j1)) of the world grid.
+
+    The world grid has world_shape vertices, Resolution - 1 intervals per
+    GRID_SIZE. A one-vertex halo around the owned range is generated too, so
+    every owned cell is complete. Noise uses world positions and random
+    values use global cell ids (the site's world vertex index), so blocks of
+    the same world agree exactly where they meet.
+    """
+    p = dict(DEFAULTS, **(params or {}))
+    timings = {} if timings is None else timings
+    clock = [time.perf_counter()]
+
+    def lap(stage):
+        now = time.perf_counter()
+        timings[stage] = now - clock[0]
+        clock[0] = now
+
+    nx, ny = world_shape
+    (i0, i1), (j0, j1) = owned
+    spacing = GRID_SIZE / (max(int(p["Resolution"]), 3) - 1)
+    bi, bj = (max(i0 - 1, 0), min(i1 + 1, nx)), (max(j0 - 1, 0), min(j1 + 1, ny))
+    grid, quads = grid_block(world_shape, bi, bj, spacing)
+    lap("grid")
+    grid = distort(grid, int(p["Seed"]))
+    lap("distortion")
+    tris = triangulate(grid, quads)
+    lap("triangulate")
+    # Owned interior vertices get a cell, boundary vertices of the world never do
+    gi, gj = np.divmod(np.arange(len(grid)), bj[1] - bj[0])
+    gi, gj = gi + bi[0], gj + bj[0]
+    sites = ((gi >= max(i0, 1)) & (gi < min(i1, nx - 1)) &
+             (gj >= max(j0, 1)) & (gj < min(j1, ny - 1)))
+    cell_positions, cell_sizes, cell_corners, site_ids = dual_mesh(grid, tris, sites)
+    cell_ids = gi[site_ids] * ny + gj[site_ids]
+    lap("dual_mesh")
+
+    cells = np.arange(len(cell_sizes))
+    mat_id = np.floor(random_float(cell_ids, p["Color Seed"], 1.0, p["Palette Size"] + MAT_PAD)).astype(np.int32)
+    taper = random_float(cell_ids, p["Taper Seed"], p["Min Taper"], p["Max Taper"])
+    height = random_float(cell_ids, p["Seed"], p["Min Height"], p["Max Height"])
+    lap("cell_attributes")
+
+    # Split edges, then shrink each cell around its center to open the streets
+    corners = cell_positions[cell_corners]
+    owner = np.repeat(cells, cell_sizes)
+    center = face_centers(corners, cell_sizes)
+    footprint = center[owner] + (corners - center[owner]) * p["Street Width"]
+    lap("footprints")
+
+    floors = floors_for_height(height, p["Floor Height"], p["Max Floors"])
+    if int(p["LOD"]) >= 2:
+        # Flat-roof boxes, one extrusion to full height
+        b_positions, b_sizes, b_corners, b_building = extrude_floors(
+            footprint, cell_sizes, height, np.ones_like(taper), floors=1)
+    else:
+        b_positions, b_sizes, b_corners, b_building = extrude_floors(
+            footprint, cell_sizes, height / floors, taper, floors)
+    b_positions[:, 2] += BUILDING_LIFT
+    lap("floors")
+
+    positions = np.concatenate([cell_positions, b_positions]).astype(np.float32)
+    face_sizes = np.concatenate([cell_sizes, b_sizes]).astype(np.int32)
+    corner_verts = np.concatenate([cell_corners, b_corners + len(cell_positions)]).astype(np.int32)
+    face_building = np.concatenate([cells, b_building])
+    part = np.concatenate([np.full(len(cells), PART_ROAD), np.full(len(b_building), PART_BUILDING)]).astype(np.int8)
+
+    buildings = {
+        "id": cell_ids.astype(np.int32),
+        "centroid": center[:, :2].astype(np.float32),
+        "footprint_area": polygon_areas(footprint, cell_sizes).astype(np.float32),
+        "height": height.astype(np.float32),
+        "floors": floors,
+        "taper": taper.astype(np.float32),
+        "mat_id": mat_id,
+        "color": palette_colors(mat_id, p["Palette Size"]),
+        "sides": cell_sizes,
+    }
+    city = {
+        "params": p,
+        "positions": positions,
+        "face_sizes": face_sizes,
+        "corner_verts": corner_verts,
+        "face_attributes": {
+            "MatID": mat_id[face_building],
+            "TaperFactor": taper[face_building].astype(np.float32),
+            "BuildingID": cell_ids[face_building].astype(np.int32),
+            "Part": part,
+        },
+        "buildings": buildings,
+    }
+    lap("join")
+    return city
+
+
+def save_npz(path, city):
+    """Flat .npz: mesh arrays, face/<name> attributes and building/<column> columns."""
+    arrays = {"positions": city["positions"], "face_sizes": city["face_sizes"],
+              "corner_verts": city["corner_verts"], "params": np.array(json.dumps(city["params"]))}
+    arrays.update({f"face/{k}": v for k, v in city["face_attributes"].items()})
+    arrays.update({f"building/{k}": v for k, v in city["buildings"].items()})
+    np.savez(path, **arrays)
+
+
+def parse_param(text):
+    name, _, value = text.partition("=")
+    if name not in DEFAULTS:
+        raise ValueError(f"Unknown parameter '{name}', expected one of {', '.join(DEFAULTS)}")
+    return name, json.loads(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a Voronoi city with NumPy, without Blender.")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE",
+                        help="Socket value, e.g. Resolution=300 or 'Street Width=0.6'.")
+    parser.add_argument("--out", help="Write the city to this .npz file.")
+    args = parser.parse_args(argv)
+    try:
+        params = dict(parse_param(p) for p in args.param)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    timings = {}
+    city = generate_city(params, timings)
+    for stage, seconds in timings.items():
+        print(f"{stage:>16}: {seconds * 1000:8.1f} ms")
+    print(f"{len(city['buildings']['id'])} buildings, {len(city['positions'])} vertices, "
+          f"{len(city['face_sizes'])} faces in {sum(timings.values()):.2f} s")
+    if args.out:
+        save_npz(args.out, city)
+        print(f"Saved {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
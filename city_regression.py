@@ -0,0 +1,138 @@
+"""Evaluates every vcity_engine preset next to the legacy script it replaces.
+
+For each preset the legacy group (vcity_vN.py) and the engine group are
+evaluated at their default inputs on a throwaway object. The table shows the
+median evaluation time of both, their vertex, face and instance counts, and
+whether their geometry_fingerprint hashes match: positions, topology and
+instances. Materials and named attributes are not compared. Legacy scripts
+that fail to build or evaluate are reported with their error instead.
+
+    blender -b --factory-startup --python city_regression.py -- --repeat 3 --json regression.json
+    blender -b --factory-startup --python city_regression.py -- --preset v9_1 --preset v25
+"""
+import bpy
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import statistics
+import traceback
+
+# Blender's --python doesn't put this folder on sys.path
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+import city_instances
+import geometry_fingerprint
+import vcity_engine
+
+EVAL_OBJECT = "CityRegression"
+
+
+def legacy_group(preset):
+    """Builds the node group of the legacy script behind preset."""
+    info = vcity_engine.PRESETS[preset]
+    module = importlib.import_module(info["module"])
+    # create_vN_nodes() where the script has one (v9_1 and the v23 copies
+    # reuse an older name), otherwise its scene function builds the group
+    builders = [name for name in dir(module) if name.startswith("create_v") and name.endswith("_nodes")]
+    if builders:
+        ng = getattr(module, builders[0])()
+    else:
+        scene = next(name for name in dir(module) if name.startswith(("create_scene_", "setup_scene_")))
+        getattr(module, scene)()
+        ng = None
+    return ng or bpy.data.node_groups[info["group"]]
+
+
+def evaluate(ng, repeat):
+    """Median evaluation time of ng on a new object, its counts and geometry hash."""
+    mesh = bpy.data.meshes.new(EVAL_OBJECT)
+    obj = bpy.data.objects.new(EVAL_OBJECT, mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    try:
+        mod = obj.modifiers.new("Regression", 'NODES')
+        mod.node_group = ng
+        times = []
+        for _ in range(repeat):
+            obj.update_tag()
+            start = time.perf_counter()
+            bpy.context.view_layer.update()
+            times.append(time.perf_counter() - start)
+        split = city_instances.split_instances(obj, bpy.context.evaluated_depsgraph_get())
+        return {
+            "seconds": statistics.median(times),
+            "vertices": len(split["mesh"]["positions"]),
+            "faces": len(split["mesh"]["face_sizes"]),
+            "instances": len(split["reference"]),
+            # No named attributes, the legacy scripts store theirs under other names
+            "hash": geometry_fingerprint.fingerprint(split)["hash"],
+        }
+    finally:
+        bpy.data.objects.remove(obj)
+        bpy.data.meshes.remove(mesh)
+
+
+def run(presets=None, repeat=3):
+    """One record per preset with "legacy" and "engine" results (or "legacy_error")."""
+    records = []
+    for preset in presets or list(vcity_engine.PRESETS):
+        record = {"preset": preset}
+        try:
+            record["legacy"] = evaluate(legacy_group(preset), repeat)
+        except Exception as e:
+            traceback.print_exc()
+            record["legacy_error"] = f"{type(e).__name__}: {e}"
+        record["engine"] = evaluate(vcity_engine.create_city_nodes(preset), repeat)
+        record["match"] = "legacy" in record and record["legacy"]["hash"] == record["engine"]["hash"]
+        print(f"{preset}: {'match' if record['match'] else 'differs'}")
+        records.append(record)
+    return records
+
+
+def print_table(records):
+    header = ["preset", "legacy ms", "engine ms", "legacy v/f/i", "engine v/f/i", "match"]
+
+    def counts(r):
+        return f"{r['vertices']}/{r['faces']}/{r['instances']}"
+
+    rows = []
+    for r in records:
+        engine = r["engine"]
+        if "legacy" in r:
+            legacy = r["legacy"]
+            rows.append([r["preset"], f"{legacy['seconds'] * 1000:.1f}", f"{engine['seconds'] * 1000:.1f}",
+                         counts(legacy), counts(engine), "yes" if r["match"] else "no"])
+        else:
+            rows.append([r["preset"], "-", f"{engine['seconds'] * 1000:.1f}", r["legacy_error"][:40],
+                         counts(engine), "no"])
+    widths = [max(len(h), *(len(row[i]) for row in rows)) for i, h in enumerate(header)]
+    print("  ".join(h.rjust(w) for h, w in zip(header, widths)))
+    for row in rows:
+        print("  ".join(c.rjust(w) for c, w in zip(row, widths)))
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="city_regression.py")
+    parser.add_argument("--preset", action="append", choices=list(vcity_engine.PRESETS),
+                        help="Only compare these presets.")
+    parser.add_argument("--repeat", type=int, default=3, help="Evaluations per measurement, the median is kept.")
+    parser.add_argument("--json", help="Write the records to this file.")
+    args = parser.parse_args(argv)
+
+    records = run(args.preset, args.repeat)
+    print_table(records)
+    matched = sum(r["match"] for r in records)
+    print(f"{matched} of {len(records)} presets match their legacy script")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(records, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
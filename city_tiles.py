@@ -0,0 +1,221 @@
+"""Tiled, multi-process city generation on top of city_numpy.
+
+The world is a grid of tiles_x x tiles_y tiles, each the size of one v25
+city (GRID_SIZE with Resolution vertices per side). All tiles share one
+world vertex grid, so noise, triangulation and per-cell random values are
+the same on both sides of a border and the tiles fit together without
+seams. Every tile is generated in its own worker process and only holds
+its own cells plus a one-vertex halo, so memory follows tile size.
+
+    python3 city_tiles.py --tiles 8x8 --workers 8 --param Resolution=120 --out tiles/
+    python3 city_tiles.py --tiles 4x4 --join city.npz
+
+Inside Blender (the bridge adds this folder to sys.path):
+
+    import city_tiles
+    city_tiles.build_objects({"Resolution": 60}, tiles=(4, 4))            # one object per tile
+    city_tiles.build_objects({"Resolution": 60}, tiles=(4, 4), join=True)
+    city_tiles.build_objects({"Resolution": 60}, tiles=(8, 8), camera=bpy.context.scene.camera)
+"""
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+import numpy as np
+
+import city_numpy
+
+
+def world_shape(resolution, tiles):
+    """Vertex counts of the world grid, neighbouring tiles share their border row."""
+    r = max(int(resolution), 3)
+    return tuple(t * (r - 1) + 1 for t in tiles)
+
+
+def tile_owned_range(tile, resolution, tiles):
+    """World vertex range ((i0, i1), (j0, j1)) whose cells belong to tile (tx, ty)."""
+    r = max(int(resolution), 3)
+    shape = world_shape(resolution, tiles)
+    ranges = []
+    for t, n in zip(tile, shape):
+        start = t * (r - 1)
+        # The last tile also owns the closing border row
+        ranges.append((start, start + r - 1 if start + r - 1 < n - 1 else n))
+    return tuple(ranges)
+
+
+def generate_tile(params, tile, tiles):
+    """City of one tile. Positions are in world space."""
+    p = dict(city_numpy.DEFAULTS, **(params or {}))
+    timings = {}
+    city = city_numpy.generate_block(p, world_shape(p["Resolution"], tiles),
+                                     tile_owned_range(tile, p["Resolution"], tiles), timings)
+    city["tile"] = tuple(tile)
+    city["timings"] = timings
+    return city
+
+
+def tile_center(tile, tiles):
+    """World XY center of a tile."""
+    return tuple((t + 0.5 - n / 2) * city_numpy.GRID_SIZE for t, n in zip(tile, tiles))
+
+
+def tile_lods(point, tiles, thresholds=city_numpy.LOD_DISTANCES):
+    """LOD of every tile from the distance between point (x, y, z) and the tile center."""
+    lods = {}
+    for tx in range(tiles[0]):
+        for ty in range(tiles[1]):
+            cx, cy = tile_center((tx, ty), tiles)
+            distance = float(np.linalg.norm([point[0] - cx, point[1] - cy, point[2]]))
+            lods[(tx, ty)] = city_numpy.lod_for_distance(distance, thresholds)
+    return lods
+
+
+def _tile_job(args):
+    return generate_tile(*args)
+
+
+def iter_tiles(params, tiles=(2, 2), workers=None, lods=None):
+    """Yields tile cities as worker processes finish them, in completion order.
+
+    lods optionally maps (tx, ty) to the LOD of that tile, see tile_lods().
+    """
+    jobs = []
+    for tx in range(tiles[0]):
+        for ty in range(tiles[1]):
+            tile_params = dict(params or {})
+            if lods is not None:
+                tile_params["LOD"] = lods.get((tx, ty), tile_params.get("LOD", 0))
+            jobs.append((tile_params, (tx, ty), tuple(tiles)))
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers == 1:
+        for job in jobs:
+            yield _tile_job(job)
+        return
+    # spawn, forking a process with Blender's threads is not safe
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        yield from pool.imap_unordered(_tile_job, jobs)
+
+
+def join_cities(cities):
+    """Concatenates tile cities into one, offsetting the corner indices."""
+    cities = sorted(cities, key=lambda c: c.get("tile", (0, 0)))
+    offsets = np.cumsum([0] + [len(c["positions"]) for c in cities[:-1]])
+    joined = {
+        "params": cities[0]["params"],
+        "positions": np.concatenate([c["positions"] for c in cities]),
+        "face_sizes": np.concatenate([c["face_sizes"] for c in cities]),
+        "corner_verts": np.concatenate([c["corner_verts"] + o for c, o in zip(cities, offsets)]).astype(np.int32),
+        "face_attributes": {k: np.concatenate([c["face_attributes"][k] for c in cities])
+                            for k in cities[0]["face_attributes"]},
+        "buildings": {k: np.concatenate([c["buildings"][k] for c in cities])
+                      for k in cities[0]["buildings"]},
+    }
+    return joined
+
+
+def tile_name(tile):
+    return f"tile_{tile[0]:03d}_{tile[1]:03d}"
+
+
+# --- Blender ---
+
+def city_to_mesh(city, name):
+    """Creates a mesh from a city dict, with its face attributes."""
+    import bpy
+    mesh = bpy.data.meshes.new(name)
+    face_sizes = city["face_sizes"]
+    mesh.vertices.add(len(city["positions"]))
+    mesh.vertices.foreach_set("co", city["positions"].ravel())
+    mesh.loops.add(len(city["corner_verts"]))
+    mesh.loops.foreach_set("vertex_index", city["corner_verts"])
+    mesh.polygons.add(len(face_sizes))
+    mesh.polygons.foreach_set("loop_start", city_numpy.face_offsets(face_sizes).astype(np.int32))
+    mesh.polygons.foreach_set("loop_total", face_sizes)
+    for attr_name, values in city["face_attributes"].items():
+        data_type = 'FLOAT' if values.dtype.kind == 'f' else 'INT'
+        attr = mesh.attributes.new(attr_name, data_type, 'FACE')
+        attr.data.foreach_set("value", values.astype(np.float32 if data_type == 'FLOAT' else np.int32))
+    mesh.update(calc_edges=True)
+    return mesh
+
+
+def build_objects(params=None, tiles=(2, 2), workers=None, join=False, camera=None,
+                  collection_name="CityTiles"):
+    """Generates the tiles in worker processes and adds them to a collection.
+
+    Each tile becomes its own object unless join is set. With a camera
+    object, each tile's LOD follows its distance from the camera.
+    """
+    import bpy
+    collection = bpy.data.collections.get(collection_name)
+    if collection is None:
+        collection = bpy.data.collections.new(collection_name)
+        bpy.context.scene.collection.children.link(collection)
+
+    start = time.perf_counter()
+    lods = tile_lods(camera.matrix_world.translation, tiles) if camera else None
+    cities = iter_tiles(params, tiles, workers, lods)
+    if join:
+        cities = [dict(join_cities(list(cities)), tile=None)]
+    objects = []
+    for city in cities:
+        name = tile_name(city["tile"]) if city.get("tile") else collection_name
+        obj = bpy.data.objects.new(name, city_to_mesh(city, name))
+        if not join:
+            obj["city_lod"] = int(city["params"]["LOD"])
+        collection.objects.link(obj)
+        objects.append(obj)
+    print(f"Built {len(objects)} city objects from {tiles[0]}x{tiles[1]} tiles in {time.perf_counter() - start:.2f} s")
+    return objects
+
+
+# --- CLI ---
+
+def parse_tiles(text):
+    x, _, y = text.lower().partition("x")
+    return int(x), int(y or x)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a tiled Voronoi city in parallel with NumPy.")
+    parser.add_argument("--tiles", default="2x2", help="Tile grid, e.g. 8x8.")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: all cores).")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=VALUE",
+                        help="Socket value for every tile, e.g. Resolution=120.")
+    parser.add_argument("--out", help="Folder for one .npz per tile.")
+    parser.add_argument("--join", metavar="FILE", help="Write all tiles joined into one .npz.")
+    parser.add_argument("--camera", metavar="X,Y,Z", help="Pick each tile's LOD from its distance to this point.")
+    args = parser.parse_args(argv)
+    try:
+        params = dict(city_numpy.parse_param(p) for p in args.param)
+        tiles = parse_tiles(args.tiles)
+        lods = tile_lods([float(v) for v in args.camera.split(",")], tiles) if args.camera else None
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+    start = time.perf_counter()
+    kept, buildings, vertices = [], 0, 0
+    for city in iter_tiles(params, tiles, args.workers, lods):
+        buildings += len(city["buildings"]["id"])
+        vertices += len(city["positions"])
+        print(f"{tile_name(city['tile'])}: LOD{city['params']['LOD']}, {len(city['buildings']['id'])} buildings, "
+              f"{len(city['positions'])} vertices in {sum(city['timings'].values()):.2f} s")
+        if args.out:
+            city_numpy.save_npz(os.path.join(args.out, tile_name(city["tile"]) + ".npz"), city)
+        if args.join:
+            kept.append(city)
+    if args.join:
+        city_numpy.save_npz(args.join, join_cities(kept))
+        print(f"Saved {args.join}")
+    print(f"{tiles[0] * tiles[1]} tiles, {buildings} buildings, {vertices} vertices "
+          f"in {time.perf_counter() - start:.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
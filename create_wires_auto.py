@@ -1,9 +1,10 @@
 import bpy
-import bmesh
 import math
 import random
 from mathutils import Vector
 
+import city_index
+
 """
 WIRE GENERATOR (Auto-Select)
 =============================
@@ -47,36 +48,20 @@ WIRE_COLOR = (0.1, 0.1, 0.1, 1)
 
 def get_rooftop_faces(obj):
     """Find upward-facing faces above height threshold (Evaluated Mesh)"""
-    # Get evaluated mesh (includes Geometry Nodes)
-    depsgraph = bpy.context.evaluated_depsgraph_get()
-    eval_obj = obj.evaluated_get(depsgraph)
-    mesh = eval_obj.to_mesh()
-    
-    bm = bmesh.new()
-    bm.from_mesh(mesh)
-    bm.faces.ensure_lookup_table()
+    # Shared index of the evaluated mesh (includes Geometry Nodes) in world
+    # space, built once per city and reused until its parameters change
+    index = city_index.get_index(obj)
     
     rooftop_faces = []
     
-    for face in bm.faces:
-        # World space normal and center
-        # Note: eval_obj matrices might need care, usually matrix_world is on original obj
-        normal = (obj.matrix_world.to_3x3() @ face.normal).normalized()
-        center = obj.matrix_world @ face.calc_center_median()
-        
-        # Check if upward-facing and above threshold
-        if normal.z > ROOF_NORMAL_THRESHOLD and center.z > ROOF_HEIGHT_THRESHOLD:
-            # Get world-space vertices for area calculation
-            verts = [obj.matrix_world @ v.co for v in face.verts]
-            rooftop_faces.append({
-                'center': center,
-                'normal': normal,
-                'verts': verts,
-                'area': face.calc_area(),
-            })
+    for face in index.roof_faces(ROOF_HEIGHT_THRESHOLD, ROOF_NORMAL_THRESHOLD):
+        rooftop_faces.append({
+            'center': Vector(index.face_centers[face]),
+            'normal': Vector(index.face_normals[face]),
+            'verts': [Vector(co) for co in index.face_corners(face)],
+            'area': float(index.face_areas[face]),
+        })
     
-    bm.free()
-    eval_obj.to_mesh_clear() # Cleanup
     return rooftop_faces
 
 
@@ -1,9 +1,11 @@
 import bpy
-import bmesh
 import math
 import random
+import numpy as np
 from mathutils import Vector
 
+import city_index
+
 """
 CONSTRAINED WIRE GENERATOR (FIXED)
 ==================================
@@ -45,43 +47,35 @@ HIDE_EMPTIES = False          # Show them so user can debug positions
 
 def get_rooftop_vertices(obj):
     """Find vertices that belong to rooftop (upward-facing) faces"""
-    bm = bmesh.new()
-    bm.from_mesh(obj.data)
-    bm.verts.ensure_lookup_table()
-    bm.faces.ensure_lookup_table()
-    
-    # Find height range
-    all_z = [v.co.z for v in bm.verts]
-    if not all_z:
-        bm.free()
+    # Shared index of the mesh, built once and reused until it changes. With
+    # the modifiers applied its vertex indices are those of obj.data, which
+    # the empties are parented to
+    index = city_index.get_index(obj)
+    if len(index.positions) != len(obj.data.vertices):
+        print("Error: Evaluated mesh differs from the object's mesh, apply its modifiers first")
+        return []
+    if not len(index.positions):
         return []
     
-    min_z, max_z = min(all_z), max(all_z)
+    # Find height range
+    all_z = index.positions[:, 2]
+    min_z, max_z = float(all_z.min()), float(all_z.max())
     height_threshold = min_z + (max_z - min_z) * ROOF_HEIGHT_PERCENTILE
     
-    # Find vertices on rooftop faces
-    rooftop_vert_indices = set()
-    
-    for face in bm.faces:
-        if face.normal.z > ROOF_NORMAL_THRESHOLD:
-            # Check face center height
-            face_center_z = sum(v.co.z for v in face.verts) / len(face.verts)
-            if face_center_z > height_threshold:
-                for v in face.verts:
-                    rooftop_vert_indices.add(v.index)
+    # Vertices on rooftop faces whose center is above the threshold
+    faces = index.roof_faces(height_threshold, ROOF_NORMAL_THRESHOLD)
+    corner_faces = np.repeat(np.arange(len(index.face_sizes)), index.face_sizes)
+    rooftop_vert_indices = np.unique(index.corner_verts[np.isin(corner_faces, faces)])
     
-    # Get world-space positions for sorting/distance logic only
+    # World-space positions for sorting/distance logic only
     rooftop_verts = []
-    for idx in rooftop_vert_indices:
-        v = bm.verts[idx]
-        world_pos = obj.matrix_world @ v.co
+    for idx in rooftop_vert_indices.tolist():
         rooftop_verts.append({
             'index': idx,
-            'local_co': v.co.copy(),
-            'world_co': world_pos,
+            'local_co': obj.data.vertices[idx].co.copy(),
+            'world_co': Vector(index.positions[idx]),
         })
     
-    bm.free()
     return rooftop_verts
 
 
@@ -0,0 +1,33 @@
+import bpy
+import numpy as np
+
+# Bridge payload: returns the evaluated CityV25 mesh as NumPy arrays.
+# Submit with bridge_client.submit(code) and read final["result"]["positions"].
+
+def evaluated_city_arrays(obj_name="CityV25"):
+    obj = bpy.data.objects[obj_name]
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    obj_eval = obj.evaluated_get(depsgraph)
+    mesh = obj_eval.to_mesh()
+    try:
+        # Bulk copies, no per-vertex Python objects
+        positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", positions)
+
+        loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_total", loop_totals)
+
+        corner_verts = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", corner_verts)
+    finally:
+        obj_eval.to_mesh_clear()
+
+    return {
+        "object": obj.name,
+        "positions": positions.reshape(-1, 3),
+        "face_sizes": loop_totals,
+        "corner_verts": corner_verts,
+    }
+
+result = evaluated_city_arrays()
+print(f"Returning {len(result['positions'])} vertices, {len(result['face_sizes'])} faces")
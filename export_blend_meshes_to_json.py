@@ -4,6 +4,8 @@ import sys
 import os
 from mathutils import Matrix
 
+import city_instances
+
 def export_meshes_to_json(output_path, apply_modifiers=False, world_space=False):
     """
     Export all mesh objects in the current .blend file to a JSON file.
@@ -15,6 +17,8 @@ def export_meshes_to_json(output_path, apply_modifiers=False, world_space=False)
 
     # Get depsgraph for evaluated meshes (modifiers)
     depsgraph = bpy.context.evaluated_depsgraph_get()
+    # Older Blender: walk the depsgraph instances once for all objects
+    instances = city_instances.group_instances(depsgraph) if apply_modifiers else None
 
     count = 0
     for obj in bpy.data.objects:
@@ -58,6 +62,16 @@ def export_meshes_to_json(output_path, apply_modifiers=False, world_space=False)
             }
         }
 
+        # Geometry-nodes instances (windows, doors, ...) as prototypes plus transforms
+        if apply_modifiers:
+            split = city_instances.split_instances(obj, depsgraph, include_mesh=False, instances=instances)
+            if len(split["reference"]):
+                split["mesh"] = {"positions": vertices, "face_sizes": faces}
+                counts = city_instances.instance_counts(split)
+                obj_info["instances"] = city_instances.instances_json(split, transform_matrix)
+                obj_info["instance_counts"] = counts
+                print(city_instances.format_counts(obj.name, counts))
+
         data["objects"].append(obj_info)
         count += 1
 
@@ -3,6 +3,8 @@ import json
 import os
 from mathutils import Matrix
 
+import city_instances
+
 def export_scene_full():
     # Define output path
     output_dir = "/Users/joem/.gemini/antigravity/scratch/blender_bridge"
@@ -21,6 +23,8 @@ def export_scene_full():
     }
     
     depsgraph = bpy.context.evaluated_depsgraph_get()
+    # Older Blender: walk the depsgraph instances once for all objects
+    instances = city_instances.group_instances(depsgraph)
     
     # --------------------------------------------------------------------
     # 1. MESHES (Snapshot of deformed geometry)
@@ -46,7 +50,7 @@ def export_scene_full():
         for p in mesh.polygons:
             faces.append(list(p.vertices))
             
-        data["objects"].append({
+        obj_data = {
             "name": obj.name,
             "type": "MESH",
             "location": list(obj.location),
@@ -58,8 +62,18 @@ def export_scene_full():
                 "vertices": verts,
                 "faces": faces
             }
-        })
+        }
         obj_eval.to_mesh_clear()
+        
+        # Instances stay one prototype mesh plus a transform each
+        split = city_instances.split_instances(obj, depsgraph, include_mesh=False, instances=instances)
+        if len(split["reference"]):
+            split["mesh"] = {"positions": verts, "face_sizes": faces}
+            counts = city_instances.instance_counts(split)
+            obj_data["instances"] = city_instances.instances_json(split, mw, digits=4)
+            obj_data["instance_counts"] = counts
+            print(city_instances.format_counts(obj.name, counts))
+        data["objects"].append(obj_data)
 
     # --------------------------------------------------------------------
     # 2. ARMATURES (Rig Structure & IK)
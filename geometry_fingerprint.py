@@ -0,0 +1,243 @@
+"""Fingerprints of evaluated geometry, to check that a change left the output alone.
+
+fingerprint() hashes an evaluated object's positions, topology, named
+attributes (MatID, TaperFactor, BuildingColor, ...) and instances. Every
+array is read in bulk with foreach_get and floats are rounded to a
+tolerance first, so float noise far below it does not change the hash.
+Each part gets its own hash, so a mismatch says what changed. Reading and
+hashing a million-vertex city takes a fraction of a second, the evaluation
+itself is timed separately.
+
+Golden fingerprints live in a JSON file, one per city preset and seed, or
+per object of a .blend (e.g. a spider swarm):
+
+    blender -b --factory-startup --python geometry_fingerprint.py -- --preset v25 --seed 1,2,3 --update
+    blender -b --factory-startup --python geometry_fingerprint.py -- --preset v25 --seed 1,2,3
+    blender -b swarm.blend --python geometry_fingerprint.py -- --object Swarm --golden swarm_fingerprints.json
+
+Without --update the run compares against the golden file and exits with
+status 1 on any mismatch or missing entry.
+"""
+import bpy
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+import numpy as np
+
+# Blender's --python doesn't put this folder on sys.path
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+import city_instances
+import node_builder
+import vcity_engine
+from sweep import parse_values
+
+# Named attributes hashed when the evaluated mesh has them
+ATTRIBUTES = ("MatID", "TaperFactor", "BuildingColor", "ColorFactor", "Part")
+# Floats are compared at this precision
+TOLERANCE = 1e-4
+GOLDEN_FILE = "city_fingerprints.json"
+EVAL_OBJECT = "CityFingerprint"
+
+# Attribute data type -> foreach_get property, values per element, dtype
+_ATTRIBUTE_LAYOUT = {
+    'FLOAT': ("value", 1, np.float32),
+    'INT': ("value", 1, np.int32),
+    'INT8': ("value", 1, np.int32),
+    'BOOLEAN': ("value", 1, bool),
+    'FLOAT2': ("vector", 2, np.float32),
+    'FLOAT_VECTOR': ("vector", 3, np.float32),
+    'FLOAT_COLOR': ("color", 4, np.float32),
+    'BYTE_COLOR': ("color", 4, np.float32),
+}
+
+
+def attribute_array(mesh, name):
+    """Values of a named mesh attribute as an (N, width) array, or None if it is missing."""
+    attr = mesh.attributes.get(name)
+    if attr is None or attr.data_type not in _ATTRIBUTE_LAYOUT:
+        return None
+    prop, width, dtype = _ATTRIBUTE_LAYOUT[attr.data_type]
+    values = np.empty(len(attr.data) * width, dtype=dtype)
+    attr.data.foreach_get(prop, values)
+    return values.reshape(-1, width)
+
+
+def read_geometry(obj, depsgraph=None, attributes=ATTRIBUTES, instances=None):
+    """city_instances.split_instances() of obj plus an "attributes" dict of its named attributes."""
+    depsgraph = depsgraph or bpy.context.evaluated_depsgraph_get()
+    obj_eval = obj.evaluated_get(depsgraph)
+    mesh = obj_eval.to_mesh()
+    try:
+        split = city_instances.split_instances(obj, depsgraph, include_mesh=False, instances=instances)
+        split["mesh"] = city_instances.mesh_arrays(mesh)
+        split["attributes"] = {}
+        for name in attributes:
+            values = attribute_array(mesh, name)
+            if values is not None:
+                split["attributes"][name] = values
+    finally:
+        obj_eval.to_mesh_clear()
+    return split
+
+
+def _hash(*arrays, tolerance=TOLERANCE):
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.asarray(array)
+        if array.dtype.kind == 'f':
+            array = np.round(array / tolerance).astype(np.int64)
+        else:
+            array = array.astype(np.int64)
+        digest.update(str(array.shape).encode())
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def fingerprint(split, tolerance=TOLERANCE):
+    """Counts and per-part hashes of read_geometry() or split_instances() output.
+
+    "hash" combines all parts. Values within tolerance of a rounding boundary
+    can still flip, so a mismatch of positions alone is worth a second look
+    at a smaller tolerance before calling it a regression.
+    """
+    mesh = split["mesh"]
+    parts = {
+        "positions": _hash(mesh["positions"], tolerance=tolerance),
+        "topology": _hash(mesh["face_sizes"], mesh["corner_verts"]),
+    }
+    for name, values in sorted(split.get("attributes", {}).items()):
+        parts[f"attribute:{name}"] = _hash(values, tolerance=tolerance)
+    if len(split["reference"]):
+        protos = [a for p in split["prototypes"] if p for a in (p["positions"], p["face_sizes"], p["corner_verts"])]
+        parts["prototypes"] = _hash(*protos, tolerance=tolerance)
+        parts["instances"] = _hash(split["reference"], split["transforms"], tolerance=tolerance)
+    combined = hashlib.blake2b(json.dumps(parts, sort_keys=True).encode(), digest_size=16).hexdigest()
+    return {
+        "vertices": len(mesh["positions"]),
+        "faces": len(mesh["face_sizes"]),
+        "instances": len(split["reference"]),
+        "tolerance": tolerance,
+        "parts": parts,
+        "hash": combined,
+    }
+
+
+def compare(golden, current):
+    """Names of the parts that differ, empty when the fingerprints match."""
+    if golden["hash"] == current["hash"]:
+        return []
+    names = set(golden["parts"]) | set(current["parts"])
+    return sorted(n for n in names if golden["parts"].get(n) != current["parts"].get(n))
+
+
+def city_fingerprints(preset, seeds, fixed=None, tolerance=TOLERANCE):
+    """key -> fingerprint of a vcity_engine preset at each seed."""
+    ng = vcity_engine.create_city_nodes(preset)
+    mesh = bpy.data.meshes.new(EVAL_OBJECT)
+    obj = bpy.data.objects.new(EVAL_OBJECT, mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    results = {}
+    try:
+        mod = obj.modifiers.new("Fingerprint", 'NODES')
+        mod.node_group = ng
+        for seed in seeds:
+            values = dict(fixed or {}, Seed=seed)
+            node_builder.set_modifier_inputs(mod, values)
+            start = time.perf_counter()
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+            evaluated = time.perf_counter()
+            result = fingerprint(read_geometry(obj, depsgraph), tolerance)
+            done = time.perf_counter()
+            key = " ".join([preset] + [f"{k}={v}" for k, v in sorted(values.items())])
+            results[key] = result
+            print(f"{key}: {result['vertices']} vertices, evaluated in {(evaluated - start) * 1000:.0f} ms, "
+                  f"fingerprinted in {(done - evaluated) * 1000:.0f} ms")
+    finally:
+        bpy.data.objects.remove(obj)
+        bpy.data.meshes.remove(mesh)
+    return results
+
+
+def object_fingerprints(names=None, tolerance=TOLERANCE):
+    """key -> fingerprint of the named objects of the open file, every mesh object by default."""
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    objects = [bpy.data.objects[n] for n in names] if names else [o for o in bpy.data.objects if o.type == 'MESH']
+    instances = city_instances.group_instances(depsgraph)
+    results = {}
+    for obj in objects:
+        start = time.perf_counter()
+        geometry = read_geometry(obj, depsgraph, instances=instances)
+        results[f"{os.path.basename(bpy.data.filepath)}:{obj.name}"] = fingerprint(geometry, tolerance)
+        print(f"{obj.name}: fingerprinted in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return results
+
+
+def check(results, path, update=False):
+    """Compares results with the golden file, or writes them into it. Returns the number of failures."""
+    golden = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            golden = json.load(f)
+    if update:
+        golden.update(results)
+        with open(path, 'w') as f:
+            json.dump(golden, f, indent=2, sort_keys=True)
+        print(f"{len(results)} fingerprints written to {path}")
+        return 0
+
+    failures = 0
+    for key, current in results.items():
+        if key not in golden:
+            print(f"MISSING {key}: no golden fingerprint, run with --update")
+            failures += 1
+            continue
+        changed = compare(golden[key], current)
+        if changed:
+            print(f"CHANGED {key}: {', '.join(changed)}")
+            failures += 1
+        else:
+            print(f"ok      {key}")
+    return failures
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="geometry_fingerprint.py")
+    parser.add_argument("--preset", action="append", choices=list(vcity_engine.PRESETS),
+                        help="City preset to evaluate, see vcity_engine.PRESETS.")
+    parser.add_argument("--seed", default="700", help="Seeds, 'v1,v2,...' or 'start:stop[:step]'.")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="Fixed input value for every city.")
+    parser.add_argument("--object", action="append", help="Object of the open file to fingerprint instead.")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--golden", default=GOLDEN_FILE, help="Golden fingerprint file.")
+    parser.add_argument("--update", action="store_true", help="Store the fingerprints as the new goldens.")
+    args = parser.parse_args(argv)
+
+    fixed = {}
+    for item in args.set:
+        name, _, value = item.partition("=")
+        fixed[name] = parse_values(value)[0]
+
+    results = {}
+    if args.preset:
+        for preset in args.preset:
+            results.update(city_fingerprints(preset, parse_values(args.seed), fixed, args.tolerance))
+    else:
+        results = object_fingerprints(args.object, args.tolerance)
+
+    failures = check(results, args.golden, args.update)
+    if failures:
+        print(f"{failures} of {len(results)} fingerprints differ from {args.golden}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -369,6 +369,14 @@ def build_spider():
 # MODULE 7: SWARM GENERATOR
 # ==================================================================================================
 def create_swarm(count=49, range_x=100, range_y=100):
+    for _progress in iter_swarm(count, range_x, range_y):
+        pass
+
+def iter_swarm(count=49, range_x=100, range_y=100):
+    """Generator version of create_swarm, yields progress (0-1) after each spider.
+
+    Lets the bridge build the swarm across timer ticks: def run(): yield from iter_swarm(...)
+    """
     source_name = "character_controller"
     if source_name not in bpy.data.objects:
         build_spider()
@@ -441,6 +449,7 @@ def create_swarm(count=49, range_x=100, range_y=100):
         create_pathless_walk(new_master.name, explicit_start_angle=rz)
         for obj in bpy.context.selected_objects:
             if "Spider_Body" in obj.name: add_body_noise(obj.name)
+        yield (i + 1) / count
 
     controllers = [o for o in bpy.data.objects if o.name.startswith("character_controller")]
     for ctrl in controllers:
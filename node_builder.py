@@ -0,0 +1,301 @@
+"""Declarative builder for geometry-node trees.
+
+A NodeTreeSpec lists the group sockets, the nodes (keyed by a unique name,
+with their properties and input values) and the links between them as plain
+data. build_tree() turns it into a node group in one pass:
+
+    spec = NodeTreeSpec("MyCity")
+    spec.socket("Geometry", 'NodeSocketGeometry', in_out='OUTPUT')
+    spec.socket("Resolution", 'NodeSocketInt', 30, min_value=2)
+    with spec.stage("Grid"):
+        grid = spec.node("grid", 'GeometryNodeMeshGrid', (-400, 0), inputs={
+            "Vertices X": spec.param("Resolution"),
+            "Vertices Y": spec.param("Resolution"),
+        })
+    spec.output(grid, "Geometry")
+    ng, stats = build_tree(spec)
+
+Every parameter gets a single hidden Group Input node however often it is
+used, and node names are the spec keys, so scripts can find nodes with
+ng.nodes["grid"] instead of searching by type or location.
+
+ensure_tree() stores a fingerprint of the spec on the group and reuses the
+existing group while the spec is unchanged, so re-running a generator with
+new parameter values only has to update the modifier inputs.
+
+Repeat and simulation zones are two nodes declared like any other and
+paired with spec.zone(input_key, output_key, items).
+"""
+import bpy
+import time
+import json
+import hashlib
+from collections import namedtuple
+from contextlib import contextmanager
+
+GROUP_INPUT = "__group_input__"
+# Custom property holding the fingerprint of the spec a group was built from
+FINGERPRINT_KEY = "spec_fingerprint"
+# Bump when build_tree changes what it creates from the same spec
+BUILDER_VERSION = 2
+
+
+class Ref(namedtuple("Ref", "node socket")):
+    """An output socket of a spec node, by index or name."""
+    __slots__ = ()
+
+    def out(self, socket):
+        return Ref(self.node, socket)
+
+
+def _is_link(value):
+    return isinstance(value, Ref) or (isinstance(value, list) and value and all(isinstance(v, Ref) for v in value))
+
+
+class NodeTreeSpec:
+    def __init__(self, name, tree_type='GeometryNodeTree'):
+        self.name = name
+        self.tree_type = tree_type
+        # (in_out, name, socket_type, default, min, max) in creation order
+        self.sockets = []
+        # key -> {"type", "location", "props", "inputs", "stage"}
+        self.nodes = {}
+        # group output socket name -> Refs
+        self.outputs = {}
+        self.output_location = (0, 0)
+        # stage name -> Ref of the geometry that stage produces, for profiling
+        self.probes = {}
+        # (input key, output key, [(socket_type, name)]) of repeat/simulation zones
+        self.zones = []
+        self._stage = None
+
+    # --- Declaration ---
+
+    def socket(self, name, socket_type, default=None, min_value=None, max_value=None, in_out='INPUT'):
+        self.sockets.append((in_out, name, socket_type, default, min_value, max_value))
+
+    def param(self, name):
+        if not any(s[0] == 'INPUT' and s[1] == name for s in self.sockets):
+            raise KeyError(f"{self.name} has no input socket '{name}'")
+        return Ref(GROUP_INPUT, name)
+
+    def input_names(self):
+        return [s[1] for s in self.sockets if s[0] == 'INPUT' and s[2] != 'NodeSocketGeometry']
+
+    def node(self, key, node_type, location=(0, 0), inputs=None, **props):
+        """Adds a node. inputs maps socket name or index to a default value, a Ref or a list of Refs."""
+        if key in self.nodes:
+            raise KeyError(f"Duplicate node key '{key}' in {self.name}")
+        self.nodes[key] = {"type": node_type, "location": tuple(location), "props": props,
+                           "inputs": dict(inputs or {}), "stage": self._stage}
+        return Ref(key, 0)
+
+    def link(self, ref, key, socket):
+        """Adds a link into an existing node, for links that are easier to declare later."""
+        inputs = self.nodes[key]["inputs"]
+        current = inputs.get(socket)
+        if current is None or not _is_link(current):
+            inputs[socket] = ref
+        else:
+            inputs[socket] = (current if isinstance(current, list) else [current]) + [ref]
+
+    def zone(self, input_key, output_key, items=()):
+        """Pairs a zone's input and output nodes and adds (socket_type, name) items after the default Geometry."""
+        self.zones.append((input_key, output_key, list(items)))
+
+    def output(self, ref, name="Geometry", location=None):
+        self.outputs.setdefault(name, []).append(ref)
+        if location is not None:
+            self.output_location = tuple(location)
+
+    def probe(self, ref, stage=None):
+        """Marks ref as the geometry result of a stage (the current one by default)."""
+        self.probes[stage or self._stage] = ref
+        return ref
+
+    @contextmanager
+    def stage(self, name):
+        """Tags the nodes declared inside the block with a stage name."""
+        previous, self._stage = self._stage, name
+        try:
+            yield
+        finally:
+            self._stage = previous
+
+    def fingerprint(self):
+        """Hash of everything build_tree reads from the spec."""
+        nodes = [[key, n["type"], n["location"], sorted(n["props"].items()),
+                  [[repr(socket), value] for socket, value in n["inputs"].items()]]
+                 for key, n in self.nodes.items()]
+        data = [BUILDER_VERSION, self.name, self.tree_type, self.sockets, nodes,
+                sorted(self.outputs.items()), self.output_location, self.zones]
+        text = json.dumps(data, default=repr)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def stages(self):
+        names = []
+        for n in self.nodes.values():
+            if n["stage"] and n["stage"] not in names:
+                names.append(n["stage"])
+        return names
+
+
+# --- Building ---
+
+def _new_socket(ng, in_out, name, socket_type, default, min_value, max_value):
+    if hasattr(ng, 'interface'):
+        sock = ng.interface.new_socket(name, in_out=in_out, socket_type=socket_type)
+    elif in_out == 'INPUT':
+        sock = ng.inputs.new(socket_type, name)
+    else:
+        sock = ng.outputs.new(socket_type, name)
+    if default is not None:
+        sock.default_value = default
+    if min_value is not None:
+        sock.min_value = min_value
+    if max_value is not None:
+        sock.max_value = max_value
+
+
+def find_socket(sockets, socket):
+    if not isinstance(socket, str):
+        return sockets[socket] if socket < len(sockets) else None
+    # Nodes like Switch or Random Value repeat names per data type, only one is enabled
+    named = [s for s in sockets if s.name == socket]
+    for s in named:
+        if getattr(s, "enabled", True):
+            return s
+    return named[0] if named else None
+
+
+def _clear_tree(ng):
+    ng.nodes.clear()
+    if hasattr(ng, 'interface'):
+        ng.interface.clear()
+    else:
+        ng.inputs.clear()
+        ng.outputs.clear()
+
+
+def build_tree(spec, ng=None):
+    """Builds spec into ng (or a new node group). Returns (ng, stats)."""
+    start = time.perf_counter()
+    if ng is None:
+        ng = bpy.data.node_groups.new(spec.name, spec.tree_type)
+    for sock in spec.sockets:
+        _new_socket(ng, *sock)
+
+    nodes, links = ng.nodes, ng.links
+    built = {}
+    group_inputs = {}
+    fallback_links = 0
+
+    def output_socket(ref):
+        if ref.node == GROUP_INPUT:
+            # One collapsed Group Input node per parameter
+            n = group_inputs.get(ref.socket)
+            if n is None:
+                n = nodes.new('NodeGroupInput')
+                n.name = f"Input {ref.socket}"
+                n.hide = True
+                group_inputs[ref.socket] = n
+            return find_socket(n.outputs, ref.socket)
+        return find_socket(built[ref.node].outputs, ref.socket)
+
+    for key, spec_node in spec.nodes.items():
+        node = nodes.new(spec_node["type"])
+        node.name = key
+        node.location = spec_node["location"]
+        # Properties first, they decide which inputs exist
+        for attr, value in spec_node["props"].items():
+            setattr(node, attr, value)
+        built[key] = node
+
+    # Zone items decide the sockets of both zone nodes, so they come before any link
+    for input_key, output_key, items in spec.zones:
+        zone_out = built[output_key]
+        built[input_key].pair_with_output(zone_out)
+        zone_items = zone_out.repeat_items if hasattr(zone_out, "repeat_items") else zone_out.state_items
+        for socket_type, name in items:
+            zone_items.new(socket_type, name)
+
+    # Links may point forward, so they are made once every node exists
+    for key, spec_node in spec.nodes.items():
+        node = built[key]
+        for socket, value in spec_node["inputs"].items():
+            if not _is_link(value):
+                target = find_socket(node.inputs, socket)
+                if target is None:
+                    raise KeyError(f"Node '{key}' has no input {socket!r}")
+                target.default_value = value
+                continue
+            target = find_socket(node.inputs, socket)
+            if target is None:
+                # Socket renamed in this Blender version, use the main input
+                target = node.inputs[0]
+                fallback_links += 1
+            for ref in (value if isinstance(value, list) else [value]):
+                links.new(output_socket(ref), target)
+
+    n_out = nodes.new('NodeGroupOutput')
+    n_out.location = spec.output_location
+    n_out.is_active_output = True
+    for name, refs in spec.outputs.items():
+        for ref in refs:
+            links.new(output_socket(ref), n_out.inputs[name])
+
+    stats = {
+        "seconds": time.perf_counter() - start,
+        "nodes": len(nodes),
+        "links": len(links),
+        "group_inputs": len(group_inputs),
+        "fallback_links": fallback_links,
+    }
+    print(f"Built {ng.name}: {stats['nodes']} nodes, {stats['links']} links "
+          f"in {stats['seconds'] * 1000:.1f} ms")
+    if fallback_links:
+        print(f"  {fallback_links} links fell back to the node's first input")
+    return ng, stats
+
+
+def is_current(ng, spec):
+    return ng is not None and ng.get(FINGERPRINT_KEY) == spec.fingerprint()
+
+
+def ensure_tree(spec):
+    """Returns (ng, stats), building the group only if its spec changed.
+
+    A stale group is rebuilt in place so modifiers using it stay assigned.
+    stats["reused"] tells whether the build was skipped.
+    """
+    fingerprint = spec.fingerprint()
+    ng = bpy.data.node_groups.get(spec.name)
+    if ng is not None and ng.get(FINGERPRINT_KEY) == fingerprint:
+        print(f"Reusing {ng.name}, spec unchanged")
+        return ng, {"seconds": 0.0, "nodes": len(ng.nodes), "links": len(ng.links), "reused": True}
+    if ng is not None:
+        _clear_tree(ng)
+    ng, stats = build_tree(spec, ng)
+    ng[FINGERPRINT_KEY] = fingerprint
+    stats["reused"] = False
+    return ng, stats
+
+
+def group_input_sockets(ng):
+    if hasattr(ng, 'interface'):
+        return [item for item in ng.interface.items_tree
+                if item.item_type == 'SOCKET' and item.in_out == 'INPUT']
+    return list(ng.inputs)
+
+
+def set_modifier_inputs(mod, values):
+    """Sets a geometry-nodes modifier's inputs by socket name. Returns the names that matched."""
+    matched = set()
+    for sock in group_input_sockets(mod.node_group):
+        if sock.name in values:
+            mod[sock.identifier] = values[sock.name]
+            matched.add(sock.name)
+    if matched:
+        # Custom property writes do not tag the object for re-evaluation
+        mod.id_data.update_tag()
+    return matched
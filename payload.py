@@ -1,7 +1,6 @@
 import bpy
 import sys
 import os
-import imp
 
 sys.path.append("/Users/joem/.gemini/antigravity/scratch/blender_bridge")
 
@@ -11,17 +10,13 @@ print("Running Payload: MEGA SPIDER SWARM (Typo Correction)...")
 bpy.ops.object.select_all(action='SELECT')
 bpy.ops.object.delete()
 
-try:
-    # 2. Run Mega Script
-    import mega_spider_swarm
-    imp.reload(mega_spider_swarm)
-    
+# 2. Run Mega Script
+# The bridge reloads mega_spider_swarm (and what it imports) when its source changes
+import mega_spider_swarm
+
+# The bridge advances run() across timer ticks so the viewport keeps redrawing
+def run():
     # Run Swarm (120 Total)
-    mega_spider_swarm.create_swarm(count=119, range_x=150, range_y=150)
+    yield from mega_spider_swarm.iter_swarm(count=119, range_x=150, range_y=150)
     
     bpy.context.scene.frame_end = 3000
-    
-except Exception as e:
-    print(f"Error: {e}")
-    import traceback
-    traceback.print_exc()
@@ -0,0 +1,159 @@
+"""Per-stage evaluation profile of the v25 city node tree.
+
+For every stage probe of the spec (see NodeTreeSpec.probe) a copy of the
+group has its output rewired to that stage, so the depsgraph only evaluates
+the stage and everything upstream of it. Each truncated tree is evaluated
+for every requested parameter value, timed, and its vertex, face and
+instance counts recorded. The printed table shows cumulative time up to a
+stage and the increase over the nearest stage upstream of it (the window,
+door, antenna and wire branches all start from the buildings).
+
+    blender -b --factory-startup --python profile_city_nodes.py -- \\
+        --values Resolution=30,60,120 --repeat 3 --json city_profile.json
+"""
+import bpy
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+
+# Blender's --python doesn't put this folder on sys.path
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+import node_builder
+import city_instances
+import vcity_v25
+from sweep import parse_values
+
+PROFILE_OBJECT = "CityProfile"
+
+
+def upstream_stages(spec):
+    """stage -> the closest earlier stage whose probe feeds into it, or None."""
+    order = list(spec.probes)
+    parents = {}
+    for stage, ref in spec.probes.items():
+        seen, todo = set(), [ref.node]
+        while todo:
+            key = todo.pop()
+            if key in seen or key not in spec.nodes:
+                continue
+            seen.add(key)
+            for value in spec.nodes[key]["inputs"].values():
+                refs = value if isinstance(value, list) else [value]
+                todo.extend(r.node for r in refs if isinstance(r, node_builder.Ref))
+        earlier = [s for s in order[:order.index(stage)] if spec.probes[s].node in seen]
+        parents[stage] = earlier[-1] if earlier else None
+    return parents
+
+
+def truncated_group(ng, spec, stage):
+    """Copy of ng whose output is the probe geometry of stage."""
+    copy = ng.copy()
+    copy.name = f"{ng.name}_to_{stage}"
+    ref = spec.probes[stage]
+    out = next(n for n in copy.nodes if n.type == 'GROUP_OUTPUT')
+    target = out.inputs["Geometry"]
+    for link in list(target.links):
+        copy.links.remove(link)
+    copy.links.new(node_builder.find_socket(copy.nodes[ref.node].outputs, ref.socket), target)
+    return copy
+
+
+def evaluate(obj, repeat):
+    """Median wall time of re-evaluating obj, plus its evaluated counts."""
+    times = []
+    for _ in range(repeat):
+        obj.update_tag()
+        start = time.perf_counter()
+        bpy.context.view_layer.update()
+        times.append(time.perf_counter() - start)
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    split = city_instances.split_instances(obj, depsgraph)
+    return statistics.median(times), {
+        "vertices": len(split["mesh"]["positions"]),
+        "faces": len(split["mesh"]["face_sizes"]),
+        "instances": len(split["reference"]),
+    }
+
+
+def profile(param, values, repeat=3, stages=None, fixed=None):
+    """Returns one record per (value, stage)."""
+    spec = vcity_v25.v25_spec()
+    ng = vcity_v25.create_v25_nodes(spec)
+    stages = stages or list(spec.probes)
+
+    mesh = bpy.data.meshes.new(PROFILE_OBJECT)
+    obj = bpy.data.objects.new(PROFILE_OBJECT, mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    mod = obj.modifiers.new("Profile", 'NODES')
+
+    records = []
+    try:
+        for stage in stages:
+            group = truncated_group(ng, spec, stage)
+            mod.node_group = group
+            for value in values:
+                node_builder.set_modifier_inputs(mod, dict(fixed or {}, **{param: value}))
+                seconds, counts = evaluate(obj, repeat)
+                records.append(dict(counts, stage=stage, param=param, value=value, seconds=seconds))
+                print(f"{param}={value} {stage}: {seconds * 1000:.1f} ms")
+            mod.node_group = None
+            bpy.data.node_groups.remove(group)
+    finally:
+        bpy.data.objects.remove(obj)
+        bpy.data.meshes.remove(mesh)
+
+    # Time each stage adds on top of the stage it reads from
+    parents = upstream_stages(spec)
+    totals = {(r["stage"], r["value"]): r["seconds"] for r in records}
+    for r in records:
+        base = totals.get((parents[r["stage"]], r["value"]), 0.0)
+        r["stage_seconds"] = max(r["seconds"] - base, 0.0)
+    return records
+
+
+def print_table(records):
+    header = ["value", "stage", "total ms", "stage ms", "vertices", "faces", "instances"]
+    rows = [[str(r["value"]), r["stage"], f"{r['seconds'] * 1000:.1f}", f"{r['stage_seconds'] * 1000:.1f}",
+             str(r["vertices"]), str(r["faces"]), str(r["instances"])]
+            # Stable sort, stages stay in pipeline order within a value
+            for r in sorted(records, key=lambda r: r["value"])]
+    widths = [max(len(h), *(len(row[i]) for row in rows)) for i, h in enumerate(header)]
+    print("  ".join(h.rjust(w) for h, w in zip(header, widths)))
+    for row in rows:
+        print("  ".join(c.rjust(w) for c, w in zip(row, widths)))
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="profile_city_nodes.py")
+    parser.add_argument("--values", default="Resolution=30,60,120", metavar="NAME=VALUES",
+                        help="Parameter to scale, 'v1,v2,...' or 'start:stop[:step]'.")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE",
+                        help="Fixed input value for every run.")
+    parser.add_argument("--stage", action="append", help="Only profile these stages.")
+    parser.add_argument("--repeat", type=int, default=3, help="Evaluations per measurement, the median is kept.")
+    parser.add_argument("--json", help="Write the records to this file.")
+    args = parser.parse_args(argv)
+
+    param, _, text = args.values.partition("=")
+    fixed = {}
+    for item in args.set:
+        name, _, value = item.partition("=")
+        fixed[name] = parse_values(value)[0]
+
+    records = profile(param, parse_values(text), args.repeat, args.stage, fixed)
+    print_table(records)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(records, f, indent=2)
+        print(f"Profile written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,18 @@ PAYLOAD_FILE="$BRIDGE_DIR/payload.py"
 
 # Help
 if [ -z "$1" ]; then
-    echo "Usage: ./run_in_blender.sh <script_to_run.py>"
+    echo "Usage: ./run_in_blender.sh [--socket] <script_to_run.py> [bridge_client.py submit options]"
+    echo "  --socket   Submit over the bridge socket and wait for the job to finish"
+    echo "For parameter sweeps across background Blenders use: python3 sweep.py <script.py> --grid NAME=v1,v2 ..."
     exit 1
 fi
 
+MODE="file"
+if [ "$1" == "--socket" ]; then
+    MODE="socket"
+    shift
+fi
+
 SOURCE_FILE="$1"
 
 # Check if source exists
@@ -18,6 +26,11 @@ if [ ! -f "$SOURCE_FILE" ]; then
     exit 1
 fi
 
+if [ "$MODE" == "socket" ]; then
+    # Client mode: the bridge acknowledges the job and streams its status back
+    exec python3 "$BRIDGE_DIR/bridge_client.py" submit "$SOURCE_FILE" "${@:2}"
+fi
+
 # Copy content to payload
 # We used 'cat' > file to ensure we write a new modification time
 cat "$SOURCE_FILE" > "$PAYLOAD_FILE"
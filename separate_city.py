@@ -1,5 +1,7 @@
 import bpy
 
+import node_builder
+
 def separate_city_to_objects():
     print("Separating City into Individual Objects...")
     
@@ -18,7 +20,10 @@ def separate_city_to_objects():
         print("No City Object found.")
         return
 
-    # 1. Apply Modifier
+    # 1. Apply Modifier, windows and doors have to be real geometry to separate
+    for mod in obj.modifiers:
+        if mod.type == 'NODES' and mod.node_group:
+            node_builder.set_modifier_inputs(mod, {"Realize Instances": True})
     print(f"Applying modifiers on {obj.name}...")
     try:
         bpy.ops.object.modifier_apply(modifier="CityGenV12") # Try specific name
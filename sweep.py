@@ -0,0 +1,183 @@
+"""Parallel parameter sweeps over background Blender processes.
+
+Usage:
+    python3 sweep.py vcity_v25.py --grid Seed=1:9 --grid Resolution=30,60,90 --workers 8 --out sweeps/v25
+    python3 sweep.py mega_spider_swarm.py --entry create_swarm --grid count=10,50,100 --format blend
+
+Every combination of the --grid values runs in its own job on a pool of warm
+`blender -b` workers (blender_pool). Values whose names match a parameter of
+--entry are passed to it, the rest are set on the geometry-nodes modifier
+inputs with that name. Each combination writes one output (.blend or .npz of
+the evaluated meshes) plus a .json with its timings, and summary.csv gathers
+all of them. Re-running the same command skips combinations whose output
+already exists, so an interrupted sweep resumes where it stopped.
+"""
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+import itertools
+from concurrent.futures import as_completed
+
+import blender_pool
+import bridge_protocol
+
+JOB_CODE = "import sweep_job\nresult = sweep_job.run(PARAMS)\n"
+SUMMARY_FIELDS = ("setup", "evaluate", "write", "total")
+
+
+def parse_values(text):
+    """'1,2,3' -> [1, 2, 3], '0:10:2' -> [0, 2, 4, 6, 8], strings stay strings."""
+    if ":" in text and "," not in text:
+        parts = [int(p) for p in text.split(":")]
+        return list(range(*parts))
+    values = []
+    for item in text.split(","):
+        try:
+            values.append(json.loads(item))
+        except ValueError:
+            values.append(item)
+    return values
+
+
+def parse_grid(specs):
+    grid = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        if not sep or not values:
+            raise ValueError(f"Grid entry '{spec}' must look like NAME=v1,v2 or NAME=start:stop[:step]")
+        grid[name] = parse_values(values)
+    return grid
+
+
+def combinations(grid):
+    names = list(grid)
+    for values in itertools.product(*(grid[n] for n in names)):
+        yield dict(zip(names, values))
+
+
+def combination_slug(values):
+    text = "_".join(f"{name}-{value}" for name, value in values.items()) or "default"
+    return "".join(c if c.isalnum() or c in "-_." else "-" for c in text)
+
+
+def write_summary(out_dir, rows):
+    path = os.path.join(out_dir, "summary.csv")
+    names = sorted({k for row in rows for k in row["values"]})
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(names + list(SUMMARY_FIELDS) + ["vertices", "faces", "output"])
+        for row in rows:
+            t = row["timings"]
+            writer.writerow([row["values"].get(n) for n in names] +
+                            [f"{t.get(k, 0.0):.3f}" for k in SUMMARY_FIELDS] +
+                            [row.get("vertices"), row.get("faces"), row["output"]])
+    return path
+
+
+def print_summary(rows):
+    if not rows:
+        return
+    names = sorted({k for row in rows for k in row["values"]})
+    header = names + [f"{k} (s)" for k in SUMMARY_FIELDS] + ["vertices", "faces"]
+    table = [[str(row["values"].get(n)) for n in names] +
+             [f"{row['timings'].get(k, 0.0):.2f}" for k in SUMMARY_FIELDS] +
+             [str(row.get("vertices")), str(row.get("faces"))] for row in rows]
+    widths = [max(len(h), *(len(r[i]) for r in table)) for i, h in enumerate(header)]
+    print("  ".join(h.rjust(w) for h, w in zip(header, widths)))
+    for r in table:
+        print("  ".join(c.rjust(w) for c, w in zip(r, widths)))
+
+
+def load_rows(out_dir, slugs):
+    rows = []
+    for slug in slugs:
+        path = os.path.join(out_dir, slug + ".json")
+        if os.path.exists(path):
+            with open(path) as f:
+                rows.append(json.load(f))
+    return rows
+
+
+def run_sweep(script, grid, out_dir, workers=None, fmt="blend", entry=None, blender=blender_pool.BLENDER_BIN):
+    """Runs every grid combination not done yet. Returns the number of failures."""
+    script = os.path.abspath(script)
+    os.makedirs(out_dir, exist_ok=True)
+    ext = ".npz" if fmt == "npz" else ".blend"
+
+    todo, slugs = [], []
+    for values in combinations(grid):
+        slug = combination_slug(values)
+        slugs.append(slug)
+        output = os.path.abspath(os.path.join(out_dir, slug + ext))
+        # The .json sidecar is written last, an output without one is from an interrupted run
+        if os.path.exists(output) and os.path.exists(os.path.join(out_dir, slug + ".json")):
+            continue
+        todo.append((slug, values, output))
+    print(f"{len(slugs)} combinations, {len(slugs) - len(todo)} already done, {len(todo)} to run.")
+
+    failures = 0
+    if todo:
+        size = min(workers or blender_pool.default_size(), len(todo))
+        started = time.perf_counter()
+        with blender_pool.WorkerPool(size, blender=blender) as pool:
+            futures = {}
+            for slug, values, output in todo:
+                params = {"script": script, "entry": entry, "values": values, "output": output, "format": fmt}
+                futures[pool.submit(JOB_CODE, name=f"<sweep {slug}>", params=params)] = (slug, values, output)
+
+            for done, future in enumerate(as_completed(futures), 1):
+                slug, values, output = futures[future]
+                try:
+                    reply = future.result()
+                except blender_pool.WorkerCrashed as e:
+                    reply = {"ok": False, "error": str(e)}
+                if not reply.get("ok"):
+                    failures += 1
+                    print(f"[{done}/{len(todo)}] FAILED {slug}\n{reply.get('error', '').rstrip()}", file=sys.stderr)
+                    continue
+                result = bridge_protocol.message_result(reply)
+                timings = dict(result["timings"], total=reply["seconds"])
+                row = {"values": values, "timings": timings, "vertices": result["vertices"],
+                       "faces": result["faces"], "output": output}
+                with open(os.path.join(out_dir, slug + ".json"), 'w') as f:
+                    json.dump(row, f, indent=2)
+                print(f"[{done}/{len(todo)}] {slug}: {timings['total']:.2f} s")
+        print(f"Ran {len(todo)} jobs on {size} workers in {time.perf_counter() - started:.1f} s.")
+
+    rows = load_rows(out_dir, slugs)
+    print_summary(rows)
+    print(f"Summary written to {write_summary(out_dir, rows)}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a Blender script over a parameter grid in parallel.")
+    parser.add_argument("script", help="Script building the scene, e.g. vcity_v25.py")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=VALUES",
+                        help="Parameter values, 'v1,v2,...' or 'start:stop[:step]'. Repeat for more parameters.")
+    parser.add_argument("--workers", type=int, help="Background Blender processes (default: cores - 1).")
+    parser.add_argument("--out", default="sweep_output", help="Output folder.")
+    parser.add_argument("--format", choices=("blend", "npz"), default="blend",
+                        help="Save each result as a .blend or as the evaluated mesh arrays.")
+    parser.add_argument("--entry", help="Function to call instead of running the script as __main__.")
+    parser.add_argument("--blender", default=blender_pool.BLENDER_BIN, help="Blender executable.")
+    args = parser.parse_args(argv)
+
+    if not os.path.isfile(args.script):
+        print(f"Error: File '{args.script}' not found.", file=sys.stderr)
+        return 1
+    try:
+        grid = parse_grid(args.grid)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    failures = run_sweep(args.script, grid, args.out, args.workers, args.format, args.entry, args.blender)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
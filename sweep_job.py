@@ -0,0 +1,100 @@
+"""In-Blender half of sweep.py: runs one parameter combination in a worker.
+
+The sweep runner submits `import sweep_job; result = sweep_job.run(PARAMS)`
+to a background Blender from blender_pool. PARAMS holds the script, the
+parameter values, the output path and format.
+"""
+import bpy
+import os
+import time
+import inspect
+import runpy
+import numpy as np
+
+import node_builder
+
+
+def set_modifier_inputs(values):
+    """Sets geometry-nodes modifier inputs by socket name on every object.
+
+    Returns the names that matched at least one modifier input.
+    """
+    matched = set()
+    for obj in bpy.data.objects:
+        for mod in obj.modifiers:
+            if mod.type == 'NODES' and mod.node_group:
+                matched |= node_builder.set_modifier_inputs(mod, values)
+    return matched
+
+
+def evaluated_mesh_arrays(depsgraph):
+    """Evaluated mesh data of every mesh object, keyed '<object>/<array>'."""
+    arrays = {}
+    for obj in bpy.data.objects:
+        if obj.type != 'MESH':
+            continue
+        obj_eval = obj.evaluated_get(depsgraph)
+        mesh = obj_eval.to_mesh()
+        try:
+            co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+            mesh.vertices.foreach_get("co", co)
+            sizes = np.empty(len(mesh.polygons), dtype=np.int32)
+            mesh.polygons.foreach_get("loop_total", sizes)
+            corners = np.empty(len(mesh.loops), dtype=np.int32)
+            mesh.loops.foreach_get("vertex_index", corners)
+        finally:
+            obj_eval.to_mesh_clear()
+        arrays[f"{obj.name}/positions"] = co.reshape(-1, 3)
+        arrays[f"{obj.name}/face_sizes"] = sizes
+        arrays[f"{obj.name}/corner_verts"] = corners
+    return arrays
+
+
+def run(params):
+    script = params["script"]
+    values = dict(params.get("values", {}))
+    output = params["output"]
+    timings = {}
+
+    # 1. Build the scene, either as __main__ or through an entry function
+    start = time.perf_counter()
+    if params.get("entry"):
+        module = runpy.run_path(script, run_name="sweep_script")
+        entry = module[params["entry"]]
+        # Grid values the entry function accepts are passed as arguments
+        accepted = inspect.signature(entry).parameters
+        kwargs = {k: values.pop(k) for k in list(values) if k in accepted}
+        entry(**kwargs)
+    else:
+        runpy.run_path(script, run_name="__main__")
+    timings["setup"] = time.perf_counter() - start
+
+    # 2. The rest are geometry-nodes inputs
+    start = time.perf_counter()
+    missing = set(values) - set_modifier_inputs(values)
+    if missing:
+        raise KeyError(f"No modifier input named {', '.join(sorted(missing))}")
+    # to_mesh() leaves instances out, realize them unless the grid sweeps this input
+    if "Realize Instances" not in values:
+        set_modifier_inputs({"Realize Instances": True})
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    depsgraph.update()
+    arrays = evaluated_mesh_arrays(depsgraph)
+    timings["evaluate"] = time.perf_counter() - start
+
+    # 3. Write to a temporary name first so an interrupted run never looks finished
+    start = time.perf_counter()
+    tmp = output + ".partial"
+    if params.get("format", "blend") == "npz":
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+    else:
+        bpy.ops.wm.save_as_mainfile(filepath=tmp, copy=True, check_existing=False)
+    os.replace(tmp, output)
+    timings["write"] = time.perf_counter() - start
+
+    return {
+        "timings": timings,
+        "vertices": int(sum(len(a) for k, a in arrays.items() if k.endswith("/positions"))),
+        "faces": int(sum(len(a) for k, a in arrays.items() if k.endswith("/face_sizes"))),
+    }
@@ -0,0 +1,1015 @@
+"""One Voronoi city generator, with the differences between versions as feature flags.
+
+vcity_v4.py to vcity_v25.py each rebuilt the grid -> dual mesh -> extrude
+pipeline with small changes. Here the pipeline is built once from a
+features dict (see FEATURES) and every legacy script is a preset of it:
+
+    import vcity_engine
+    ng = vcity_engine.create_city_nodes("v12")
+    ng = vcity_engine.create_city_nodes(dict(vcity_engine.FEATURES, wires=False), name="CityNoWires")
+
+Group inputs keep the v25 names whatever the preset, e.g. the legacy
+"Floors" input is "Max Floors" and "Inset Amount" is "Road Gap".
+city_regression.py evaluates every preset next to its legacy script and
+compares the geometry and timings.
+"""
+import bpy
+
+from node_builder import NodeTreeSpec, ensure_tree
+from city_numpy import PART_BUILDING, PART_WINDOW, PART_DOOR, PART_ANTENNA, PART_WIRE
+
+# Group inputs: name, socket type, default, min, max
+SOCKETS = [
+    ("Resolution", 'NodeSocketInt', 30, 2, None),
+    ("Distortion", 'NodeSocketFloat', 5.0, 0.0, None),
+    ("Street Width", 'NodeSocketFloat', 0.75, 0.0, 1.0),
+    # Streets as a gap instead of a footprint scale, cells are not split apart
+    ("Road Gap", 'NodeSocketFloat', 0.15, 0.0, 0.99),
+    ("Min Height", 'NodeSocketFloat', 1.0, 0.0, None),
+    ("Max Height", 'NodeSocketFloat', 6.0, 0.0, None),
+    # Noise heights: Height Scale is the noise scale, Height Amp its range
+    ("Height Scale", 'NodeSocketFloat', 0.12, None, None),
+    ("Height Amp", 'NodeSocketFloat', 8.0, None, None),
+    # Floor Height 0: every building gets Max Floors, otherwise one floor
+    # per Floor Height of its height, at most Max Floors
+    ("Max Floors", 'NodeSocketInt', 4, 1, 32),
+    ("Floor Height", 'NodeSocketFloat', 0.0, 0.0, None),
+    ("Seed", 'NodeSocketInt', 700, None, None),
+    ("Color Seed", 'NodeSocketInt', 123, None, None),
+    # Building colours, evenly spaced hues
+    ("Palette Size", 'NodeSocketInt', 4, 1, 32),
+    ("Min Taper", 'NodeSocketFloat', 0.8, 0.3, 1.0),
+    ("Max Taper", 'NodeSocketFloat', 1.0, 0.3, 1.0),
+    ("Taper Seed", 'NodeSocketInt', 456, None, None),
+    ("Window Density", 'NodeSocketFloat', 15.0, 1.0, 50.0),
+    ("Window Scale", 'NodeSocketFloat', 0.08, 0.01, 0.3),
+    ("Antenna Chance", 'NodeSocketFloat', 0.3, 0.0, 1.0),
+    ("Wire Density", 'NodeSocketFloat', 0.02, 0.0, 0.1),
+    # Wires per rooftop point at most, and their longest span
+    ("Wire Neighbors", 'NodeSocketInt', 3, 1, 8),
+    ("Wire Max Span", 'NodeSocketFloat', 8.0, 0.0, None),
+    # 0 full detail, 1 no windows or doors, 2 flat-roof boxes only
+    ("LOD", 'NodeSocketInt', 0, 0, 2),
+    # Off: windows, doors and antennas leave the modifier as instances
+    ("Realize Instances", 'NodeSocketBool', False, None, None),
+]
+
+# The current city (v25). Presets override some of these.
+FEATURES = {
+    "grid_size": 50.0,
+    # Distortion amount as an input, otherwise fixed at 5
+    "distortion_input": False,
+    # "split": cells split apart and scaled by Street Width
+    # "gap": cells scaled by 1 - Road Gap without splitting
+    "streets": "split",
+    # Flat road cells under the buildings, moved by road_offset in Z
+    "roads": True,
+    "road_offset": 0.0,
+    # "random": Min to Max Height per cell, "noise": noise over position
+    # times Height Amp plus height_base
+    "heights": "random",
+    "height_base": 0.5,
+    # ID of the random values per cell: "index", "position", or None for
+    # the same value everywhere
+    "height_id": "index",
+    # 1: one extrusion, "input": Max Floors / Floor Height per building
+    "floors": "input",
+    # Top of every floor scaled by a random TaperFactor per building
+    "taper": True,
+    # MatID per cell: None, "random" (by index) or "noise" (by position)
+    "mat_id": "random",
+    # "single", "road_building", "color_factor" (a ColorFactor attribute for
+    # a ramp), "index" (material index = MatID), "per_id" (one Set Material
+    # per MatID) or "palette" (one material, BuildingColor from MatID)
+    "materials": "palette",
+    # Buildings moved up this much so they don't z-fight the roads
+    "lift": 0.005,
+    "windows": True,
+    "doors": True,
+    "antennas": True,
+    "wires": True,
+    "lod": True,
+    "realize": True,
+}
+
+_V9 = dict(FEATURES, distortion_input=True, floors=1, taper=False, mat_id=None, materials="road_building", lift=0.0,
+           windows=False, doors=False, antennas=False, wires=False, lod=False, realize=False)
+_V9_DEFAULTS = {"Resolution": 40, "Distortion": 5.0, "Street Width": 0.8, "Min Height": 0.2, "Max Height": 4.0}
+_V23_DEFAULTS = {"Resolution": 40, "Street Width": 0.8, "Min Height": 2.0, "Max Height": 8.0}
+
+# Legacy script -> features, input defaults, and the script's module and
+# group name for city_regression.py. Only geometry is meant to match, the
+# comments list what the presets leave out.
+PRESETS = {
+    "v4": {"module": "vcity_v4", "group": "VoronoiCity_V4",
+           "features": dict(_V9, grid_size=40.0, streets="gap", roads=False, heights="noise", height_base=0.2,
+                            materials="single"),
+           "defaults": {"Resolution": 50, "Road Gap": 0.1, "Height Scale": 0.15, "Seed": 0}},
+    "v5": {"module": "vcity_v5", "group": "VoronoiCity_V5",
+           "features": dict(_V9, streets="gap", road_offset=-0.02, heights="noise"),
+           "defaults": {"Resolution": 40, "Seed": 123}},
+    "v6": {"module": "vcity_v6", "group": "VoronoiCity_V6",
+           "features": dict(_V9, streets="gap", road_offset=-0.01, heights="noise"),
+           "defaults": {"Resolution": 40, "Seed": 123}},
+    # v7 read its height ID from a CellID attribute it never wrote, so all
+    # buildings share one height
+    "v7": {"module": "vcity_v7", "group": "VoronoiCity_V7",
+           "features": dict(_V9, roads=False, height_id=None, materials="single"),
+           "defaults": {"Resolution": 150, "Street Width": 0.9, "Min Height": 0.5, "Max Height": 6.0, "Seed": 123}},
+    "v7_1": {"module": "vcity_v7_1", "group": "VoronoiCity_V7_1",
+             "features": dict(_V9, roads=False, materials="single"),
+             "defaults": {"Resolution": 150, "Street Width": 0.9, "Min Height": 0.5, "Max Height": 6.0, "Seed": 123}},
+    "v8": {"module": "vcity_v8", "group": "VoronoiCity_V8",
+           "features": dict(_V9, roads=False, materials="single"),
+           "defaults": {"Resolution": 150, "Street Width": 0.9, "Min Height": 0.5, "Max Height": 6.0, "Seed": 123}},
+    "v9": {"module": "vcity_v9", "group": "VoronoiCity_V9", "features": _V9, "defaults": dict(_V9_DEFAULTS, Seed=200)},
+    "v9_1": {"module": "vcity_v9_1", "group": "VoronoiCity_V9", "features": _V9,
+             "defaults": dict(_V9_DEFAULTS, Seed=200)},
+    "v10": {"module": "vcity_v10", "group": "VoronoiCity_V10", "features": _V9,
+            "defaults": dict(_V9_DEFAULTS, Seed=300)},
+    "v11": {"module": "vcity_v11", "group": "VoronoiCity_V11", "features": _V9,
+            "defaults": dict(_V9_DEFAULTS, Seed=400)},
+    "v11_fix": {"module": "vcity_v11_fix", "group": "VoronoiCity_V11_Fix", "features": _V9,
+                "defaults": dict(_V9_DEFAULTS, Seed=400)},
+    # Without the IsBuilding tags, v12 named the nodes instead of the attributes
+    "v12": {"module": "vcity_v12", "group": "VoronoiCity_V12", "features": dict(_V9, lift=0.005),
+            "defaults": dict(_V9_DEFAULTS, Seed=500)},
+    # v13 to v16 seeded the colour from Seed + 55, the mesh island or the
+    # position, the preset uses Color Seed and the height ID
+    "v13": {"module": "vcity_v13", "group": "VoronoiCity_V13",
+            "features": dict(_V9, lift=0.005, materials="color_factor"), "defaults": dict(_V9_DEFAULTS, Seed=600)},
+    "v14": {"module": "vcity_v14", "group": "VoronoiCity_V14",
+            "features": dict(_V9, lift=0.005, materials="color_factor"), "defaults": dict(_V9_DEFAULTS, Seed=600)},
+    "v15": {"module": "vcity_v15", "group": "VoronoiCity_V15",
+            "features": dict(_V9, lift=0.005, materials="color_factor"), "defaults": dict(_V9_DEFAULTS, Seed=600)},
+    "v16": {"module": "vcity_v16", "group": "VoronoiCity_V16",
+            "features": dict(_V9, lift=0.005, materials="color_factor", height_id="position"),
+            "defaults": dict(_V9_DEFAULTS, Seed=700, **{"Color Seed": 999})},
+    # v17 to v19 drew an integer material index (by position from v18), the
+    # presets floor a random MatID by index
+    "v17": {"module": "vcity_v17", "group": "VoronoiCity_V17",
+            "features": dict(_V9, distortion_input=False, lift=0.005, mat_id="random", materials="index",
+                             height_id="position"),
+            "defaults": _V9_DEFAULTS},
+    "v18": {"module": "vcity_v18", "group": "VoronoiCity_V18",
+            "features": dict(_V9, distortion_input=False, lift=0.005, mat_id="random", materials="index",
+                             height_id="position"),
+            "defaults": _V9_DEFAULTS},
+    "v19": {"module": "vcity_v19", "group": "VoronoiCity_V19",
+            "features": dict(_V9, distortion_input=False, lift=0.005, mat_id="random", materials="index",
+                             height_id="position"),
+            "defaults": _V9_DEFAULTS},
+    "v20": {"module": "vcity_v20", "group": "VoronoiCity_V20_Fix",
+            "features": dict(_V9, distortion_input=False, lift=0.005, mat_id="noise", materials="per_id",
+                             height_id="position"),
+            "defaults": _V9_DEFAULTS},
+    "v21": {"module": "vcity_v21", "group": "VoronoiCity_V21",
+            "features": dict(_V9, distortion_input=False, lift=0.005, mat_id="noise", materials="per_id",
+                             height_id="position"),
+            "defaults": _V9_DEFAULTS},
+    "v22": {"module": "vcity_v22", "group": "VoronoiCity_V22",
+            "features": dict(_V9, distortion_input=False, lift=0.005, mat_id="random", materials="per_id"),
+            "defaults": _V9_DEFAULTS},
+    "v23": {"module": "vcity_v23", "group": "VoronoiCity_V23",
+            "features": dict(FEATURES, materials="per_id", windows=False, doors=False, antennas=False, wires=False,
+                             lod=False, realize=False),
+            "defaults": _V23_DEFAULTS},
+    # The legacy convex-hull wires deleted the hull's edges with its faces,
+    # so these versions never had wires
+    "v23_detailed": {"module": "vcity_v23_detailed", "group": "VoronoiCity_V23",
+                     "features": dict(FEATURES, materials="per_id", wires=False, lod=False, realize=False),
+                     "defaults": {}},
+    "v23_fixed": {"module": "vcity_v23_fixed", "group": "VoronoiCity_V23",
+                  "features": dict(FEATURES, materials="per_id", wires=False, lod=False, realize=False),
+                  "defaults": {}},
+    "v24": {"module": "vcity_v24", "group": "VoronoiCity_V24_Details",
+            "features": dict(FEATURES, materials="per_id", wires=False, lod=False, realize=False),
+            "defaults": {}},
+    "v25": {"module": "vcity_v25_legacy", "group": "VoronoiCity_V25_Legacy", "features": FEATURES, "defaults": {}},
+}
+
+# Set Material node key -> material
+MATERIAL_NODES = {
+    "mat_road": "Mat_Road",
+    "mat_building": "Mat_Building",
+    "mat_building_1": "Mat_Building_Red",
+    "mat_building_2": "Mat_Building_Blue",
+    "mat_building_3": "Mat_Building_Orange",
+    "mat_building_4": "Mat_Building_Green",
+    "mat_window": "Mat_Window",
+    "mat_door": "Mat_Door",
+    "mat_antenna": "Mat_Antenna",
+    "mat_wire": "Mat_Wire",
+}
+
+# MatID values of the "per_id" material mode
+PER_ID_MATERIALS = 4
+
+# Floors built without repeat zones (before Blender 4.0), Max Floors is capped to it
+UNROLLED_FLOORS = 8
+
+# Custom properties of a baked layout object (vcity_v25's cached setup)
+LAYOUT_KEY = "layout_key"
+LAYOUT_PARAMS = "layout_params"
+
+
+def preset_features(preset):
+    """Full features dict of a preset name or a partial features dict."""
+    if isinstance(preset, str):
+        if preset not in PRESETS:
+            raise KeyError(f"No city preset '{preset}', have {', '.join(PRESETS)}")
+        preset = PRESETS[preset]["features"]
+    unknown = set(preset) - set(FEATURES)
+    if unknown:
+        raise KeyError(f"Unknown city features {', '.join(sorted(unknown))}")
+    f = dict(FEATURES, **preset)
+    if f["materials"] in ("index", "per_id", "palette") and not f["mat_id"]:
+        raise ValueError(f"materials '{f['materials']}' needs a mat_id")
+    return f
+
+
+def socket_names(f):
+    """Group inputs the features read, in SOCKETS order."""
+    names = {"Resolution", "Seed"}
+    if f["distortion_input"]:
+        names.add("Distortion")
+    names.add("Road Gap" if f["streets"] == "gap" else "Street Width")
+    names |= {"Height Scale", "Height Amp"} if f["heights"] == "noise" else {"Min Height", "Max Height"}
+    if f["floors"] == "input":
+        names |= {"Max Floors", "Floor Height"}
+    if f["mat_id"] or f["materials"] == "color_factor":
+        names.add("Color Seed")
+    if f["materials"] == "palette":
+        names.add("Palette Size")
+    if f["taper"]:
+        names |= {"Min Taper", "Max Taper", "Taper Seed"}
+    if f["windows"]:
+        names |= {"Window Density", "Window Scale"}
+    if f["antennas"]:
+        names.add("Antenna Chance")
+    if f["wires"]:
+        names |= {"Wire Density", "Wire Neighbors", "Wire Max Span"}
+    if f["lod"]:
+        names.add("LOD")
+    if f["realize"]:
+        names.add("Realize Instances")
+    return [name for name, *_ in SOCKETS if name in names]
+
+
+def add_sockets(spec, names, defaults=None):
+    spec.socket("Geometry", 'NodeSocketGeometry')
+    spec.socket("Geometry", 'NodeSocketGeometry', in_out='OUTPUT')
+    defaults = defaults or {}
+    for name, socket_type, default, min_value, max_value in SOCKETS:
+        if name in names:
+            spec.socket(name, socket_type, defaults.get(name, default), min_value, max_value)
+
+
+def lod_stage(spec):
+    """Level of detail. The switches get a single value, so only the selected branch is evaluated."""
+    P = spec.param
+    with spec.stage("Level of Detail"):
+        lod_full = spec.node("lod_full", 'FunctionNodeCompare', (-1200, 900), data_type='INT', operation='EQUAL', inputs={
+            "A": P("LOD"), "B": 0,
+        })
+        lod_roofs = spec.node("lod_roofs", 'FunctionNodeCompare', (-1200, 750), data_type='INT', operation='LESS_EQUAL', inputs={
+            "A": P("LOD"), "B": 1,
+        })
+    return lod_full, lod_roofs
+
+
+def layout_stages(spec, f=FEATURES):
+    """Grid to building materials. Returns (roads or None, buildings, (lod_full, lod_roofs) or None)."""
+    P = spec.param
+    node = spec.node
+
+    # =====================
+    # 1. Grid
+    # =====================
+    with spec.stage("Grid"):
+        grid = node("grid", 'GeometryNodeMeshGrid', (-2400, 0), inputs={
+            0: f["grid_size"], 1: f["grid_size"],
+            "Vertices X": P("Resolution"),
+            "Vertices Y": P("Resolution"),
+        })
+        spec.probe(grid)
+
+    # =====================
+    # 2. Distortion
+    # =====================
+    with spec.stage("Distortion"):
+        noise = node("noise", 'ShaderNodeTexNoise', (-2400, -300), noise_dimensions='4D', inputs={
+            "Scale": 5.0,
+            "W": P("Seed"),
+        })
+        sub = node("noise_center", 'ShaderNodeVectorMath', operation='SUBTRACT', inputs={
+            1: (0.5, 0.5, 0.5), 0: noise,
+        })
+        amount = P("Distortion") if f["distortion_input"] else 5.0
+        scale = node("noise_scale", 'ShaderNodeVectorMath', operation='SCALE', inputs={3: amount, 0: sub})
+        flat = node("noise_flat", 'ShaderNodeVectorMath', operation='MULTIPLY', inputs={
+            1: (1.0, 1.0, 0.0), 0: scale,
+        })
+        set_pos = node("distort", 'GeometryNodeSetPosition', (-2200, 0), inputs={
+            "Geometry": grid, "Offset": flat,
+        })
+        spec.probe(set_pos)
+
+    # =====================
+    # 3. Voronoi (Dual Mesh)
+    # =====================
+    with spec.stage("Voronoi"):
+        tri = node("triangulate", 'GeometryNodeTriangulate', (-2000, 0), inputs={"Mesh": set_pos})
+        dual = node("dual_mesh", 'GeometryNodeDualMesh', (-1800, 0), inputs={"Mesh": tri})
+        spec.probe(dual)
+
+    # =====================
+    # 4. Generate MatID & TaperFactor per cell
+    # =====================
+    with spec.stage("Cell Attributes"):
+        materials = f["materials"]
+        # Random value IDs, None gives every cell the same values
+        ids = {None: 0}
+        if f["height_id"] == "index" or f["mat_id"] == "random" or f["taper"]:
+            ids["index"] = node("index", 'GeometryNodeInputIndex', (-1800, 400))
+        if f["height_id"] == "position" or f["mat_id"] == "noise":
+            ids["position"] = node("cell_position", 'GeometryNodeInputPosition', (-1800, 800))
+        cell_id = ids[f["height_id"]]
+
+        if f["mat_id"] == "random":
+            # MatID (1 to Palette Size)
+            mat_max = 4.99
+            if materials == "palette":
+                mat_max = node("mat_max", 'ShaderNodeMath', (-1800, 600), operation='ADD', inputs={
+                    0: P("Palette Size"), 1: 0.99,
+                })
+            rand_mat = node("rand_mat", 'FunctionNodeRandomValue', (-1600, 500), data_type='FLOAT', inputs={
+                "Min": 1.0, "Max": mat_max, "ID": ids["index"], "Seed": P("Color Seed"),
+            })
+            floor_mat = node("floor_mat", 'ShaderNodeMath', (-1400, 500), operation='FLOOR', inputs={
+                0: rand_mat.out(1),
+            })
+        elif f["mat_id"] == "noise":
+            # MatID (1 to 4) from high-frequency noise over the cell position
+            mat_noise = node("mat_noise", 'ShaderNodeTexNoise', (-1600, 500), noise_dimensions='4D', inputs={
+                "Scale": 100.0, "Vector": ids["position"], "W": P("Color Seed"),
+            })
+            mat_range = node("mat_range", 'ShaderNodeMapRange', (-1500, 500), inputs={
+                "Value": mat_noise.out("Fac"), "From Min": 0.0, "From Max": 1.0, "To Min": 1.0, "To Max": 4.99,
+            })
+            floor_mat = node("floor_mat", 'ShaderNodeMath', (-1400, 500), operation='FLOOR', inputs={0: mat_range})
+
+        if f["taper"]:
+            # TaperFactor per building
+            rand_taper = node("rand_taper", 'FunctionNodeRandomValue', (-1600, 300), data_type='FLOAT', inputs={
+                "Min": P("Min Taper"), "Max": P("Max Taper"), "ID": ids["index"], "Seed": P("Taper Seed"),
+            })
+
+        cells = dual
+        if f["mat_id"]:
+            cells = node("store_mat", 'GeometryNodeStoreNamedAttribute', (-1600, 0),
+                         data_type='INT', domain='FACE', inputs={
+                "Name": "MatID", "Geometry": cells, "Value": floor_mat,
+            })
+        if f["taper"]:
+            cells = node("store_taper", 'GeometryNodeStoreNamedAttribute', (-1400, 0),
+                         data_type='FLOAT', domain='FACE', inputs={
+                "Name": "TaperFactor", "Geometry": cells, "Value": rand_taper.out(1),
+            })
+
+        if materials == "palette":
+            # BuildingColor from MatID, read by the single building material.
+            # Stored on the cells, extrusion copies it to every building face
+            mat_index = node("mat_index", 'ShaderNodeMath', (-1200, 700), operation='SUBTRACT', inputs={
+                0: floor_mat, 1: 1.0,
+            })
+            hue = node("palette_hue", 'ShaderNodeMath', (-1000, 700), operation='DIVIDE', inputs={
+                0: mat_index, 1: P("Palette Size"),
+            })
+            color = node("palette_color", 'FunctionNodeCombineColor', (-800, 700), mode='HSV', inputs={
+                0: hue, 1: 0.75, 2: 0.7,
+            })
+            cells = node("store_color", 'GeometryNodeStoreNamedAttribute', (-1200, 0),
+                         data_type='FLOAT_COLOR', domain='FACE', inputs={
+                "Name": "BuildingColor", "Geometry": cells, "Value": color,
+            })
+        elif materials == "color_factor":
+            # ColorFactor 0 to 1 per building, for a colour ramp in the building material
+            rand_color = node("rand_color", 'FunctionNodeRandomValue', (-1000, 700), data_type='FLOAT', inputs={
+                "Min": 0.0, "Max": 1.0, "ID": cell_id, "Seed": P("Color Seed"),
+            })
+            cells = node("store_color_factor", 'GeometryNodeStoreNamedAttribute', (-1200, 0),
+                         data_type='FLOAT', domain='FACE', inputs={
+                "Name": "ColorFactor", "Geometry": cells, "Value": rand_color.out(1),
+            })
+        if cells != dual:
+            spec.probe(cells)
+
+    # =====================
+    # 5. Roads Branch
+    # =====================
+    roads = None
+    if f["roads"]:
+        with spec.stage("Roads"):
+            roads = cells
+            if f["road_offset"]:
+                roads = node("road_offset", 'GeometryNodeTransform', (-1000, -400), inputs={
+                    "Geometry": roads, "Translation": (0, 0, f["road_offset"]),
+                })
+            if materials == "index":
+                # Slot 0 is the road material, buildings use slots 1 to 4
+                roads = node("road_index", 'GeometryNodeSetMaterialIndex', (-800, -400), inputs={
+                    "Geometry": roads, "Material Index": 0,
+                })
+            else:
+                roads = node("mat_road", 'GeometryNodeSetMaterial', (-800, -400), inputs={"Geometry": roads})
+            spec.probe(roads)
+
+    # =====================
+    # 6. Buildings Branch - Split, Shrink, Multi-Extrude with Taper
+    # =====================
+    with spec.stage("Footprints"):
+        if f["streets"] == "gap":
+            # Connected cells scale as one piece, the gap shows between the outer ones
+            gap = node("street_gap", 'ShaderNodeMath', (-1200, 350), operation='SUBTRACT', inputs={
+                0: 1.0, 1: P("Road Gap"),
+            })
+            shrink = node("shrink", 'GeometryNodeScaleElements', (-1000, 200), domain='FACE', inputs={
+                "Geometry": cells, "Scale": gap,
+            })
+        else:
+            split = node("split_edges", 'GeometryNodeSplitEdges', (-1200, 200), inputs={"Mesh": cells})
+            shrink = node("shrink", 'GeometryNodeScaleElements', (-1000, 200), domain='FACE', inputs={
+                "Geometry": split, "Scale": P("Street Width"),
+            })
+
+        # Per-building columns for city_buildings.py, extrusion copies them
+        # to every face of the building
+        cell_index = ids.get("index") or node("footprint_index", 'GeometryNodeInputIndex', (-1200, -450))
+        area = node("footprint_area", 'GeometryNodeInputMeshFaceArea', (-1000, -450))
+        center = node("footprint_center", 'GeometryNodeInputPosition', (-800, -450))
+        tagged = node("store_building_id", 'GeometryNodeStoreNamedAttribute', (-1200, -250),
+                      data_type='INT', domain='FACE', inputs={
+            "Name": "BuildingID", "Geometry": shrink, "Value": cell_index,
+        })
+        tagged = node("store_footprint_area", 'GeometryNodeStoreNamedAttribute', (-1000, -250),
+                      data_type='FLOAT', domain='FACE', inputs={
+            "Name": "FootprintArea", "Geometry": tagged, "Value": area,
+        })
+        # Position on the face domain is the mean of its corners
+        tagged = node("store_centroid", 'GeometryNodeStoreNamedAttribute', (-800, -250),
+                      data_type='FLOAT_VECTOR', domain='FACE', inputs={
+            "Name": "Centroid", "Geometry": tagged, "Value": center,
+        })
+        footprints = node("store_part", 'GeometryNodeStoreNamedAttribute', (-600, -250),
+                          data_type='INT', domain='FACE', inputs={
+            "Name": "Part", "Geometry": tagged, "Value": PART_BUILDING,
+        })
+        spec.probe(footprints)
+
+    lod = lod_stage(spec) if f["lod"] else None
+
+    with spec.stage("Floors"):
+        # Height calculation
+        if f["heights"] == "noise":
+            position = node("height_position", 'GeometryNodeInputPosition', (-1400, 600))
+            noise_h = node("height_noise", 'ShaderNodeTexNoise', (-1200, 600), inputs={
+                "Vector": position, "Scale": P("Height Scale"),
+            })
+            amp = node("height_amp", 'ShaderNodeMath', (-1000, 600), operation='MULTIPLY', inputs={
+                0: noise_h.out("Fac"), 1: P("Height Amp"),
+            })
+            height = node("height_base", 'ShaderNodeMath', (-800, 600), operation='ADD', inputs={
+                0: amp, 1: f["height_base"],
+            })
+        else:
+            rand_h = node("rand_height", 'FunctionNodeRandomValue', (-1000, 600), data_type='FLOAT', inputs={
+                "Min": P("Min Height"), "Max": P("Max Height"), "ID": cell_id, "Seed": P("Seed"),
+            })
+            height = rand_h.out(1)
+
+        if f["floors"] == "input":
+            geometry = _floor_stack(spec, f, footprints, height)
+        else:
+            ext = node("extrude", 'GeometryNodeExtrudeMesh', (-600, 200), inputs={
+                "Mesh": footprints, "Offset Scale": height,
+            })
+            geometry = ext
+            if f["taper"]:
+                read_taper = node("read_taper", 'GeometryNodeInputNamedAttribute', (-200, 350), data_type='FLOAT', inputs={
+                    "Name": "TaperFactor",
+                })
+                geometry = node("taper", 'GeometryNodeScaleElements', (-400, 200), domain='FACE', inputs={
+                    "Geometry": ext, "Selection": ext.out("Top"), "Scale": read_taper.out("Attribute"),
+                })
+
+        if lod:
+            # LOD2: one extrusion to full height, no taper
+            box = node("extrude_box", 'GeometryNodeExtrudeMesh', (-600, -50), inputs={
+                "Mesh": footprints, "Offset Scale": height,
+            })
+            geometry = node("lod_masses", 'GeometryNodeSwitch', (1200, 200), input_type='GEOMETRY', inputs={
+                "Switch": lod[1], "False": box, "True": geometry,
+            })
+        spec.probe(geometry)
+
+    # =====================
+    # 7. Material Assignment
+    # =====================
+    with spec.stage("Materials"):
+        if materials == "per_id":
+            read_mat = node("read_mat", 'GeometryNodeInputNamedAttribute', (1400, 600), data_type='INT', inputs={
+                "Name": "MatID",
+            })
+            for mat_id in range(1, PER_ID_MATERIALS + 1):
+                is_id = node(f"mat_is_{mat_id}", 'FunctionNodeCompare', (1200 + mat_id * 200, 400),
+                             data_type='INT', operation='EQUAL', inputs={
+                    "A": read_mat.out("Attribute"), "B": mat_id,
+                })
+                geometry = node(f"mat_building_{mat_id}", 'GeometryNodeSetMaterial', (1200 + mat_id * 200, 200), inputs={
+                    "Geometry": geometry, "Selection": is_id,
+                })
+            buildings = spec.probe(geometry)
+        elif materials == "index":
+            read_mat = node("read_mat", 'GeometryNodeInputNamedAttribute', (1400, 600), data_type='INT', inputs={
+                "Name": "MatID",
+            })
+            buildings = spec.probe(node("building_index", 'GeometryNodeSetMaterialIndex', (1400, 200), inputs={
+                "Geometry": geometry, "Material Index": read_mat.out("Attribute"),
+            }))
+        else:
+            # One material for every building, with "palette" its colour comes from BuildingColor
+            buildings = spec.probe(node("mat_building", 'GeometryNodeSetMaterial', (1400, 200), inputs={
+                "Geometry": geometry,
+            }))
+
+    return roads, buildings, lod
+
+
+def _floor_stack(spec, f, footprints, height):
+    """Per-building floors, extruded one at a time. Returns the stacked geometry."""
+    P = spec.param
+    node = spec.node
+
+    # Floors per building, stored with the height on the footprints so
+    # every floor of a building reads the same values
+    by_height = node("floors_by_height", 'ShaderNodeMath', (-1000, 1000), operation='GREATER_THAN', inputs={
+        0: P("Floor Height"), 1: 0.0,
+    })
+    height_floors = node("height_floors", 'ShaderNodeMath', (-1000, 850), operation='DIVIDE', inputs={
+        0: height, 1: P("Floor Height"),
+    })
+    height_floors = node("height_floors_ceil", 'ShaderNodeMath', (-800, 850), operation='CEIL', inputs={
+        0: height_floors,
+    })
+    height_floors = node("height_floors_clamp", 'ShaderNodeClamp', (-600, 850), inputs={
+        "Value": height_floors, "Min": 1.0, "Max": P("Max Floors"),
+    })
+    floor_count = node("floor_count", 'GeometryNodeSwitch', (-400, 900), input_type='FLOAT', inputs={
+        "Switch": by_height, "False": P("Max Floors"), "True": height_floors,
+    })
+    store_h = node("store_height", 'GeometryNodeStoreNamedAttribute', (-800, 200),
+                   data_type='FLOAT', domain='FACE', inputs={
+        "Name": "Height", "Geometry": footprints, "Value": height,
+    })
+    store_floors = node("store_floors", 'GeometryNodeStoreNamedAttribute', (-600, 200),
+                        data_type='INT', domain='FACE', inputs={
+        "Name": "Floors", "Geometry": store_h, "Value": floor_count,
+    })
+    # floor_top marks the faces the next floor extrudes
+    store_top = node("store_floor_top", 'GeometryNodeStoreNamedAttribute', (-400, 200),
+                     data_type='BOOLEAN', domain='FACE', inputs={
+        "Name": "floor_top", "Geometry": store_floors, "Value": True,
+    })
+
+    read_h = node("read_height", 'GeometryNodeInputNamedAttribute', (-400, 650), data_type='FLOAT', inputs={
+        "Name": "Height",
+    })
+    read_floors = node("read_floors", 'GeometryNodeInputNamedAttribute', (-400, 500), data_type='INT', inputs={
+        "Name": "Floors",
+    })
+    read_top = node("read_floor_top", 'GeometryNodeInputNamedAttribute', (-200, 500), data_type='BOOLEAN', inputs={
+        "Name": "floor_top",
+    })
+    floor_step = node("floor_step", 'ShaderNodeMath', (-200, 650), operation='DIVIDE', inputs={
+        0: read_h.out("Attribute"), 1: read_floors.out("Attribute"),
+    })
+    if f["taper"]:
+        read_taper = node("read_taper", 'GeometryNodeInputNamedAttribute', (-200, 350), data_type='FLOAT', inputs={
+            "Name": "TaperFactor",
+        })
+
+    def extrude_floor(suffix, geometry, floor, x):
+        """One floor on the top faces of buildings that have more than `floor` floors."""
+        below = node(f"floor_below{suffix}", 'ShaderNodeMath', (x, 500), operation='LESS_THAN', inputs={
+            0: floor, 1: read_floors.out("Attribute"),
+        })
+        selection = node(f"floor_selection{suffix}", 'ShaderNodeMath', (x + 200, 500), operation='MULTIPLY', inputs={
+            0: read_top.out("Attribute"), 1: below,
+        })
+        ext = node(f"extrude{suffix}", 'GeometryNodeExtrudeMesh', (x, 200), inputs={
+            "Mesh": geometry, "Selection": selection, "Offset Scale": floor_step,
+        })
+        top = ext.out("Top")
+        tagged = node(f"floor_top{suffix}", 'GeometryNodeStoreNamedAttribute', (x + 200, 200),
+                      data_type='BOOLEAN', domain='FACE', inputs={
+            "Name": "floor_top", "Geometry": ext, "Value": top,
+        })
+        if not f["taper"]:
+            return tagged
+        return node(f"taper{suffix}", 'GeometryNodeScaleElements', (x + 400, 200), domain='FACE', inputs={
+            "Geometry": tagged, "Selection": top, "Scale": read_taper.out("Attribute"),
+        })
+
+    if hasattr(bpy.types, "GeometryNodeRepeatInput"):
+        # One extrusion per iteration, as many iterations as the tallest building has floors
+        iterations = node("floor_iterations", 'GeometryNodeAttributeStatistic', (-200, 0),
+                          data_type='FLOAT', domain='FACE', inputs={
+            "Geometry": store_top, "Attribute": read_floors.out("Attribute"),
+        })
+        loop_in = node("floor_loop", 'GeometryNodeRepeatInput', (0, 200), inputs={
+            "Iterations": iterations.out("Max"), "Geometry": store_top, "Floor": 0,
+        })
+        next_floor = node("next_floor", 'ShaderNodeMath', (200, 0), operation='ADD', inputs={
+            0: loop_in.out("Floor"), 1: 1.0,
+        })
+        floors = extrude_floor("", loop_in.out("Geometry"), loop_in.out("Floor"), 200)
+        loop_out = node("floor_loop_end", 'GeometryNodeRepeatOutput', (800, 200), inputs={
+            "Geometry": floors, "Floor": next_floor,
+        })
+        spec.zone("floor_loop", "floor_loop_end", [('INT', "Floor")])
+        geometry = loop_out.out("Geometry")
+    else:
+        # No repeat zones, unrolled floors
+        geometry = store_top
+        for floor in range(UNROLLED_FLOORS):
+            geometry = extrude_floor(f"_{floor + 1}", geometry, floor, floor * 600)
+    return node("floor_top_clear", 'GeometryNodeRemoveAttribute', (1000, 200), inputs={
+        "Geometry": geometry, "Name": "floor_top",
+    })
+
+
+def decoration_stages(spec, roads, buildings, lod, f=FEATURES):
+    """Windows, doors, antennas and wires on the buildings, joined with the roads."""
+    P = spec.param
+    node = spec.node
+    lod_full, lod_roofs = lod or (None, None)
+    shared = {}
+
+    def lod_switch(key, geometry, switch, x, y):
+        if switch is None:
+            return geometry
+        return node(key, 'GeometryNodeSwitch', (x, y), input_type='GEOMETRY', inputs={
+            "Switch": switch, "True": geometry,
+        })
+
+    def normal_z():
+        """Z of the face normal, and whether the face is a side face."""
+        if "is_side" not in shared:
+            # Separate side faces (normal.z close to 0)
+            normal = node("normal", 'GeometryNodeInputNormal', (1800, 600))
+            sep_z = node("normal_xyz", 'ShaderNodeSeparateXYZ', (2000, 600), inputs={"Vector": normal})
+            # abs(normal.z) < 0.1 means side face
+            n_abs = node("normal_z_abs", 'ShaderNodeMath', (2200, 600), operation='ABSOLUTE', inputs={
+                0: sep_z.out("Z"),
+            })
+            shared["sep_z"] = sep_z
+            shared["is_side"] = node("is_side", 'ShaderNodeMath', (2400, 600), operation='LESS_THAN', inputs={
+                1: 0.1, 0: n_abs,
+            })
+        return shared["sep_z"], shared["is_side"]
+
+    def position():
+        if "position" not in shared:
+            shared["position"] = node("position", 'GeometryNodeInputPosition', (1800, -200))
+            shared["sep_pos"] = node("position_xyz", 'ShaderNodeSeparateXYZ', (2000, -200), inputs={
+                "Vector": shared["position"],
+            })
+        return shared["position"], shared["sep_pos"]
+
+    def roof_faces():
+        if "is_roof" not in shared:
+            sep_z, _side = normal_z()
+            _pos, sep_pos = position()
+            # Top faces: normal.z > 0.9
+            top_check = node("is_top", 'ShaderNodeMath', (2200, -500), operation='GREATER_THAN', inputs={
+                1: 0.9, 0: sep_z.out("Z"),
+            })
+            # High Z position (above 1.0)
+            high_check = node("is_high", 'ShaderNodeMath', (2200, -650), operation='GREATER_THAN', inputs={
+                1: 1.0, 0: sep_pos.out("Z"),
+            })
+            # Combine top + high
+            shared["is_roof"] = node("is_roof", 'ShaderNodeMath', (2400, -550), operation='MULTIPLY', inputs={
+                0: top_check, 1: high_check,
+            })
+        return shared["is_roof"]
+
+    decorations = []
+
+    # =====================
+    # 8. WINDOWS - Distribute on side faces
+    # =====================
+    if f["windows"]:
+        with spec.stage("Windows"):
+            _sep_z, side_check = normal_z()
+
+            # Distribute points on side faces for windows
+            dist_win = node("window_points", 'GeometryNodeDistributePointsOnFaces', (2600, 400),
+                            distribute_method='POISSON', inputs={
+                "Mesh": buildings, "Selection": side_check, "Density": P("Window Density"), "Seed": P("Seed"),
+            })
+
+            # Window instance (small cube)
+            win_cube = node("window_cube", 'GeometryNodeMeshCube', (2600, 200), inputs={"Size": (0.15, 0.02, 0.2)})
+            win_scale_vec = node("window_scale", 'ShaderNodeCombineXYZ', (2600, 50), inputs={
+                "X": P("Window Scale"), "Y": P("Window Scale"), "Z": P("Window Scale"),
+            })
+            win_transform = node("window_transform", 'GeometryNodeTransform', (2800, 200), inputs={
+                "Geometry": win_cube, "Scale": win_scale_vec,
+            })
+
+            # Align windows to face normal
+            align_rot = node("window_align", 'FunctionNodeAlignRotationToVector', (2800, 500), axis='Y', inputs={
+                "Vector": dist_win.out("Normal"),
+            })
+            inst_win = node("window_instances", 'GeometryNodeInstanceOnPoints', (3000, 400), inputs={
+                "Points": dist_win.out("Points"), "Instance": win_transform, "Rotation": align_rot,
+            })
+            # Instances keep the BuildingID of their face, Part tells them apart
+            inst_win = node("window_part", 'GeometryNodeStoreNamedAttribute', (3100, 500),
+                            data_type='INT', domain='INSTANCE', inputs={
+                "Name": "Part", "Geometry": inst_win, "Value": PART_WINDOW,
+            })
+            mat_win = node("mat_window", 'GeometryNodeSetMaterial', (3200, 400), inputs={"Geometry": inst_win})
+            decorations.append(spec.probe(lod_switch("lod_windows", mat_win, lod_full, 3400, 400)))
+
+    # =====================
+    # 9. DOORS - At ground level on side faces
+    # =====================
+    if f["doors"]:
+        with spec.stage("Doors"):
+            _sep_z, side_check = normal_z()
+            _pos, sep_pos = position()
+            # Z < 0.3 for ground level
+            ground = node("is_ground", 'ShaderNodeMath', (2200, -200), operation='LESS_THAN', inputs={
+                1: 0.3, 0: sep_pos.out("Z"),
+            })
+            # Combine: side face AND ground level
+            door_sel = node("is_door", 'ShaderNodeMath', (2400, -200), operation='MULTIPLY', inputs={
+                0: side_check, 1: ground,
+            })
+
+            # Distribute door points (sparse)
+            dist_door = node("door_points", 'GeometryNodeDistributePointsOnFaces', (2600, -200),
+                             distribute_method='POISSON', inputs={
+                "Density": 0.5, "Distance Min": 1.5, "Mesh": buildings, "Selection": door_sel,
+            })
+            # Door geometry (taller box)
+            door_cube = node("door_cube", 'GeometryNodeMeshCube', (2600, -400), inputs={"Size": (0.25, 0.03, 0.4)})
+            align_door = node("door_align", 'FunctionNodeAlignRotationToVector', (2800, -100), axis='Y', inputs={
+                "Vector": dist_door.out("Normal"),
+            })
+            inst_door = node("door_instances", 'GeometryNodeInstanceOnPoints', (3000, -200), inputs={
+                "Points": dist_door.out("Points"), "Instance": door_cube, "Rotation": align_door,
+            })
+            inst_door = node("door_part", 'GeometryNodeStoreNamedAttribute', (3100, -100),
+                             data_type='INT', domain='INSTANCE', inputs={
+                "Name": "Part", "Geometry": inst_door, "Value": PART_DOOR,
+            })
+            mat_door = node("mat_door", 'GeometryNodeSetMaterial', (3200, -200), inputs={"Geometry": inst_door})
+            decorations.append(spec.probe(lod_switch("lod_doors", mat_door, lod_full, 3400, -200)))
+
+    # =====================
+    # 10. ANTENNAS - On roof tops
+    # =====================
+    if f["antennas"]:
+        with spec.stage("Antennas"):
+            roof_sel = roof_faces()
+
+            # Random selection for antenna chance
+            rand_ant = node("rand_antenna", 'FunctionNodeRandomValue', (2400, -700), data_type='FLOAT', inputs={
+                "Min": 0.0, "Max": 1.0,
+            })
+            ant_thresh = node("antenna_chance", 'ShaderNodeMath', (2600, -700), operation='LESS_THAN', inputs={
+                0: rand_ant.out(1), 1: P("Antenna Chance"),
+            })
+            ant_final = node("is_antenna", 'ShaderNodeMath', (2800, -600), operation='MULTIPLY', inputs={
+                0: roof_sel, 1: ant_thresh,
+            })
+
+            dist_ant = node("antenna_points", 'GeometryNodeDistributePointsOnFaces', (3000, -550),
+                            distribute_method='POISSON', inputs={
+                "Density": 0.3, "Distance Min": 2.0, "Mesh": buildings, "Selection": ant_final,
+            })
+
+            # Antenna geometry (cylinder + sphere on top)
+            ant_cyl = node("antenna_mast", 'GeometryNodeMeshCylinder', (3000, -750), inputs={
+                "Radius": 0.02, "Depth": 0.6, "Vertices": 8,
+            })
+            ant_sphere = node("antenna_ball", 'GeometryNodeMeshUVSphere', (3000, -900), inputs={
+                "Radius": 0.05, "Segments": 8, "Rings": 6,
+            })
+            sphere_move = node("antenna_ball_lift", 'GeometryNodeTransform', (3200, -900), inputs={
+                "Translation": (0, 0, 0.3), "Geometry": ant_sphere,
+            })
+            join_ant = node("antenna_join", 'GeometryNodeJoinGeometry', (3400, -800), inputs={
+                "Geometry": [ant_cyl.out("Mesh"), sphere_move],
+            })
+
+            # Random rotation for variety
+            rand_rot = node("antenna_rotation", 'FunctionNodeRandomValue', (3400, -500), data_type='FLOAT_VECTOR', inputs={
+                "Min": (-0.2, -0.2, 0.0), "Max": (0.2, 0.2, 6.28),
+            })
+            inst_ant = node("antenna_instances", 'GeometryNodeInstanceOnPoints', (3600, -550), inputs={
+                "Points": dist_ant.out("Points"), "Instance": join_ant, "Rotation": rand_rot.out(1),
+            })
+            inst_ant = node("antenna_part", 'GeometryNodeStoreNamedAttribute', (3700, -450),
+                            data_type='INT', domain='INSTANCE', inputs={
+                "Name": "Part", "Geometry": inst_ant, "Value": PART_ANTENNA,
+            })
+            mat_ant = node("mat_antenna", 'GeometryNodeSetMaterial', (3800, -550), inputs={"Geometry": inst_ant})
+            decorations.append(spec.probe(lod_switch("lod_antennas", mat_ant, lod_roofs, 4000, -550)))
+
+    # =====================
+    # 11. WIRES - Curves between random rooftop points
+    # =====================
+    if f["wires"]:
+        with spec.stage("Wires"):
+            roof_sel = roof_faces()
+            sep_z, _side = normal_z()
+            pos, sep_pos = position()
+            # Get points on rooftops for wire endpoints
+            dist_wire = node("wire_points", 'GeometryNodeDistributePointsOnFaces', (3000, -1100),
+                             distribute_method='POISSON', inputs={
+                "Distance Min": 3.0, "Mesh": buildings, "Selection": roof_sel, "Density": P("Wire Density"),
+            })
+            # Offset points up slightly
+            wire_up = node("wire_up", 'ShaderNodeCombineXYZ', inputs={"Z": 0.3})
+            wire_offset = node("wire_lift", 'GeometryNodeSetPosition', (3200, -1100), inputs={
+                "Geometry": dist_wire.out("Points"), "Offset": wire_up,
+            })
+            pts_to_verts = node("wire_vertices", 'GeometryNodePointsToVertices', (3400, -1100), inputs={
+                "Points": wire_offset,
+            })
+            flat_pos = node("wire_flat_position", 'ShaderNodeVectorMath', (3200, -1500), operation='MULTIPLY', inputs={
+                0: pos, 1: (1.0, 1.0, 0.0),
+            })
+
+            # Proximity graph: the lower convex hull of the points lifted onto
+            # z = x^2 + y^2 is their Delaunay triangulation, n log n. It holds
+            # each point's nearest neighbour but not all of its k nearest, so the
+            # wires below approximate a k-nearest graph within the Delaunay edges
+            lift_z = node("wire_lift_z", 'ShaderNodeVectorMath', (3400, -1500), operation='DOT_PRODUCT', inputs={
+                0: flat_pos, 1: flat_pos,
+            })
+            lifted_pos = node("wire_lifted_position", 'ShaderNodeCombineXYZ', (3600, -1500), inputs={
+                "X": sep_pos.out("X"), "Y": sep_pos.out("Y"), "Z": lift_z.out("Value"),
+            })
+            lifted = node("wire_lifted", 'GeometryNodeSetPosition', (3600, -1200), inputs={
+                "Geometry": pts_to_verts, "Position": lifted_pos,
+            })
+            convex = node("wire_hull", 'GeometryNodeConvexHull', (3800, -1200), inputs={"Geometry": lifted})
+            # Upper hull faces point up, deleting them leaves the triangulation
+            is_upper = node("wire_is_upper", 'ShaderNodeMath', (3800, -1500), operation='GREATER_THAN', inputs={
+                0: sep_z.out("Z"), 1: 0.0,
+            })
+            lower = node("wire_lower_hull", 'GeometryNodeDeleteGeometry', (4000, -1200), domain='FACE', mode='ALL',
+                         inputs={"Geometry": convex, "Selection": is_upper})
+            tri_edges = node("wire_triangulation", 'GeometryNodeDeleteGeometry', (4200, -1200), domain='FACE',
+                             mode='ONLY_FACE', inputs={"Geometry": lower})
+
+            # The hull does not keep attributes, take each vertex's roof position
+            # back from the nearest point in XY
+            flat_points = node("wire_flat_points", 'GeometryNodeSetPosition', (3600, -1700), inputs={
+                "Geometry": pts_to_verts, "Position": flat_pos,
+            })
+            nearest = node("wire_nearest_point", 'GeometryNodeSampleNearest', (4000, -1700), inputs={
+                "Geometry": flat_points, "Sample Position": flat_pos,
+            })
+            roof_pos = node("wire_roof_position", 'GeometryNodeSampleIndex', (4200, -1700), data_type='FLOAT_VECTOR',
+                            domain='POINT', inputs={
+                "Geometry": pts_to_verts, "Value": pos, "Index": nearest.out("Index"),
+            })
+            graph = node("wire_graph", 'GeometryNodeSetPosition', (4400, -1200), inputs={
+                "Geometry": tri_edges, "Position": roof_pos.out("Value"),
+            })
+
+            # Keep a Delaunay edge if it spans at most Wire Max Span and is among
+            # the Wire Neighbors shortest Delaunay edges of both its points, so no
+            # point has more than that many wires
+            edge_verts = node("wire_edge_vertices", 'GeometryNodeInputMeshEdgeVertices', (4400, -1900))
+            span = node("wire_span", 'ShaderNodeVectorMath', (4600, -1900), operation='DISTANCE', inputs={
+                0: edge_verts.out("Position 1"), 1: edge_verts.out("Position 2"),
+            })
+            degree = node("wire_degree", 'GeometryNodeInputMeshVertexNeighbors', (4400, -2100))
+            k = node("wire_k", 'ShaderNodeMath', (4600, -2100), operation='MINIMUM', inputs={
+                0: P("Wire Neighbors"), 1: degree.out("Vertex Count"),
+            })
+            k_last = node("wire_k_last", 'ShaderNodeMath', (4800, -2100), operation='SUBTRACT', inputs={0: k, 1: 1.0})
+            kth_edge = node("wire_kth_edge", 'GeometryNodeEdgesOfVertex', (5000, -2100), inputs={
+                "Weights": span.out("Value"), "Sort Index": k_last,
+            })
+            kth_span = node("wire_kth_span", 'GeometryNodeFieldAtIndex', (5200, -2100), data_type='FLOAT', domain='EDGE',
+                            inputs={"Index": kth_edge.out("Edge Index"), "Value": span.out("Value")})
+            too_long = node("wire_too_long", 'ShaderNodeMath', (4800, -1900), operation='GREATER_THAN', inputs={
+                0: span.out("Value"), 1: P("Wire Max Span"),
+            })
+            cut = too_long
+            for end in (1, 2):
+                limit = node(f"wire_limit_{end}", 'GeometryNodeFieldAtIndex', (5400, -1900 - end * 150), data_type='FLOAT',
+                             domain='POINT', inputs={"Index": edge_verts.out(f"Vertex Index {end}"), "Value": kth_span})
+                beyond = node(f"wire_beyond_{end}", 'ShaderNodeMath', (5600, -1900 - end * 150), operation='GREATER_THAN',
+                              inputs={0: span.out("Value"), 1: limit})
+                cut = node(f"wire_cut_{end}", 'ShaderNodeMath', (5800, -1900 - end * 150), operation='MAXIMUM', inputs={
+                    0: cut, 1: beyond,
+                })
+            network = node("wire_network", 'GeometryNodeDeleteGeometry', (4600, -1200), domain='EDGE', mode='ALL',
+                           inputs={"Geometry": graph, "Selection": cut})
+            # One spline per edge, MeshToCurve would join chains of degree-2 vertices
+            # and sag the whole chain instead of each span
+            spans = node("wire_split", 'GeometryNodeSplitEdges', (4700, -1200), inputs={"Mesh": network})
+            mesh_to_curve = node("wire_curves", 'GeometryNodeMeshToCurve', (4800, -1200), inputs={"Mesh": spans})
+
+            # Subdivide and sag with a position offset
+            subdiv = node("wire_subdivide", 'GeometryNodeSubdivideCurve', (5200, -1200), inputs={
+                "Cuts": 4, "Curve": mesh_to_curve,
+            })
+            # Parabolic sag: 4 * t * (1-t) peaks at 0.5
+            spline_param = node("wire_param", 'GeometryNodeSplineParameter', (5000, -1350))
+            one_minus = node("wire_one_minus", 'ShaderNodeMath', (5200, -1350), operation='SUBTRACT', inputs={
+                0: 1.0, 1: spline_param.out("Factor"),
+            })
+            sag_mult = node("wire_sag_shape", 'ShaderNodeMath', (5400, -1350), operation='MULTIPLY', inputs={
+                0: spline_param.out("Factor"), 1: one_minus,
+            })
+            sag_scale = node("wire_sag_depth", 'ShaderNodeMath', (5600, -1350), operation='MULTIPLY', inputs={
+                1: -0.5, 0: sag_mult,  # Negative for downward sag
+            })
+            sag_vec = node("wire_sag_offset", 'ShaderNodeCombineXYZ', (5800, -1350), inputs={"Z": sag_scale})
+            sag_pos = node("wire_sag", 'GeometryNodeSetPosition', (5400, -1200), inputs={
+                "Geometry": subdiv, "Offset": sag_vec,
+            })
+
+            # Give wires thickness
+            wire_profile = node("wire_profile", 'GeometryNodeCurvePrimitiveCircle', (5600, -1100), inputs={
+                "Radius": 0.015, "Resolution": 6,
+            })
+            curve_to_mesh = node("wire_mesh", 'GeometryNodeCurveToMesh', (5800, -1200), inputs={
+                "Curve": sag_pos, "Profile Curve": wire_profile,
+            })
+            curve_to_mesh = node("wire_part", 'GeometryNodeStoreNamedAttribute', (5900, -1100),
+                                 data_type='INT', domain='FACE', inputs={
+                "Name": "Part", "Geometry": curve_to_mesh, "Value": PART_WIRE,
+            })
+            mat_wire = node("mat_wire", 'GeometryNodeSetMaterial', (6000, -1200), inputs={"Geometry": curve_to_mesh})
+            decorations.append(spec.probe(lod_switch("lod_wires", mat_wire, lod_roofs, 6100, -1200)))
+
+    # =====================
+    # 12. Final Join
+    # =====================
+    with spec.stage("Join"):
+        if f["lift"]:
+            buildings = node("building_lift", 'GeometryNodeTransform', (3400, 200), inputs={
+                "Translation": (0, 0, f["lift"]), "Geometry": buildings,
+            })
+        parts = ([roads] if roads else []) + [buildings] + decorations
+        result = parts[0]
+        if len(parts) > 1:
+            result = node("join_all", 'GeometryNodeJoinGeometry', (6300, 0), inputs={"Geometry": parts})
+        if f["realize"]:
+            realize = node("realize", 'GeometryNodeRealizeInstances', (6500, -150), inputs={"Geometry": result})
+            result = node("realize_switch", 'GeometryNodeSwitch', (6700, 0), input_type='GEOMETRY', inputs={
+                "Switch": P("Realize Instances"), "False": result, "True": realize,
+            })
+        spec.probe(result)
+    return result
+
+
+def city_spec(preset="v25", name=None, defaults=None):
+    """The whole city in one group, from a preset name or a features dict.
+
+    defaults overrides input defaults on top of a named preset's own.
+    """
+    f = preset_features(preset)
+    if isinstance(preset, str):
+        defaults = dict(PRESETS[preset]["defaults"], **(defaults or {}))
+    spec = NodeTreeSpec(name or f"CityEngine_{preset if isinstance(preset, str) else 'Custom'}")
+    add_sockets(spec, socket_names(f), defaults)
+    roads, buildings, lod = layout_stages(spec, f)
+    spec.output(decoration_stages(spec, roads, buildings, lod, f), "Geometry", location=(7000, 0))
+    return spec
+
+
+def assign_materials(ng):
+    for key, name in MATERIAL_NODES.items():
+        node, mat = ng.nodes.get(key), bpy.data.materials.get(name)
+        if node and mat:
+            node.inputs["Material"].default_value = mat
+
+
+def create_city_nodes(preset="v25", name=None, defaults=None):
+    # Rebuilt only when the spec differs from the one the group was built from
+    ng, _stats = ensure_tree(city_spec(preset, name, defaults))
+    assign_materials(ng)
+    return ng
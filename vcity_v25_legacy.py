@@ -0,0 +1,597 @@
+"""The v25 city as it was built before vcity_engine, kept for city_regression.py.
+
+A frozen copy of vcity_v25's own node-tree spec (windows, doors, antennas,
+proximity wires, LOD, floors and building colours). PRESETS["v25"] points
+here so the engine's v25 is compared against an independent builder rather
+than against itself. Only geometry fixes go in, as the per-span wire sag did;
+the engine's named attribute stores are left out.
+"""
+import bpy
+
+from node_builder import NodeTreeSpec, ensure_tree
+
+# Group inputs: name, socket type, default, min, max
+SOCKETS = [
+    ("Resolution", 'NodeSocketInt', 30, 2, None),
+    ("Street Width", 'NodeSocketFloat', 0.75, 0.0, 1.0),
+    ("Min Height", 'NodeSocketFloat', 1.0, 0.0, None),
+    ("Max Height", 'NodeSocketFloat', 6.0, 0.0, None),
+    # Floor Height 0: every building gets Max Floors, otherwise one floor
+    # per Floor Height of its height, at most Max Floors
+    ("Max Floors", 'NodeSocketInt', 4, 1, 32),
+    ("Floor Height", 'NodeSocketFloat', 0.0, 0.0, None),
+    ("Seed", 'NodeSocketInt', 700, None, None),
+    ("Color Seed", 'NodeSocketInt', 123, None, None),
+    # Building colours, evenly spaced hues
+    ("Palette Size", 'NodeSocketInt', 4, 1, 32),
+    ("Min Taper", 'NodeSocketFloat', 0.8, 0.3, 1.0),
+    ("Max Taper", 'NodeSocketFloat', 1.0, 0.3, 1.0),
+    ("Taper Seed", 'NodeSocketInt', 456, None, None),
+    ("Window Density", 'NodeSocketFloat', 15.0, 1.0, 50.0),
+    ("Window Scale", 'NodeSocketFloat', 0.08, 0.01, 0.3),
+    ("Antenna Chance", 'NodeSocketFloat', 0.3, 0.0, 1.0),
+    ("Wire Density", 'NodeSocketFloat', 0.02, 0.0, 0.1),
+    # Wires per rooftop point at most, and their longest span
+    ("Wire Neighbors", 'NodeSocketInt', 3, 1, 8),
+    ("Wire Max Span", 'NodeSocketFloat', 8.0, 0.0, None),
+    # 0 full detail, 1 no windows or doors, 2 flat-roof boxes only
+    ("LOD", 'NodeSocketInt', 0, 0, 2),
+    # Off: windows, doors and antennas leave the modifier as instances
+    ("Realize Instances", 'NodeSocketBool', False, None, None),
+]
+# Inputs of the layout (footprints, heights, taper, MatID). The cached setup
+# bakes the layout once per combination of these and only re-evaluates the
+
+# Floors built without repeat zones (before Blender 4.0), Max Floors is capped to it
+UNROLLED_FLOORS = 8
+
+GROUP = "VoronoiCity_V25_Legacy"
+
+def _sockets(spec, names):
+    spec.socket("Geometry", 'NodeSocketGeometry')
+    spec.socket("Geometry", 'NodeSocketGeometry', in_out='OUTPUT')
+    for name, socket_type, default, min_value, max_value in SOCKETS:
+        if name in names:
+            spec.socket(name, socket_type, default, min_value, max_value)
+
+def _lod_stage(spec):
+    """Level of detail. The switches get a single value, so only the selected branch is evaluated."""
+    P = spec.param
+    with spec.stage("Level of Detail"):
+        lod_full = spec.node("lod_full", 'FunctionNodeCompare', (-1200, 900), data_type='INT', operation='EQUAL', inputs={
+            "A": P("LOD"), "B": 0,
+        })
+        lod_roofs = spec.node("lod_roofs", 'FunctionNodeCompare', (-1200, 750), data_type='INT', operation='LESS_EQUAL', inputs={
+            "A": P("LOD"), "B": 1,
+        })
+    return lod_full, lod_roofs
+
+def _layout_stages(spec):
+    """Grid to building materials. Returns (roads, buildings, (lod_full, lod_roofs))."""
+    P = spec.param
+    node = spec.node
+
+    # =====================
+    # 1. Grid
+    # =====================
+    with spec.stage("Grid"):
+        grid = node("grid", 'GeometryNodeMeshGrid', (-2400, 0), inputs={
+            0: 50.0, 1: 50.0,
+            "Vertices X": P("Resolution"),
+            "Vertices Y": P("Resolution"),
+        })
+        spec.probe(grid)
+
+    # =====================
+    # 2. Distortion
+    # =====================
+    with spec.stage("Distortion"):
+        noise = node("noise", 'ShaderNodeTexNoise', (-2400, -300), noise_dimensions='4D', inputs={
+            "Scale": 5.0,
+            "W": P("Seed"),
+        })
+        sub = node("noise_center", 'ShaderNodeVectorMath', operation='SUBTRACT', inputs={
+            1: (0.5, 0.5, 0.5), 0: noise,
+        })
+        scale = node("noise_scale", 'ShaderNodeVectorMath', operation='SCALE', inputs={3: 5.0, 0: sub})
+        flat = node("noise_flat", 'ShaderNodeVectorMath', operation='MULTIPLY', inputs={
+            1: (1.0, 1.0, 0.0), 0: scale,
+        })
+        set_pos = node("distort", 'GeometryNodeSetPosition', (-2200, 0), inputs={
+            "Geometry": grid, "Offset": flat,
+        })
+        spec.probe(set_pos)
+
+    # =====================
+    # 3. Voronoi (Dual Mesh)
+    # =====================
+    with spec.stage("Voronoi"):
+        tri = node("triangulate", 'GeometryNodeTriangulate', (-2000, 0), inputs={"Mesh": set_pos})
+        dual = node("dual_mesh", 'GeometryNodeDualMesh', (-1800, 0), inputs={"Mesh": tri})
+        spec.probe(dual)
+
+    # =====================
+    # 4. Generate MatID & TaperFactor per cell
+    # =====================
+    with spec.stage("Cell Attributes"):
+        idx = node("index", 'GeometryNodeInputIndex', (-1800, 400))
+
+        # MatID (1 to Palette Size)
+        mat_max = node("mat_max", 'ShaderNodeMath', (-1800, 600), operation='ADD', inputs={
+            0: P("Palette Size"), 1: 0.99,
+        })
+        rand_mat = node("rand_mat", 'FunctionNodeRandomValue', (-1600, 500), data_type='FLOAT', inputs={
+            "Min": 1.0, "Max": mat_max, "ID": idx, "Seed": P("Color Seed"),
+        })
+        floor_mat = node("floor_mat", 'ShaderNodeMath', (-1400, 500), operation='FLOOR', inputs={
+            0: rand_mat.out(1),
+        })
+
+        # TaperFactor per building
+        rand_taper = node("rand_taper", 'FunctionNodeRandomValue', (-1600, 300), data_type='FLOAT', inputs={
+            "Min": P("Min Taper"), "Max": P("Max Taper"), "ID": idx, "Seed": P("Taper Seed"),
+        })
+
+        store_mat = node("store_mat", 'GeometryNodeStoreNamedAttribute', (-1600, 0),
+                         data_type='INT', domain='FACE', inputs={
+            "Name": "MatID", "Geometry": dual, "Value": floor_mat,
+        })
+        store_taper = node("store_taper", 'GeometryNodeStoreNamedAttribute', (-1400, 0),
+                           data_type='FLOAT', domain='FACE', inputs={
+            "Name": "TaperFactor", "Geometry": store_mat, "Value": rand_taper.out(1),
+        })
+
+        # BuildingColor from MatID, read by the single building material.
+        # Stored on the cells, extrusion copies it to every building face
+        mat_index = node("mat_index", 'ShaderNodeMath', (-1200, 700), operation='SUBTRACT', inputs={
+            0: floor_mat, 1: 1.0,
+        })
+        hue = node("palette_hue", 'ShaderNodeMath', (-1000, 700), operation='DIVIDE', inputs={
+            0: mat_index, 1: P("Palette Size"),
+        })
+        color = node("palette_color", 'FunctionNodeCombineColor', (-800, 700), mode='HSV', inputs={
+            0: hue, 1: 0.75, 2: 0.7,
+        })
+        cells = node("store_color", 'GeometryNodeStoreNamedAttribute', (-1200, 0),
+                     data_type='FLOAT_COLOR', domain='FACE', inputs={
+            "Name": "BuildingColor", "Geometry": store_taper, "Value": color,
+        })
+        spec.probe(cells)
+
+    # =====================
+    # 5. Roads Branch
+    # =====================
+    with spec.stage("Roads"):
+        mat_road = node("mat_road", 'GeometryNodeSetMaterial', (-800, -400), inputs={"Geometry": cells})
+        spec.probe(mat_road)
+
+    # =====================
+    # 6. Buildings Branch - Split, Shrink, Multi-Extrude with Taper
+    # =====================
+    with spec.stage("Footprints"):
+        split = node("split_edges", 'GeometryNodeSplitEdges', (-1200, 200), inputs={"Mesh": cells})
+        shrink = node("shrink", 'GeometryNodeScaleElements', (-1000, 200), domain='FACE', inputs={
+            "Geometry": split, "Scale": P("Street Width"),
+        })
+        spec.probe(shrink)
+
+    lod_full, lod_roofs = _lod_stage(spec)
+
+    with spec.stage("Floors"):
+        # Height calculation
+        rand_h = node("rand_height", 'FunctionNodeRandomValue', (-1000, 600), data_type='FLOAT', inputs={
+            "Min": P("Min Height"), "Max": P("Max Height"), "ID": idx, "Seed": P("Seed"),
+        })
+        # Floors per building, stored with the height on the footprints so
+        # every floor of a building reads the same values
+        by_height = node("floors_by_height", 'ShaderNodeMath', (-1000, 1000), operation='GREATER_THAN', inputs={
+            0: P("Floor Height"), 1: 0.0,
+        })
+        height_floors = node("height_floors", 'ShaderNodeMath', (-1000, 850), operation='DIVIDE', inputs={
+            0: rand_h.out(1), 1: P("Floor Height"),
+        })
+        height_floors = node("height_floors_ceil", 'ShaderNodeMath', (-800, 850), operation='CEIL', inputs={
+            0: height_floors,
+        })
+        height_floors = node("height_floors_clamp", 'ShaderNodeClamp', (-600, 850), inputs={
+            "Value": height_floors, "Min": 1.0, "Max": P("Max Floors"),
+        })
+        floor_count = node("floor_count", 'GeometryNodeSwitch', (-400, 900), input_type='FLOAT', inputs={
+            "Switch": by_height, "False": P("Max Floors"), "True": height_floors,
+        })
+        store_h = node("store_height", 'GeometryNodeStoreNamedAttribute', (-800, 200),
+                       data_type='FLOAT', domain='FACE', inputs={
+            "Name": "Height", "Geometry": shrink, "Value": rand_h.out(1),
+        })
+        store_floors = node("store_floors", 'GeometryNodeStoreNamedAttribute', (-600, 200),
+                            data_type='INT', domain='FACE', inputs={
+            "Name": "Floors", "Geometry": store_h, "Value": floor_count,
+        })
+        # floor_top marks the faces the next floor extrudes
+        store_top = node("store_floor_top", 'GeometryNodeStoreNamedAttribute', (-400, 200),
+                         data_type='BOOLEAN', domain='FACE', inputs={
+            "Name": "floor_top", "Geometry": store_floors, "Value": True,
+        })
+
+        read_h = node("read_height", 'GeometryNodeInputNamedAttribute', (-400, 650), data_type='FLOAT', inputs={
+            "Name": "Height",
+        })
+        read_floors = node("read_floors", 'GeometryNodeInputNamedAttribute', (-400, 500), data_type='INT', inputs={
+            "Name": "Floors",
+        })
+        read_top = node("read_floor_top", 'GeometryNodeInputNamedAttribute', (-200, 500), data_type='BOOLEAN', inputs={
+            "Name": "floor_top",
+        })
+        floor_step = node("floor_step", 'ShaderNodeMath', (-200, 650), operation='DIVIDE', inputs={
+            0: read_h.out("Attribute"), 1: read_floors.out("Attribute"),
+        })
+        read_taper = node("read_taper", 'GeometryNodeInputNamedAttribute', (-200, 350), data_type='FLOAT', inputs={
+            "Name": "TaperFactor",
+        })
+
+        def extrude_floor(suffix, geometry, floor, x):
+            """One floor on the top faces of buildings that have more than `floor` floors."""
+            below = node(f"floor_below{suffix}", 'ShaderNodeMath', (x, 500), operation='LESS_THAN', inputs={
+                0: floor, 1: read_floors.out("Attribute"),
+            })
+            selection = node(f"floor_selection{suffix}", 'ShaderNodeMath', (x + 200, 500), operation='MULTIPLY', inputs={
+                0: read_top.out("Attribute"), 1: below,
+            })
+            ext = node(f"extrude{suffix}", 'GeometryNodeExtrudeMesh', (x, 200), inputs={
+                "Mesh": geometry, "Selection": selection, "Offset Scale": floor_step,
+            })
+            top = ext.out("Top")
+            tagged = node(f"floor_top{suffix}", 'GeometryNodeStoreNamedAttribute', (x + 200, 200),
+                          data_type='BOOLEAN', domain='FACE', inputs={
+                "Name": "floor_top", "Geometry": ext, "Value": top,
+            })
+            return node(f"taper{suffix}", 'GeometryNodeScaleElements', (x + 400, 200), domain='FACE', inputs={
+                "Geometry": tagged, "Selection": top, "Scale": read_taper.out("Attribute"),
+            })
+
+        if hasattr(bpy.types, "GeometryNodeRepeatInput"):
+            # One extrusion per iteration, as many iterations as the tallest building has floors
+            iterations = node("floor_iterations", 'GeometryNodeAttributeStatistic', (-200, 0),
+                              data_type='FLOAT', domain='FACE', inputs={
+                "Geometry": store_top, "Attribute": read_floors.out("Attribute"),
+            })
+            loop_in = node("floor_loop", 'GeometryNodeRepeatInput', (0, 200), inputs={
+                "Iterations": iterations.out("Max"), "Geometry": store_top, "Floor": 0,
+            })
+            next_floor = node("next_floor", 'ShaderNodeMath', (200, 0), operation='ADD', inputs={
+                0: loop_in.out("Floor"), 1: 1.0,
+            })
+            floors = extrude_floor("", loop_in.out("Geometry"), loop_in.out("Floor"), 200)
+            loop_out = node("floor_loop_end", 'GeometryNodeRepeatOutput', (800, 200), inputs={
+                "Geometry": floors, "Floor": next_floor,
+            })
+            spec.zone("floor_loop", "floor_loop_end", [('INT', "Floor")])
+            geometry = loop_out.out("Geometry")
+        else:
+            # No repeat zones, unrolled floors
+            geometry = store_top
+            for floor in range(UNROLLED_FLOORS):
+                geometry = extrude_floor(f"_{floor + 1}", geometry, floor, floor * 600)
+        geometry = node("floor_top_clear", 'GeometryNodeRemoveAttribute', (1000, 200), inputs={
+            "Geometry": geometry, "Name": "floor_top",
+        })
+
+        # LOD2: one extrusion to full height, no taper
+        box = node("extrude_box", 'GeometryNodeExtrudeMesh', (-600, -50), inputs={
+            "Mesh": shrink, "Offset Scale": rand_h.out(1),
+        })
+        geometry = node("lod_masses", 'GeometryNodeSwitch', (1200, 200), input_type='GEOMETRY', inputs={
+            "Switch": lod_roofs, "False": box, "True": geometry,
+        })
+        spec.probe(geometry)
+
+    # =====================
+    # 7. Material Assignment
+    # =====================
+    with spec.stage("Materials"):
+        # One material for every building, its colour comes from BuildingColor
+        buildings = spec.probe(node("mat_building", 'GeometryNodeSetMaterial', (1400, 200), inputs={
+            "Geometry": geometry,
+        }))
+
+    return mat_road, buildings, (lod_full, lod_roofs)
+
+def _decoration_stages(spec, roads, buildings, lod):
+    """Windows, doors, antennas and wires on the buildings, joined with the roads."""
+    P = spec.param
+    node = spec.node
+    lod_full, lod_roofs = lod
+
+    # =====================
+    # 8. WINDOWS - Distribute on side faces
+    # =====================
+    with spec.stage("Windows"):
+        # Separate side faces (normal.z close to 0)
+        normal = node("normal", 'GeometryNodeInputNormal', (1800, 600))
+        sep_z = node("normal_xyz", 'ShaderNodeSeparateXYZ', (2000, 600), inputs={"Vector": normal})
+        # abs(normal.z) < 0.1 means side face
+        n_abs = node("normal_z_abs", 'ShaderNodeMath', (2200, 600), operation='ABSOLUTE', inputs={
+            0: sep_z.out("Z"),
+        })
+        side_check = node("is_side", 'ShaderNodeMath', (2400, 600), operation='LESS_THAN', inputs={
+            1: 0.1, 0: n_abs,
+        })
+
+        # Distribute points on side faces for windows
+        dist_win = node("window_points", 'GeometryNodeDistributePointsOnFaces', (2600, 400),
+                        distribute_method='POISSON', inputs={
+            "Mesh": buildings, "Selection": side_check, "Density": P("Window Density"), "Seed": P("Seed"),
+        })
+
+        # Window instance (small cube)
+        win_cube = node("window_cube", 'GeometryNodeMeshCube', (2600, 200), inputs={"Size": (0.15, 0.02, 0.2)})
+        win_scale_vec = node("window_scale", 'ShaderNodeCombineXYZ', (2600, 50), inputs={
+            "X": P("Window Scale"), "Y": P("Window Scale"), "Z": P("Window Scale"),
+        })
+        win_transform = node("window_transform", 'GeometryNodeTransform', (2800, 200), inputs={
+            "Geometry": win_cube, "Scale": win_scale_vec,
+        })
+
+        # Align windows to face normal
+        align_rot = node("window_align", 'FunctionNodeAlignRotationToVector', (2800, 500), axis='Y', inputs={
+            "Vector": dist_win.out("Normal"),
+        })
+        inst_win = node("window_instances", 'GeometryNodeInstanceOnPoints', (3000, 400), inputs={
+            "Points": dist_win.out("Points"), "Instance": win_transform, "Rotation": align_rot,
+        })
+        mat_win = node("mat_window", 'GeometryNodeSetMaterial', (3200, 400), inputs={"Geometry": inst_win})
+        mat_win = node("lod_windows", 'GeometryNodeSwitch', (3400, 400), input_type='GEOMETRY', inputs={
+            "Switch": lod_full, "True": mat_win,
+        })
+        spec.probe(mat_win)
+
+    # =====================
+    # 9. DOORS - At ground level on side faces
+    # =====================
+    with spec.stage("Doors"):
+        pos = node("position", 'GeometryNodeInputPosition', (1800, -200))
+        sep_pos = node("position_xyz", 'ShaderNodeSeparateXYZ', (2000, -200), inputs={"Vector": pos})
+        # Z < 0.3 for ground level
+        ground = node("is_ground", 'ShaderNodeMath', (2200, -200), operation='LESS_THAN', inputs={
+            1: 0.3, 0: sep_pos.out("Z"),
+        })
+        # Combine: side face AND ground level
+        door_sel = node("is_door", 'ShaderNodeMath', (2400, -200), operation='MULTIPLY', inputs={
+            0: side_check, 1: ground,
+        })
+
+        # Distribute door points (sparse)
+        dist_door = node("door_points", 'GeometryNodeDistributePointsOnFaces', (2600, -200),
+                         distribute_method='POISSON', inputs={
+            "Density": 0.5, "Distance Min": 1.5, "Mesh": buildings, "Selection": door_sel,
+        })
+        # Door geometry (taller box)
+        door_cube = node("door_cube", 'GeometryNodeMeshCube', (2600, -400), inputs={"Size": (0.25, 0.03, 0.4)})
+        align_door = node("door_align", 'FunctionNodeAlignRotationToVector', (2800, -100), axis='Y', inputs={
+            "Vector": dist_door.out("Normal"),
+        })
+        inst_door = node("door_instances", 'GeometryNodeInstanceOnPoints', (3000, -200), inputs={
+            "Points": dist_door.out("Points"), "Instance": door_cube, "Rotation": align_door,
+        })
+        mat_door = node("mat_door", 'GeometryNodeSetMaterial', (3200, -200), inputs={"Geometry": inst_door})
+        mat_door = node("lod_doors", 'GeometryNodeSwitch', (3400, -200), input_type='GEOMETRY', inputs={
+            "Switch": lod_full, "True": mat_door,
+        })
+        spec.probe(mat_door)
+
+    # =====================
+    # 10. ANTENNAS - On roof tops
+    # =====================
+    with spec.stage("Antennas"):
+        # Top faces: normal.z > 0.9
+        top_check = node("is_top", 'ShaderNodeMath', (2200, -500), operation='GREATER_THAN', inputs={
+            1: 0.9, 0: sep_z.out("Z"),
+        })
+        # High Z position (above 1.0)
+        high_check = node("is_high", 'ShaderNodeMath', (2200, -650), operation='GREATER_THAN', inputs={
+            1: 1.0, 0: sep_pos.out("Z"),
+        })
+        # Combine top + high
+        roof_sel = node("is_roof", 'ShaderNodeMath', (2400, -550), operation='MULTIPLY', inputs={
+            0: top_check, 1: high_check,
+        })
+
+        # Random selection for antenna chance
+        rand_ant = node("rand_antenna", 'FunctionNodeRandomValue', (2400, -700), data_type='FLOAT', inputs={
+            "Min": 0.0, "Max": 1.0,
+        })
+        ant_thresh = node("antenna_chance", 'ShaderNodeMath', (2600, -700), operation='LESS_THAN', inputs={
+            0: rand_ant.out(1), 1: P("Antenna Chance"),
+        })
+        ant_final = node("is_antenna", 'ShaderNodeMath', (2800, -600), operation='MULTIPLY', inputs={
+            0: roof_sel, 1: ant_thresh,
+        })
+
+        dist_ant = node("antenna_points", 'GeometryNodeDistributePointsOnFaces', (3000, -550),
+                        distribute_method='POISSON', inputs={
+            "Density": 0.3, "Distance Min": 2.0, "Mesh": buildings, "Selection": ant_final,
+        })
+
+        # Antenna geometry (cylinder + sphere on top)
+        ant_cyl = node("antenna_mast", 'GeometryNodeMeshCylinder', (3000, -750), inputs={
+            "Radius": 0.02, "Depth": 0.6, "Vertices": 8,
+        })
+        ant_sphere = node("antenna_ball", 'GeometryNodeMeshUVSphere', (3000, -900), inputs={
+            "Radius": 0.05, "Segments": 8, "Rings": 6,
+        })
+        sphere_move = node("antenna_ball_lift", 'GeometryNodeTransform', (3200, -900), inputs={
+            "Translation": (0, 0, 0.3), "Geometry": ant_sphere,
+        })
+        join_ant = node("antenna_join", 'GeometryNodeJoinGeometry', (3400, -800), inputs={
+            "Geometry": [ant_cyl.out("Mesh"), sphere_move],
+        })
+
+        # Random rotation for variety
+        rand_rot = node("antenna_rotation", 'FunctionNodeRandomValue', (3400, -500), data_type='FLOAT_VECTOR', inputs={
+            "Min": (-0.2, -0.2, 0.0), "Max": (0.2, 0.2, 6.28),
+        })
+        inst_ant = node("antenna_instances", 'GeometryNodeInstanceOnPoints', (3600, -550), inputs={
+            "Points": dist_ant.out("Points"), "Instance": join_ant, "Rotation": rand_rot.out(1),
+        })
+        mat_ant = node("mat_antenna", 'GeometryNodeSetMaterial', (3800, -550), inputs={"Geometry": inst_ant})
+        mat_ant = node("lod_antennas", 'GeometryNodeSwitch', (4000, -550), input_type='GEOMETRY', inputs={
+            "Switch": lod_roofs, "True": mat_ant,
+        })
+        spec.probe(mat_ant)
+
+    # =====================
+    # 11. WIRES - Curves between random rooftop points
+    # =====================
+    with spec.stage("Wires"):
+        # Get points on rooftops for wire endpoints
+        dist_wire = node("wire_points", 'GeometryNodeDistributePointsOnFaces', (3000, -1100),
+                         distribute_method='POISSON', inputs={
+            "Distance Min": 3.0, "Mesh": buildings, "Selection": roof_sel, "Density": P("Wire Density"),
+        })
+        # Offset points up slightly
+        wire_up = node("wire_up", 'ShaderNodeCombineXYZ', inputs={"Z": 0.3})
+        wire_offset = node("wire_lift", 'GeometryNodeSetPosition', (3200, -1100), inputs={
+            "Geometry": dist_wire.out("Points"), "Offset": wire_up,
+        })
+        pts_to_verts = node("wire_vertices", 'GeometryNodePointsToVertices', (3400, -1100), inputs={
+            "Points": wire_offset,
+        })
+        flat_pos = node("wire_flat_position", 'ShaderNodeVectorMath', (3200, -1500), operation='MULTIPLY', inputs={
+            0: pos, 1: (1.0, 1.0, 0.0),
+        })
+
+        # Proximity graph: the lower convex hull of the points lifted onto
+        # z = x^2 + y^2 is their Delaunay triangulation, n log n. It holds
+        # each point's nearest neighbour but not all of its k nearest, so the
+        # wires below approximate a k-nearest graph within the Delaunay edges
+        lift_z = node("wire_lift_z", 'ShaderNodeVectorMath', (3400, -1500), operation='DOT_PRODUCT', inputs={
+            0: flat_pos, 1: flat_pos,
+        })
+        lifted_pos = node("wire_lifted_position", 'ShaderNodeCombineXYZ', (3600, -1500), inputs={
+            "X": sep_pos.out("X"), "Y": sep_pos.out("Y"), "Z": lift_z.out("Value"),
+        })
+        lifted = node("wire_lifted", 'GeometryNodeSetPosition', (3600, -1200), inputs={
+            "Geometry": pts_to_verts, "Position": lifted_pos,
+        })
+        convex = node("wire_hull", 'GeometryNodeConvexHull', (3800, -1200), inputs={"Geometry": lifted})
+        # Upper hull faces point up, deleting them leaves the triangulation
+        is_upper = node("wire_is_upper", 'ShaderNodeMath', (3800, -1500), operation='GREATER_THAN', inputs={
+            0: sep_z.out("Z"), 1: 0.0,
+        })
+        lower = node("wire_lower_hull", 'GeometryNodeDeleteGeometry', (4000, -1200), domain='FACE', mode='ALL',
+                     inputs={"Geometry": convex, "Selection": is_upper})
+        tri_edges = node("wire_triangulation", 'GeometryNodeDeleteGeometry', (4200, -1200), domain='FACE',
+                         mode='ONLY_FACE', inputs={"Geometry": lower})
+
+        # The hull does not keep attributes, take each vertex's roof position
+        # back from the nearest point in XY
+        flat_points = node("wire_flat_points", 'GeometryNodeSetPosition', (3600, -1700), inputs={
+            "Geometry": pts_to_verts, "Position": flat_pos,
+        })
+        nearest = node("wire_nearest_point", 'GeometryNodeSampleNearest', (4000, -1700), inputs={
+            "Geometry": flat_points, "Sample Position": flat_pos,
+        })
+        roof_pos = node("wire_roof_position", 'GeometryNodeSampleIndex', (4200, -1700), data_type='FLOAT_VECTOR',
+                        domain='POINT', inputs={
+            "Geometry": pts_to_verts, "Value": pos, "Index": nearest.out("Index"),
+        })
+        graph = node("wire_graph", 'GeometryNodeSetPosition', (4400, -1200), inputs={
+            "Geometry": tri_edges, "Position": roof_pos.out("Value"),
+        })
+
+        # Keep a Delaunay edge if it spans at most Wire Max Span and is among
+        # the Wire Neighbors shortest Delaunay edges of both its points, so no
+        # point has more than that many wires
+        edge_verts = node("wire_edge_vertices", 'GeometryNodeInputMeshEdgeVertices', (4400, -1900))
+        span = node("wire_span", 'ShaderNodeVectorMath', (4600, -1900), operation='DISTANCE', inputs={
+            0: edge_verts.out("Position 1"), 1: edge_verts.out("Position 2"),
+        })
+        degree = node("wire_degree", 'GeometryNodeInputMeshVertexNeighbors', (4400, -2100))
+        k = node("wire_k", 'ShaderNodeMath', (4600, -2100), operation='MINIMUM', inputs={
+            0: P("Wire Neighbors"), 1: degree.out("Vertex Count"),
+        })
+        k_last = node("wire_k_last", 'ShaderNodeMath', (4800, -2100), operation='SUBTRACT', inputs={0: k, 1: 1.0})
+        kth_edge = node("wire_kth_edge", 'GeometryNodeEdgesOfVertex', (5000, -2100), inputs={
+            "Weights": span.out("Value"), "Sort Index": k_last,
+        })
+        kth_span = node("wire_kth_span", 'GeometryNodeFieldAtIndex', (5200, -2100), data_type='FLOAT', domain='EDGE',
+                        inputs={"Index": kth_edge.out("Edge Index"), "Value": span.out("Value")})
+        too_long = node("wire_too_long", 'ShaderNodeMath', (4800, -1900), operation='GREATER_THAN', inputs={
+            0: span.out("Value"), 1: P("Wire Max Span"),
+        })
+        cut = too_long
+        for end in (1, 2):
+            limit = node(f"wire_limit_{end}", 'GeometryNodeFieldAtIndex', (5400, -1900 - end * 150), data_type='FLOAT',
+                         domain='POINT', inputs={"Index": edge_verts.out(f"Vertex Index {end}"), "Value": kth_span})
+            beyond = node(f"wire_beyond_{end}", 'ShaderNodeMath', (5600, -1900 - end * 150), operation='GREATER_THAN',
+                          inputs={0: span.out("Value"), 1: limit})
+            cut = node(f"wire_cut_{end}", 'ShaderNodeMath', (5800, -1900 - end * 150), operation='MAXIMUM', inputs={
+                0: cut, 1: beyond,
+            })
+        network = node("wire_network", 'GeometryNodeDeleteGeometry', (4600, -1200), domain='EDGE', mode='ALL',
+                       inputs={"Geometry": graph, "Selection": cut})
+        # One spline per edge, so each span sags on its own
+        spans = node("wire_split", 'GeometryNodeSplitEdges', (4700, -1200), inputs={"Mesh": network})
+        mesh_to_curve = node("wire_curves", 'GeometryNodeMeshToCurve', (4800, -1200), inputs={"Mesh": spans})
+
+        # Subdivide and sag with a position offset
+        subdiv = node("wire_subdivide", 'GeometryNodeSubdivideCurve', (5200, -1200), inputs={
+            "Cuts": 4, "Curve": mesh_to_curve,
+        })
+        # Parabolic sag: 4 * t * (1-t) peaks at 0.5
+        spline_param = node("wire_param", 'GeometryNodeSplineParameter', (5000, -1350))
+        one_minus = node("wire_one_minus", 'ShaderNodeMath', (5200, -1350), operation='SUBTRACT', inputs={
+            0: 1.0, 1: spline_param.out("Factor"),
+        })
+        sag_mult = node("wire_sag_shape", 'ShaderNodeMath', (5400, -1350), operation='MULTIPLY', inputs={
+            0: spline_param.out("Factor"), 1: one_minus,
+        })
+        sag_scale = node("wire_sag_depth", 'ShaderNodeMath', (5600, -1350), operation='MULTIPLY', inputs={
+            1: -0.5, 0: sag_mult,  # Negative for downward sag
+        })
+        sag_vec = node("wire_sag_offset", 'ShaderNodeCombineXYZ', (5800, -1350), inputs={"Z": sag_scale})
+        sag_pos = node("wire_sag", 'GeometryNodeSetPosition', (5400, -1200), inputs={
+            "Geometry": subdiv, "Offset": sag_vec,
+        })
+
+        # Give wires thickness
+        wire_profile = node("wire_profile", 'GeometryNodeCurvePrimitiveCircle', (5600, -1100), inputs={
+            "Radius": 0.015, "Resolution": 6,
+        })
+        curve_to_mesh = node("wire_mesh", 'GeometryNodeCurveToMesh', (5800, -1200), inputs={
+            "Curve": sag_pos, "Profile Curve": wire_profile,
+        })
+        mat_wire = node("mat_wire", 'GeometryNodeSetMaterial', (6000, -1200), inputs={"Geometry": curve_to_mesh})
+        mat_wire = node("lod_wires", 'GeometryNodeSwitch', (6100, -1200), input_type='GEOMETRY', inputs={
+            "Switch": lod_roofs, "True": mat_wire,
+        })
+        spec.probe(mat_wire)
+
+    # =====================
+    # 12. Final Join
+    # =====================
+    with spec.stage("Join"):
+        lift = node("building_lift", 'GeometryNodeTransform', (3400, 200), inputs={
+            "Translation": (0, 0, 0.005), "Geometry": buildings,
+        })
+        join_all = node("join_all", 'GeometryNodeJoinGeometry', (6300, 0), inputs={
+            "Geometry": [roads, lift, mat_win, mat_door, mat_ant, mat_wire],
+        })
+        realize = node("realize", 'GeometryNodeRealizeInstances', (6500, -150), inputs={"Geometry": join_all})
+        result = node("realize_switch", 'GeometryNodeSwitch', (6700, 0), input_type='GEOMETRY', inputs={
+            "Switch": P("Realize Instances"), "False": join_all, "True": realize,
+        })
+        spec.probe(result)
+    return result
+
+def v25_spec():
+    """The whole city in one group."""
+    spec = NodeTreeSpec(GROUP)
+    _sockets(spec, [name for name, *_ in SOCKETS])
+    roads, buildings, lod = _layout_stages(spec)
+    spec.output(_decoration_stages(spec, roads, buildings, lod), "Geometry", location=(7000, 0))
+    return spec
+
+def create_v25_nodes():
+    ng, _stats = ensure_tree(v25_spec())
+    return ng